@@ -2,17 +2,45 @@
 from __future__ import annotations
 
 import os
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Optional
 
-from worker.src.storage import JobStorage
+from worker.src.job_index import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, JobQuery
+from worker.src.job_queue import JobQueue, queue_path
+from worker.src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from worker.src.metrics import MetricsRegistry, get_registry
+from worker.src.progress import FINAL_JOB_STATES, events_path, finished_run
+from worker.src.scheduler import tenant_key
+from worker.src.storage import JobState as WorkerJobState
+from worker.src.storage import STORAGE_BACKEND_ENV, JobStorage, open_job_storage
 
 from .routes import models as models_routes
-from .schemas.jobs import JobState, JobStatus
-from .services import build_job_stats
+from .schemas.health import Health
+from .schemas.jobs import JobCreated, JobState, JobStatus
+from .services import (
+    HandlerLatencyMiddleware,
+    JobStatusCache,
+    build_job_list,
+    build_metrics_text,
+    build_preview,
+    build_queue_stats,
+    csv_etag,
+    etag_matches,
+    is_supported_upload,
+    parse_last_event_id,
+    resolve_csv_path,
+    resolve_profile_path,
+    store_upload,
+    stream_job_events,
+)
 
 try:  # pragma: no cover - optional dependency for runtime API usage
-    from fastapi import Depends, FastAPI, HTTPException
+    from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
+    from fastapi.responses import FileResponse, Response, StreamingResponse
 except ModuleNotFoundError:  # pragma: no cover - fallback for environments without FastAPI
     FastAPI = None
 
@@ -25,35 +53,271 @@ except ModuleNotFoundError:  # pragma: no cover - fallback for environments with
     def Depends(factory: Callable) -> Callable:
         return factory
 
+    def Query(default, **_kwargs):  # type: ignore
+        return default
+
+    def Header(default, **_kwargs):  # type: ignore
+        return default
+
+    def File(default, **_kwargs):  # type: ignore
+        return default
+
+    def Form(default, **_kwargs):  # type: ignore
+        return default
+
+
+JOB_STATUS_CACHE_SIZE = 1024
+
+_STARTED_AT = time.monotonic()
+
+job_status_cache = JobStatusCache(maxsize=JOB_STATUS_CACHE_SIZE)
+
+
+@lru_cache(maxsize=8)
+def _shared_storage(base_dir: str, backend: str) -> JobStorage:
+    return open_job_storage(Path(base_dir), backend=backend or None)
+
 
 def get_storage() -> JobStorage:
-    base_dir = Path(os.environ.get("CNE_DATA_DIR", "data"))
-    return JobStorage(base_dir)
+    """Return the process-wide storage for ``CNE_DATA_DIR``/``CNE_STORAGE_BACKEND``.
+
+    Building a store creates directories and opens its index, so one
+    instance per configuration is shared by every request.
+    """
+
+    base_dir = os.environ.get("CNE_DATA_DIR", "data")
+    return _shared_storage(str(Path(base_dir).resolve()), os.environ.get(STORAGE_BACKEND_ENV, ""))
+
+
+@lru_cache(maxsize=8)
+def _shared_queue(base_dir: str) -> JobQueue:
+    return JobQueue(queue_path(Path(base_dir)))
+
+
+def get_queue() -> JobQueue:
+    """Return the process-wide job queue of ``CNE_DATA_DIR``."""
+
+    return _shared_queue(str(Path(os.environ.get("CNE_DATA_DIR", "data")).resolve()))
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide metrics registry of ``CNE_DATA_DIR``."""
+
+    return get_registry(Path(os.environ.get("CNE_DATA_DIR", "data")))
 
 
 if FastAPI is not None:
     app = FastAPI(title="CNE Offline API")
+    app.add_middleware(HandlerLatencyMiddleware, registry=get_metrics)
 
     if models_routes.router is not None:
         app.include_router(models_routes.router)
 
+    @app.get("/api/health", response_model=None)
+    async def health() -> dict:
+        """Liveness probe with the process uptime."""
+
+        return Health(status="ok", uptime_seconds=round(time.monotonic() - _STARTED_AT, 3)).to_dict()
+
+    @app.get("/api/metrics", response_model=None)
+    def metrics(
+        storage: JobStorage = Depends(get_storage),
+        queue: JobQueue = Depends(get_queue),
+    ) -> Response:
+        """Prometheus text exposition of the API and worker metrics."""
+
+        return Response(build_metrics_text(storage.base_dir, queue), media_type=METRICS_CONTENT_TYPE)
+
+    @app.get("/api/jobs", response_model=None)
+    async def list_jobs(
+        state: Optional[JobState] = Query(None, description="Only jobs in this state"),
+        updated_from: Optional[datetime] = Query(None, description="Updated at or after (ISO 8601)"),
+        updated_to: Optional[datetime] = Query(None, description="Updated before (ISO 8601)"),
+        has_error: Optional[bool] = Query(None, description="Only jobs with/without an error"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Jobs per page"),
+        cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+        storage: JobStorage = Depends(get_storage),
+    ) -> dict:
+        """List jobs, most recently updated first, with keyset pagination."""
+
+        query = JobQuery(
+            state=WorkerJobState(state.value) if state is not None else None,
+            updated_from=updated_from,
+            updated_to=updated_to,
+            has_error=has_error,
+            limit=limit,
+            cursor=cursor,
+        )
+        try:
+            page = storage.query_jobs(query)
+        except ValueError as exc:  # pragma: no cover - FastAPI handles HTTPException
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return build_job_list(page).to_dict()
+
+    @app.post("/api/jobs", status_code=201, response_model=None)
+    def create_job(
+        file: UploadFile = File(..., description="PDF/DOCX/XLSX file or a ZIP with several"),
+        dtmnfr: Optional[str] = Form(None, description="Submitting municipality (fair-share key)"),
+        uploader: Optional[str] = Form(None, description="Submitting user, used when DTMNFR is absent"),
+        profile: bool = Form(False, description="Profile the run (cProfile and sampled stacks)"),
+        storage: JobStorage = Depends(get_storage),
+        queue: JobQueue = Depends(get_queue),
+    ) -> dict:
+        """Store the upload and queue the job for the worker daemons.
+
+        The job is scheduled fairly against other submitters' work, keyed on
+        ``dtmnfr`` (else ``uploader``), and small uploads jump ahead. With
+        ``profile`` the worker profiles the run; the job status then links
+        to the profile files.
+        """
+
+        if not is_supported_upload(file.filename):
+            raise HTTPException(status_code=415, detail=f"Unsupported file type: {file.filename}")
+
+        job_id = uuid.uuid4().hex
+        upload = store_upload(job_id, file.filename or "", file.file, storage.base_dir)
+        metadata = storage.ensure(job_id, [upload])
+        if profile:
+            metadata = storage.update(job_id, profile=True)
+        queue.enqueue(job_id, [upload], tenant=tenant_key(dtmnfr, uploader))
+        return JobCreated(job_id=job_id, status=JobState(metadata.state.value)).to_dict()
+
+    @app.get("/api/queue", response_model=None)
+    async def queue_stats(queue: JobQueue = Depends(get_queue)) -> dict:
+        """Queue depth and wait times per scheduling class (small/bulk)."""
+
+        return build_queue_stats(queue).to_dict()
+
     @app.get("/api/jobs/{job_id}", response_model=JobStatus)
-    async def read_job(job_id: str, storage: JobStorage = Depends(get_storage)) -> JobStatus:
+    async def read_job(
+        job_id: str,
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        storage: JobStorage = Depends(get_storage),
+    ) -> JobStatus:
+        """Job status from the in-process cache, revalidated on every request.
+
+        Pollers that send back the ETag get an empty 304 until the job changes.
+        """
+
+        try:
+            status, etag = job_status_cache.get(storage, job_id)
+        except FileNotFoundError as exc:  # pragma: no cover - FastAPI handles HTTPException
+            raise HTTPException(status_code=404, detail="Job not found") from exc
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)  # type: ignore[return-value]
+        response.headers.update(headers)
+        return status
+
+    @app.get("/api/jobs/{job_id}/events", response_model=None)
+    async def job_events(
+        job_id: str,
+        request: Request,
+        last_event_id: Optional[str] = Header(None),
+        storage: JobStorage = Depends(get_storage),
+    ) -> StreamingResponse:
+        """Stream the job's progress as Server-Sent Events until it finishes.
+
+        Reconnecting clients resume after ``Last-Event-ID`` (the run and
+        byte offset of the last event they received).
+        """
+
+        path = events_path(storage.base_dir, job_id)
+        # Read before the state: the pipeline stores a final state before
+        # publishing it, so a finished run next to an unfinished job is stale.
+        finished = finished_run(path)
         try:
             metadata = storage.load(job_id)
         except FileNotFoundError as exc:  # pragma: no cover - FastAPI handles HTTPException
             raise HTTPException(status_code=404, detail="Job not found") from exc
 
-        stats = build_job_stats(metadata)
-        return JobStatus(
-            job_id=metadata.job_id,
-            state=JobState(metadata.state.value),
-            created_at=metadata.created_at,
-            updated_at=metadata.updated_at,
-            input_files=metadata.input_files,
-            pages=metadata.pages,
-            stats=stats,
-            error=metadata.error,
+        run, offset = parse_last_event_id(last_event_id)
+        stream = stream_job_events(
+            path,
+            state=metadata.state.value,
+            offset=offset,
+            run=run,
+            stale_run=None if metadata.state.value in FINAL_JOB_STATES else finished,
+            is_disconnected=request.is_disconnected,
+        )
+        return StreamingResponse(
+            stream,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.get("/api/jobs/{job_id}/preview", response_model=None)
+    async def read_preview(
+        job_id: str,
+        page: int = Query(1, ge=1, description="Requested page number"),
+        size: int = Query(100, ge=1, le=500, description="Rows per page"),
+        storage: JobStorage = Depends(get_storage),
+    ) -> dict:
+        """Return one page of rows, read by offset from the job's row store."""
+
+        try:
+            storage.load(job_id)
+            preview = build_preview(job_id, storage.base_dir, page=page, size=size)
+        except FileNotFoundError as exc:  # pragma: no cover - FastAPI handles HTTPException
+            raise HTTPException(status_code=404, detail="Preview not found") from exc
+        return preview.to_dict()
+
+    @app.get("/api/jobs/{job_id}/csv", response_model=None)
+    async def download_csv(
+        job_id: str,
+        if_none_match: Optional[str] = Header(None),
+        storage: JobStorage = Depends(get_storage),
+    ) -> Response:
+        """Stream the job CSV from disk with Range and conditional GET support.
+
+        ``FileResponse`` serves ``Range``/``If-Range`` requests itself and
+        hands the path to the server (``http.response.pathsend``) when it
+        can send the file without copying it through Python.
+        """
+
+        try:
+            metadata = storage.load(job_id)
+            csv_path = resolve_csv_path(metadata, storage.base_dir)
+            stat_result = os.stat(csv_path)
+        except FileNotFoundError as exc:  # pragma: no cover - FastAPI handles HTTPException
+            raise HTTPException(status_code=404, detail="CSV not found") from exc
+
+        etag = csv_etag(stat_result)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return FileResponse(
+            csv_path,
+            media_type="text/csv",
+            filename=csv_path.name,
+            headers=headers,
+            stat_result=stat_result,
+        )
+
+    @app.get("/api/jobs/{job_id}/profile/{kind}", response_model=None)
+    async def download_profile(
+        job_id: str,
+        kind: str,
+        storage: JobStorage = Depends(get_storage),
+    ) -> Response:
+        """Download the ``pstats`` or ``collapsed`` profile of a profiled run."""
+
+        try:
+            metadata = storage.load(job_id)
+            path = resolve_profile_path(metadata, kind)
+            stat_result = os.stat(path)
+        except FileNotFoundError as exc:  # pragma: no cover - FastAPI handles HTTPException
+            raise HTTPException(status_code=404, detail="Profile not found") from exc
+
+        media_type = "text/plain; charset=utf-8" if kind == "collapsed" else "application/octet-stream"
+        return FileResponse(
+            path,
+            media_type=media_type,
+            filename=f"{job_id}-{path.name}",
+            headers={"Cache-Control": "no-cache"},
+            stat_result=stat_result,
         )
 else:  # pragma: no cover - runtime fallback
     app = None
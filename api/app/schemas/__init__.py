@@ -1,13 +1,18 @@
 """Schema helper exports for API payloads."""
 
-from .jobs import JobCreated, JobState, JobStats, JobStatus
+from .health import Health
+from .jobs import JobCreated, JobList, JobState, JobStats, JobStatus, PreviewPage, QueueStats
 from .models import ModelHistory, ModelInfo
 
 __all__ = [
+    "Health",
     "JobCreated",
+    "JobList",
     "JobState",
     "JobStats",
     "JobStatus",
     "ModelHistory",
     "ModelInfo",
+    "PreviewPage",
+    "QueueStats",
 ]
@@ -0,0 +1,14 @@
+"""Schema objects for operational endpoints."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Union
+
+
+@dataclass
+class Health:
+    status: str
+    uptime_seconds: float
+
+    def to_dict(self) -> Dict[str, Union[str, float]]:
+        return asdict(self)
@@ -22,9 +22,13 @@ class JobStats:
     rows_warn: Optional[int] = None
     rows_err: Optional[int] = None
     ocr_conf_mean: Optional[float] = None
+    ocr_errors: Optional[int] = None
+    ocr_cache_hits: Optional[int] = None
+    ocr_cache_misses: Optional[int] = None
+    timings: Optional[Dict[str, Dict[str, Optional[Union[int, float]]]]] = None
 
-    def to_dict(self) -> Dict[str, Optional[Union[int, float]]]:
-        payload: Dict[str, Optional[Union[int, float]]] = asdict(self)
+    def to_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = asdict(self)
         return {key: value for key, value in payload.items() if value is not None}
 
 
@@ -38,6 +42,7 @@ class JobStatus:
     pages: Optional[int] = None
     stats: Optional[JobStats] = None
     error: Optional[str] = None
+    profile: Optional[Dict[str, str]] = None
 
     def to_dict(self) -> Dict[str, object]:
         payload: Dict[str, object] = {
@@ -51,9 +56,45 @@ class JobStatus:
         }
         if self.stats is not None:
             payload["stats"] = self.stats.to_dict()
+        if self.profile:
+            payload["profile"] = dict(self.profile)
         return payload
 
 
+@dataclass
+class JobList:
+    """Keyset-paginated job listing; pass ``next_cursor`` back for more."""
+
+    items: List[JobStatus] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "items": [item.to_dict() for item in self.items],
+            "next_cursor": self.next_cursor,
+        }
+
+
+@dataclass
+class PreviewPage:
+    """One page of a job's rows with per-cell validation flags."""
+
+    job_id: str
+    page: int
+    size: int
+    total: int
+    rows: List[Dict[str, object]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "page": self.page,
+            "size": self.size,
+            "total": self.total,
+            "rows": list(self.rows),
+        }
+
+
 @dataclass
 class JobCreated:
     job_id: str
@@ -61,3 +102,17 @@ class JobCreated:
 
     def to_dict(self) -> Dict[str, str]:
         return {"job_id": self.job_id, "status": self.status.value}
+
+
+@dataclass
+class QueueStats:
+    """Pending/running counts and wait times per scheduling class."""
+
+    classes: Dict[str, Dict[str, Optional[float]]] = field(default_factory=dict)
+    window_seconds: float = 3600.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "window_seconds": self.window_seconds,
+            "classes": {name: dict(values) for name, values in self.classes.items()},
+        }
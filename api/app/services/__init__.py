@@ -1,6 +1,43 @@
 """Service helpers for the FastAPI backend."""
 
-from .jobs import build_job_stats
+from .events import format_sse, parse_last_event_id, stream_job_events
+from .jobs import (
+    JobStatusCache,
+    build_job_list,
+    build_job_stats,
+    build_job_status,
+    build_preview,
+    build_profile_links,
+    build_queue_stats,
+    csv_etag,
+    etag_matches,
+    is_supported_upload,
+    resolve_csv_path,
+    resolve_profile_path,
+    store_upload,
+)
+from .metrics import HandlerLatencyMiddleware, build_metrics_text
 from .models import get_history as get_model_history, load_registry as load_model_registry
 
-__all__ = ["build_job_stats", "get_model_history", "load_model_registry"]
+__all__ = [
+    "HandlerLatencyMiddleware",
+    "JobStatusCache",
+    "build_job_list",
+    "build_job_stats",
+    "build_job_status",
+    "build_metrics_text",
+    "build_preview",
+    "build_profile_links",
+    "build_queue_stats",
+    "csv_etag",
+    "etag_matches",
+    "format_sse",
+    "get_model_history",
+    "is_supported_upload",
+    "load_model_registry",
+    "parse_last_event_id",
+    "resolve_csv_path",
+    "resolve_profile_path",
+    "store_upload",
+    "stream_job_events",
+]
@@ -0,0 +1,86 @@
+"""Server-Sent Events stream of a job's progress file."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from worker.src.progress import FINAL_JOB_STATES, STATE_EVENT, is_terminal, read_events
+
+POLL_INTERVAL = 0.25
+KEEPALIVE_INTERVAL = 15.0
+
+
+def format_sse(event: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """Encode ``event`` as one SSE message named after its kind."""
+
+    kind = "state" if event.get("stage") == STATE_EVENT else "progress"
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {kind}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False)}")
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+def event_id(run: Optional[str], offset: int) -> str:
+    """SSE id of an event: its run and the offset just past it."""
+
+    return f"{run}:{offset}" if run else str(offset)
+
+
+def parse_last_event_id(value: Optional[str]) -> Tuple[Optional[str], int]:
+    """Run and offset to resume from; unknown or malformed ids restart the stream."""
+
+    run, _, offset = (value or "").rpartition(":")
+    try:
+        return run or None, max(0, int(offset)) if offset else 0
+    except ValueError:
+        return None, 0
+
+
+async def stream_job_events(
+    path: Path,
+    *,
+    state: str,
+    offset: int = 0,
+    run: Optional[str] = None,
+    stale_run: Optional[str] = None,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    poll_interval: float = POLL_INTERVAL,
+    keepalive_interval: float = KEEPALIVE_INTERVAL,
+) -> AsyncIterator[bytes]:
+    """Tail ``path`` from ``offset`` of ``run`` until the job reaches a final state.
+
+    ``state`` is the job state when the client connected: a finished job
+    without a progress file (processed before events existed) gets a
+    single ``state`` event instead of a stream that would never end.
+    Events of ``stale_run``, a run that had already finished although the
+    job was queued again, are skipped so its final state does not end the
+    stream of the next run.
+    """
+
+    path = Path(path)
+    if state in FINAL_JOB_STATES and not path.exists():
+        yield format_sse({"stage": STATE_EVENT, "state": state})
+        return
+
+    idle_since = time.monotonic()
+    while True:
+        events, offset, run = read_events(path, offset, run)
+        if stale_run is not None and run == stale_run:
+            events = []
+        for position, event in events:
+            yield format_sse(event, event_id(run, position))
+            if is_terminal(event):
+                return
+        if events:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= keepalive_interval:
+            idle_since = time.monotonic()
+            yield b": keepalive\n\n"
+        if is_disconnected is not None and await is_disconnected():
+            return
+        await asyncio.sleep(poll_interval)
@@ -1,18 +1,32 @@
 """Job service helpers for preparing API responses."""
 from __future__ import annotations
 
-from typing import Optional
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional, Tuple
 
-from worker.src.storage import JobMetadata
+from worker.src.blobs import BlobStore, blobs_dir
+from worker.src.job_index import JobPage
+from worker.src.job_queue import DEFAULT_STATS_WINDOW, JobQueue
+from worker.src.profiling import PROFILE_FILES
+from worker.src.rowstore import RowStore
+from worker.src.storage import JobMetadata, JobStorage
+from worker.src.types import CandidateRow
+from worker.src.writer import csv_filename
 
-from ..schemas.jobs import JobStats
+from ..schemas.jobs import JobList, JobState, JobStats, JobStatus, PreviewPage, QueueStats
+
+UPLOAD_SUFFIXES = frozenset({".pdf", ".docx", ".xlsx", ".zip", ".txt", ".csv", ".md"})
 
 
 def build_job_stats(metadata: JobMetadata) -> Optional[JobStats]:
     """Convert persisted statistics into the API schema representation."""
 
     stats = metadata.stats or {}
-    if not stats:
+    if not stats and not metadata.timings:
         return None
     return JobStats(
         rows_total=stats.get("rows_total"),
@@ -20,4 +34,173 @@ def build_job_stats(metadata: JobMetadata) -> Optional[JobStats]:
         rows_warn=stats.get("rows_warn"),
         rows_err=stats.get("rows_err"),
         ocr_conf_mean=stats.get("ocr_conf_mean"),
+        ocr_errors=stats.get("ocr_errors"),
+        ocr_cache_hits=stats.get("ocr_cache_hits"),
+        ocr_cache_misses=stats.get("ocr_cache_misses"),
+        timings=metadata.timings or None,
+    )
+
+
+def build_job_status(metadata: JobMetadata) -> JobStatus:
+    return JobStatus(
+        job_id=metadata.job_id,
+        state=JobState(metadata.state.value),
+        created_at=metadata.created_at,
+        updated_at=metadata.updated_at,
+        input_files=metadata.input_files,
+        pages=metadata.pages,
+        stats=build_job_stats(metadata),
+        error=metadata.error,
+        profile=build_profile_links(metadata),
+    )
+
+
+def build_profile_links(metadata: JobMetadata) -> Optional[Dict[str, str]]:
+    """Download URLs of the profile files a profiled run left behind."""
+
+    links = {
+        kind: f"/api/jobs/{metadata.job_id}/profile/{kind}"
+        for kind in PROFILE_FILES
+        if kind in metadata.profile_files
+    }
+    return links or None
+
+
+def build_job_list(page: JobPage) -> JobList:
+    return JobList(
+        items=[build_job_status(metadata) for metadata in page.items],
+        next_cursor=page.next_cursor,
+    )
+
+
+class JobStatusCache:
+    """LRU of built :class:`JobStatus` payloads keyed by job id.
+
+    Each entry remembers the storage fingerprint (``job.json``
+    inode/size/mtime, or the SQLite version) it was built from; a hit only
+    costs a ``stat`` or one indexed lookup, and a changed fingerprint
+    reloads the job.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, ...], JobStatus, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, storage: JobStorage, job_id: str) -> Tuple[JobStatus, str]:
+        """Return ``(status, etag)``; raises ``FileNotFoundError`` for unknown jobs."""
+
+        key = (str(storage.base_dir), job_id)
+        fingerprint = storage.fingerprint(job_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+
+        metadata = storage.load(job_id)
+        status = build_job_status(metadata)
+        etag = f'"{metadata.version:x}-{int(metadata.updated_at.timestamp() * 1_000_000):x}"'
+        with self._lock:
+            self.misses += 1
+            # A write racing the load leaves the fingerprints unequal; serve
+            # what was read but do not cache it under either of them.
+            if storage.fingerprint(job_id) == fingerprint:
+                self._entries[key] = (fingerprint, status, etag)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return status, etag
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def build_queue_stats(queue: JobQueue, *, window: float = DEFAULT_STATS_WINDOW) -> QueueStats:
+    stats = queue.class_stats(window=window)
+    return QueueStats(
+        classes={name: entry.to_dict() for name, entry in stats.items()},
+        window_seconds=window,
     )
+
+
+def is_supported_upload(filename: Optional[str]) -> bool:
+    return Path(filename or "").suffix.lower() in UPLOAD_SUFFIXES
+
+
+def store_upload(job_id: str, filename: str, source: BinaryIO, base_dir: Path) -> Path:
+    """Store an upload once by content and link it into ``uploads/<job_id>/``.
+
+    The bytes land in the blob store (see :mod:`worker.src.blobs`), so the
+    same file submitted again only adds a hard link. Only the final path
+    component of ``filename`` is kept, so a client cannot write outside the
+    job's upload directory.
+    """
+
+    target = Path(base_dir) / "uploads" / job_id / Path(filename.replace("\\", "/")).name
+    _digest, path = BlobStore(blobs_dir(base_dir)).ingest(source, target)
+    return path
+
+
+def resolve_csv_path(metadata: JobMetadata, base_dir: Path) -> Path:
+    """Return the job CSV, preferring the path recorded by the worker."""
+
+    if metadata.csv_path:
+        return Path(metadata.csv_path)
+    return Path(base_dir) / "processed" / metadata.job_id / csv_filename(metadata.job_id)
+
+
+def resolve_profile_path(metadata: JobMetadata, kind: str) -> Path:
+    """Return a recorded profile file; ``FileNotFoundError`` when there is none."""
+
+    if kind not in PROFILE_FILES or kind not in metadata.profile_files:
+        raise FileNotFoundError(kind)
+    return Path(metadata.profile_files[kind])
+
+
+def csv_etag(stat_result: os.stat_result) -> str:
+    """Strong ETag for the job CSV built from the file's own inode, size and mtime.
+
+    The CSV is only ever written whole or replaced by rename (reviewer
+    edits, see :func:`worker.src.rowstore.splice_rows`), so the tag changes
+    with the content whether or not the job metadata was updated too.
+    """
+
+    return f'"{stat_result.st_ino:x}-{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` header value."""
+
+    if not if_none_match:
+        return False
+    candidates = [item.strip() for item in if_none_match.split(",")]
+    return "*" in candidates or any(item.removeprefix("W/") == etag for item in candidates)
+
+
+def _preview_row(row: CandidateRow) -> Dict[str, object]:
+    payload = asdict(row)
+    payload["__validation__"] = payload.pop("validation")
+    return payload
+
+
+def build_preview(job_id: str, base_dir: Path, *, page: int = 1, size: int = 100) -> PreviewPage:
+    """Read one page of rows from the job's memory-mapped row store.
+
+    Raises ``FileNotFoundError`` while the job has no row store yet.
+    """
+
+    if page < 1:
+        raise ValueError("page must be greater than or equal to 1")
+    if size < 1:
+        raise ValueError("size must be greater than or equal to 1")
+
+    processed_dir = Path(base_dir) / "processed" / job_id
+    with RowStore(processed_dir) as store:
+        start = (page - 1) * size
+        rows = [_preview_row(row) for row in store.iter_rows(start, start + size)]
+        return PreviewPage(job_id=job_id, page=page, size=size, total=len(store), rows=rows)
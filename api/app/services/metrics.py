@@ -0,0 +1,56 @@
+"""Operational metrics for the API: handler latency and the metrics scrape."""
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from worker.src.job_queue import JobQueue
+from worker.src.metrics import API_LATENCY, QUEUE_DEPTH, Metric, MetricsRegistry, metrics_dir, render_metrics
+
+Scope = Dict[str, Any]
+ASGIApp = Callable[[Scope, Callable, Callable], Awaitable[None]]
+
+
+class HandlerLatencyMiddleware:
+    """ASGI middleware timing each request until its response starts.
+
+    Samples are labelled with the name of the endpoint function the router
+    picked (``read_job``, ``get_history``...), so streamed responses (SSE,
+    file downloads) count their time to first byte rather than their whole
+    transfer. Requests no route matched are not recorded.
+    """
+
+    def __init__(self, app: ASGIApp, registry: Callable[[], MetricsRegistry]) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        elapsed: List[float] = []
+
+        async def timed_send(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                elapsed.append(time.perf_counter() - started)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            handler = getattr(scope.get("endpoint"), "__name__", None)
+            if handler is not None:
+                duration = elapsed[0] if elapsed else time.perf_counter() - started
+                self.registry().observe(API_LATENCY, duration, handler=handler)
+
+
+def build_metrics_text(base_dir: Path, queue: JobQueue) -> str:
+    """Summed samples of every API/worker process plus current queue depth."""
+
+    gauges: List[Tuple[Metric, Dict[str, str], float]] = []
+    for job_class, stats in queue.class_stats().items():
+        gauges.append((QUEUE_DEPTH, {"job_class": job_class, "status": "pending"}, stats.pending))
+        gauges.append((QUEUE_DEPTH, {"job_class": job_class, "status": "running"}, stats.running))
+    return render_metrics(metrics_dir(base_dir), gauges)
@@ -0,0 +1,44 @@
+"""Row factories shared by the test modules."""
+import random
+
+from worker.src.types import CandidateRow
+
+
+def make_row(**overrides):
+    """A valid ``CandidateRow``; keyword arguments replace single fields."""
+
+    defaults = dict(
+        DTMNFR="150800",
+        ORGAO="AM",
+        TIPO="2",
+        SIGLA="PS",
+        SIMBOLO="",
+        NOME_LISTA="Lista",
+        NUM_ORDEM=1,
+        NOME_CANDIDATO="Nome",
+        PARTIDO_PROPONENTE="PS",
+        INDEPENDENTE="0",
+    )
+    defaults.update(overrides)
+    return CandidateRow(**defaults)
+
+
+def random_raw_rows(seed, count=400):
+    """Unnormalised rows mixing valid, padded, lower-case, empty and bad values."""
+
+    rng = random.Random(seed)
+    return [
+        CandidateRow(
+            DTMNFR=rng.choice(["150800", "1508", " 110600 ", "abc", "15-08", "1234567"]),
+            ORGAO=rng.choice(["AM", "cm", " AF ", "XX", "", None]),
+            TIPO=rng.choice(["2", "3", " 3", "9", None]),
+            SIGLA=rng.choice(["PS", "psd", "BE ", "XYZ", "", None]),
+            SIMBOLO=rng.choice([None, "", " S ", "simbolo"]),
+            NOME_LISTA=rng.choice([None, "", "Lista A", "Lista B", " Lista A "]),
+            NUM_ORDEM=rng.choice([0, 1, 2, 3, 5, "4", "x", None]),
+            NOME_CANDIDATO=rng.choice(["Ana", " Bruno ", "", None]),
+            PARTIDO_PROPONENTE=rng.choice([None, "", "PS", " BE "]),
+            INDEPENDENTE=rng.choice([None, "", "0", "1", "sim", "talvez"]),
+        )
+        for _ in range(count)
+    ]
@@ -0,0 +1,82 @@
+import pytest
+
+from api.app.services.jobs import etag_matches
+from helpers import make_row
+from worker.src import validator, writer
+from worker.src.revalidation import CellEdit, apply_edits
+from worker.src.storage import JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+
+def _ready_job(tmp_path, job_id):
+    storage = JobStorage(tmp_path)
+    storage.ensure(job_id, [])
+    rows = [make_row(NUM_ORDEM=index, NOME_CANDIDATO=f"Nome {index}") for index in range(1, 200)]
+    csv_path, _ = writer.write_outputs(job_id, rows, validator.summarise_validation(rows), tmp_path)
+    storage.mark_state(job_id, JobState.ready, csv_path=str(csv_path))
+    return storage, csv_path
+
+
+def test_etag_matches_handles_lists_weak_tags_and_wildcards():
+    assert etag_matches('"a-1"', '"a-1"')
+    assert etag_matches('"x", W/"a-1"', '"a-1"')
+    assert etag_matches("*", '"a-1"')
+    assert not etag_matches('"a-2"', '"a-1"')
+    assert not etag_matches(None, '"a-1"')
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_csv_download_supports_range_and_conditional_requests(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    storage, csv_path = _ready_job(tmp_path, "job-csv")
+    data = csv_path.read_bytes()
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/jobs/job-csv/csv")
+    assert response.status_code == 200
+    assert response.content == data
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="listas_job-csv.csv"'
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+
+    partial = client.get("/api/jobs/job-csv/csv", headers={"Range": "bytes=100-199"})
+    assert partial.status_code == 206
+    assert partial.content == data[100:200]
+    assert partial.headers["content-range"] == f"bytes 100-199/{len(data)}"
+
+    cached = client.get("/api/jobs/job-csv/csv", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    storage.update("job-csv")
+    assert client.get("/api/jobs/job-csv/csv", headers={"If-None-Match": etag}).status_code == 304
+
+    apply_edits("job-csv", [CellEdit(0, "NOME_CANDIDATO", "Nome X")], base_dir=tmp_path)
+    changed = client.get("/api/jobs/job-csv/csv", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.content) == len(data)
+    assert changed.content != data
+    assert changed.headers["etag"] != etag
+
+    stale_range = client.get("/api/jobs/job-csv/csv", headers={"Range": "bytes=0-9", "If-Range": etag})
+    assert stale_range.status_code == 200
+    assert stale_range.content == changed.content
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_csv_download_is_404_without_a_csv(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    JobStorage(tmp_path).ensure("job-queued", [])
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    assert client.get("/api/jobs/job-queued/csv").status_code == 404
+    assert client.get("/api/jobs/missing/csv").status_code == 404
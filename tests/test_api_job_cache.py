@@ -0,0 +1,85 @@
+import pytest
+
+from api.app.services import JobStatusCache
+from worker.src.sqlite_storage import SQLiteJobStorage
+from worker.src.storage import JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStorage(tmp_path)
+    return JobStorage(tmp_path)
+
+
+def test_cache_serves_hits_until_the_job_changes(storage):
+    cache = JobStatusCache()
+    storage.ensure("job-1", [])
+
+    first, etag = cache.get(storage, "job-1")
+    again, same_etag = cache.get(storage, "job-1")
+    assert again is first and same_etag == etag
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    storage.mark_state("job-1", JobState.ready, error="OCR falhou")
+    updated, new_etag = cache.get(storage, "job-1")
+    assert updated.state.value == "ready" and updated.error == "OCR falhou"
+    assert new_etag != etag
+    assert cache.misses == 2
+
+
+def test_cache_evicts_least_recently_used_jobs(storage):
+    cache = JobStatusCache(maxsize=2)
+    for job_id in ("a", "b", "c"):
+        storage.ensure(job_id, [])
+
+    cache.get(storage, "a")
+    cache.get(storage, "b")
+    cache.get(storage, "a")
+    cache.get(storage, "c")
+    cache.get(storage, "a")
+    assert cache.hits == 2
+    cache.get(storage, "b")
+    assert cache.misses == 4
+
+
+def test_cache_reports_unknown_jobs(storage):
+    with pytest.raises(FileNotFoundError):
+        JobStatusCache().get(storage, "missing")
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_job_endpoint_answers_polls_with_304(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("CNE_STORAGE_BACKEND", backend)
+
+    from api.app.main import app, get_storage
+
+    storage = get_storage()
+    assert get_storage() is storage
+    storage.ensure("job-poll", [])
+
+    client = TestClient(app)
+    response = client.get("/api/jobs/job-poll")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.json()["state"] == "queued"
+
+    cached = client.get("/api/jobs/job-poll", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+    storage.mark_state("job-poll", JobState.processing)
+    changed = client.get("/api/jobs/job-poll", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["state"] == "processing"
+
+    assert client.get("/api/jobs/missing").status_code == 404
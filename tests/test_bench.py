@@ -0,0 +1,86 @@
+import json
+
+from worker.bench import CorpusSpec, build_cases, compare, over_budget, run_suite, write_corpus
+from worker.bench import __main__ as bench_main
+from worker.bench.__main__ import main
+from worker.src.pipeline import process_job
+
+
+def _timed(results, wall_s, stage_ms):
+    """Copy of ``results`` with fixed timings, so comparisons do not depend on this machine."""
+
+    timed = json.loads(json.dumps(results))
+    for entry in timed["results"]:
+        entry["wall_s"] = wall_s
+        entry["stages_ms"] = {stage: stage_ms for stage in entry["stages_ms"]}
+    return timed
+
+
+def test_corpus_is_deterministic_and_parses(tmp_path):
+    spec = CorpusSpec(3, lines_per_document=25)
+    first = write_corpus(tmp_path / "a", spec)
+    second = write_corpus(tmp_path / "b", spec)
+
+    assert [path.read_bytes() for path in first.files] == [path.read_bytes() for path in second.files]
+    assert first.candidates == 75
+    for file_format in ("txt", "xlsx"):
+        corpus = write_corpus(tmp_path / file_format, CorpusSpec(2, lines_per_document=25, file_format=file_format))
+        result = process_job(f"job-{file_format}", corpus.files, base_dir=tmp_path / "data")
+        assert (result.rows_total, result.rows_err) == (50, 0)
+
+
+def test_faulty_variants_still_run(tmp_path):
+    malformed = write_corpus(tmp_path / "malformed", CorpusSpec(4, lines_per_document=50, variant="malformed"))
+    edge = write_corpus(tmp_path / "edge", CorpusSpec(4, lines_per_document=50, variant="edge"))
+
+    assert process_job("job-malformed", malformed.files, base_dir=tmp_path / "data").rows_err > 0
+    assert process_job("job-edge", edge.files, base_dir=tmp_path / "data").rows_total == 200
+    assert [spec.variant for spec in build_cases([1], ["pdf"])] == ["clean"]
+
+
+def test_suite_results_are_json_ready(tmp_path):
+    cases = build_cases([1, 2], ["txt"], ["clean"], lines_per_document=5)
+    results = run_suite(cases, repeat=2, workdir=tmp_path)
+
+    assert [entry["name"] for entry in results["results"]] == ["txt-clean-1", "txt-clean-2"]
+    entry = results["results"][1]
+    assert (entry["documents"], entry["rows"]) == (2, 10)
+    assert list(entry["stages_ms"]) == ["render", "ocr", "segment", "extract", "normalize", "validate", "write"]
+    assert json.loads(json.dumps(results)) == results
+
+    assert over_budget(results, budget=0) == ["txt-clean-1"]
+
+
+def test_baseline_comparison_flags_slower_cases_and_stages():
+    results = {
+        "results": [
+            {"name": name, "documents": 1, "wall_s": 0.0, "stages_ms": {"extract": 0.0, "write": 0.0}}
+            for name in ("txt-clean-1", "txt-clean-2")
+        ]
+    }
+    baseline = _timed(results, 0.5, 100.0)
+
+    assert compare(baseline, baseline) == []
+    assert compare(_timed(results, 0.6, 120.0), baseline, tolerance=0.25) == []
+    regressions = compare(_timed(results, 1.0, 100.0), baseline, tolerance=0.25)
+    assert {(regression.case, regression.metric) for regression in regressions} == {
+        ("txt-clean-1", "wall_s"),
+        ("txt-clean-2", "wall_s"),
+    }
+    slower_stages = compare(_timed(results, 0.5, 200.0), baseline, tolerance=0.25)
+    assert {regression.metric for regression in slower_stages} == {"stage:extract", "stage:write"}
+    # Both sides under the noise floor never count, however large the ratio.
+    assert compare(_timed(results, 0.009, 9.0), _timed(results, 0.001, 1.0)) == []
+
+
+def test_command_line_writes_results_and_flags_regressions(tmp_path, capsys, monkeypatch):
+    output = tmp_path / "results.json"
+    args = ["--sizes", "1", "--formats", "txt", "--variants", "clean", "--lines", "5", "--repeat", "1"]
+
+    assert main([*args, "--output", str(output), "--workdir", str(tmp_path)]) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    (tmp_path / "baseline.json").write_text(json.dumps(_timed(results, 0.5, 1.0)), encoding="utf-8")
+
+    monkeypatch.setattr(bench_main, "run_suite", lambda *_args, **_kwargs: _timed(results, 1.0, 1.0))
+    assert main([*args, "--baseline", str(tmp_path / "baseline.json"), "--workdir", str(tmp_path)]) == 1
+    assert "REGRESSION txt-clean-1 wall_s" in capsys.readouterr().err
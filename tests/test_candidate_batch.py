@@ -0,0 +1,58 @@
+from helpers import random_raw_rows
+from worker.src import normalizer, validator, writer
+from worker.src.batch import FLAG_ERR, FLAG_OK, FLAG_WARN, CandidateBatch
+from worker.src.types import CANDIDATE_FIELDS
+
+
+def _batch_from(rows):
+    return CandidateBatch.from_columns(
+        {name: [getattr(row, name) for row in rows] for name in CANDIDATE_FIELDS}
+    )
+
+
+def test_batch_pipeline_matches_row_pipeline():
+    rows = random_raw_rows(11)
+    expected = validator.validate_rows(normalizer.normalize_rows(rows))
+
+    batch = _batch_from(rows)
+    normalizer.normalize_batch(batch)
+    validator.validate_batch(batch)
+
+    assert batch.to_rows() == expected
+    assert validator.summarise_batch(batch, ocr_conf_mean=None) == validator.summarise_validation(expected)
+
+
+def test_batch_csv_matches_row_csv(tmp_path):
+    rows = validator.validate_rows(normalizer.normalize_rows(random_raw_rows(5, count=50)))
+    batch = CandidateBatch.from_rows(rows)
+
+    row_csv = writer.write_csv("rows", rows, tmp_path)
+    batch_csv = writer.write_batch_csv("batch", batch, tmp_path)
+
+    assert batch_csv.read_bytes() == row_csv.read_bytes()
+
+
+def test_flags_are_small_int_codes():
+    batch = CandidateBatch()
+    batch.append(("1508", "AM", "2", "XYZ", None, "Lista", 1, "Ana", None, "0"))
+
+    validator.validate_batch(batch)
+
+    assert batch.flags["DTMNFR"][0] == FLAG_WARN
+    assert batch.flags["SIGLA"][0] == FLAG_ERR
+    assert batch.flags["ORGAO"][0] == FLAG_OK
+    assert list(batch.worst_flags()) == [FLAG_ERR]
+    assert batch.row(0).validation["SIGLA"] == "ERRO"
+
+
+def test_take_reorders_columns_and_flags():
+    batch = CandidateBatch()
+    for name in ("A", "B", "C"):
+        batch.append(("150800", "AM", "2", "PS", None, "Lista", 1, name, None, "0"))
+    batch.flags["SIGLA"][2] = FLAG_ERR
+
+    batch.take([2, 0, 1])
+
+    assert batch.columns["NOME_CANDIDATO"] == ["C", "A", "B"]
+    assert list(batch.flags["SIGLA"]) == [FLAG_ERR, FLAG_OK, FLAG_OK]
+    assert len(batch) == 3
@@ -0,0 +1,141 @@
+import io
+import os
+import threading
+import zipfile
+
+import pytest
+
+from api.app.services.jobs import store_upload
+from worker.src import ocr_stub
+from worker.src import blobs as blobs_module
+from worker.src.blobs import BlobStore, blobs_dir
+from worker.src.ocr_cache import OCRCache
+from worker.src.pipeline import process_job
+from worker.src.renderer import render_documents
+
+
+def _inputs(tmp_path):
+    first = tmp_path / "a" / "lista.pdf"
+    first.parent.mkdir()
+    first.write_bytes(b"%PDF-1.4 same scan")
+    second = tmp_path / "b" / "lista.pdf"
+    second.parent.mkdir()
+    second.write_bytes(first.read_bytes())
+    text = tmp_path / "extra.txt"
+    text.write_text("DTMNFR=150800;NUM_ORDEM=9;NOME_CANDIDATO=Eva", encoding="utf-8")
+    archive = tmp_path / "lote.zip"
+    with zipfile.ZipFile(archive, "w") as handle:
+        handle.write(first, "lote/lista.pdf")
+    return [first, text, second, archive]
+
+
+def test_uploads_are_stored_once_and_linked_per_job(tmp_path):
+    one = store_upload("job-1", "lista.pdf", io.BytesIO(b"%PDF same"), tmp_path)
+    two = store_upload("job-2", "..\\copia.pdf", io.BytesIO(b"%PDF same"), tmp_path)
+    other = store_upload("job-3", "outra.pdf", io.BytesIO(b"%PDF other"), tmp_path)
+
+    assert two == tmp_path / "uploads" / "job-2" / "copia.pdf"
+    assert os.path.samefile(one, two)
+    assert not os.path.samefile(one, other)
+    blobs = BlobStore(blobs_dir(tmp_path))
+    assert len(list(blobs.root.glob("*/*"))) == 2
+
+    digest, _ = blobs.put(io.BytesIO(b"%PDF same"))
+    assert blobs.references(digest) == 2
+    one.unlink()
+    two.unlink()
+    assert blobs.collect() == 1
+    assert blobs.references(digest) is None
+    assert other.read_bytes() == b"%PDF other"
+
+
+@pytest.mark.skipif(blobs_module.fcntl is None, reason="needs fcntl locks")
+def test_collect_waits_for_blobs_being_linked(tmp_path):
+    blobs = BlobStore(tmp_path)
+    digest, blob = blobs.put(io.BytesIO(b"%PDF same"))
+
+    with blobs._locked():
+        collector = threading.Thread(target=blobs.collect)
+        collector.start()
+        collector.join(timeout=0.2)
+        assert collector.is_alive()
+        blobs._link(digest, tmp_path / "uploads" / "job" / "lista.pdf")
+    collector.join()
+
+    assert blob.exists() and blobs.references(digest) == 1
+
+
+def _counting_ocr(monkeypatch):
+    calls = []
+    original = ocr_stub._ocr_document
+
+    def counting(job_id, artifact):
+        calls.append(artifact.document_id)
+        return original(job_id, artifact)
+
+    monkeypatch.setattr(ocr_stub, "_ocr_document", counting)
+    return calls
+
+
+def test_identical_documents_are_ocrd_once_in_order(tmp_path, monkeypatch):
+    files = _inputs(tmp_path)
+    calls = _counting_ocr(monkeypatch)
+    pages = ocr_stub.run_ocr("job", render_documents("job", files), workers=0)
+
+    assert calls == [str(files[0]), str(files[1])]
+    assert [page.document_id for page in pages] == [
+        str(files[0]),
+        str(files[1]),
+        str(files[2]),
+        f"{files[3]}!lote/lista.pdf",
+    ]
+    assert pages[0].text == pages[2].text == pages[3].text
+
+
+def test_dedup_only_remembers_the_latest_documents(tmp_path, monkeypatch):
+    files = _inputs(tmp_path)
+    other = tmp_path / "c" / "lista.pdf"
+    other.parent.mkdir()
+    other.write_bytes(b"%PDF-1.4 another scan")
+    documents = [files[0], other, files[2], files[2]]
+    monkeypatch.setattr(ocr_stub, "DEDUP_WINDOW", 1)
+
+    cache = OCRCache(tmp_path / "cache", ocr_stub.OCR_ENGINE_VERSION)
+    ocr_stub.run_ocr("job", render_documents("job", documents), workers=2, cache=cache)
+    assert cache.misses == 3
+
+    calls = _counting_ocr(monkeypatch)
+    pages = ocr_stub.run_ocr("job", render_documents("job", documents), workers=0)
+    assert calls == [str(files[0]), str(other), str(files[2])]
+    assert pages[2].text == pages[3].text
+
+
+def test_renamed_copies_keep_their_own_labels(tmp_path, monkeypatch):
+    first = _inputs(tmp_path)[0]
+    renamed = tmp_path / "copia.pdf"
+    renamed.write_bytes(first.read_bytes())
+    calls = _counting_ocr(monkeypatch)
+
+    pages = ocr_stub.run_ocr("job", render_documents("job", [first, renamed]), workers=0)
+
+    assert calls == [str(first), str(renamed)]
+    assert "Lista LISTA;" in pages[0].text and "Lista COPIA;" in pages[1].text
+
+
+def test_pool_reuses_inflight_results_for_duplicates(tmp_path):
+    files = _inputs(tmp_path)
+    cache = OCRCache(tmp_path / "cache", ocr_stub.OCR_ENGINE_VERSION)
+
+    pooled = ocr_stub.run_ocr("job", render_documents("job", files), workers=2, cache=cache)
+
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert pooled == ocr_stub.run_ocr("job", render_documents("job", files), workers=0)
+
+
+def test_duplicate_documents_keep_their_rows(tmp_path):
+    files = _inputs(tmp_path)
+
+    result = process_job("job-dup", files, base_dir=tmp_path / "data")
+
+    assert result.pages_processed == 4
+    assert result.rows_total == 7
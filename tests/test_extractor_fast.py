@@ -0,0 +1,86 @@
+import random
+import re
+
+from worker.src import extractor
+from worker.src.types import CANDIDATE_FIELDS, CandidateRow
+
+_KEYS = list(CANDIDATE_FIELDS) + ["OUTRO", "orgao", "DTMNFRX", "NOME", "X1"]
+_PIECES = [";", "|", " ", "  ", "\t", "\n", "=", " = ", " ", "a", "Lista B", "150800", "7", "x;y", "é"]
+
+
+_TOKEN_SPLIT = re.compile(r"[;|]\s*")
+_KEY_VALUE = re.compile(r"(?P<key>[A-Z0-9_]+)\s*=\s*(?P<value>.+)")
+
+
+def _reference_row(segment):
+    """The original token-by-token parser the single-pass scan replaced."""
+
+    values = {}
+    for token in _TOKEN_SPLIT.split(segment):
+        token = token.strip()
+        match = _KEY_VALUE.match(token) if token else None
+        if match and match.group("key") in CANDIDATE_FIELDS:
+            values[match.group("key")] = match.group("value").strip()
+    return CandidateRow(*extractor._field_values(values))
+
+
+def _random_segment(rng):
+    parts = []
+    for _ in range(rng.randint(0, 8)):
+        kind = rng.random()
+        if kind < 0.6:
+            key = rng.choice(_KEYS)
+            sep = rng.choice(["=", " =", "= ", " = ", "=\n", ""])
+            value = "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 4)))
+            parts.append(f"{rng.choice(['', ' ', chr(10)])}{key}{sep}{value}")
+        else:
+            parts.append("".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 3))))
+        parts.append(rng.choice([";", "|", "; ", "|  ", ";;", ""]))
+    return "".join(parts)
+
+
+EDGE_CASES = [
+    "",
+    "DTMNFR=150800;ORGAO=am;SIGLA=PS;TIPO=2;NUM_ORDEM=3;NOME_CANDIDATO=Ana",
+    "DTMNFR = 150800 | ORGAO= CM |SIGLA =PSD",
+    "SIGLA=PS;SIGLA= ;SIGLA=",
+    "SIGLA=PS;SIGLA=BE",
+    "  NOME_LISTA=Lista A=B ; NUM_ORDEM=abc",
+    "NUM_ORDEM=-4;TIPO=3",
+    "x NOME_CANDIDATO=Ignored;NOME_CANDIDATO=Kept",
+    "NOME_CANDIDATO=\nLinha;SIMBOLO=a\nb",
+    "ORGAO_X=CM;DTMNFRX=1;dtmnfr=2",
+    "SIMBOLO=  ;PARTIDO_PROPONENTE= PS ",
+]
+
+
+def test_scan_matches_reference_parser_on_edge_cases():
+    for segment in EDGE_CASES:
+        assert next(extractor.iter_candidates([segment])) == _reference_row(segment), segment
+
+
+def test_scan_matches_reference_parser_on_random_segments():
+    rng = random.Random(20241018)
+    for _ in range(5000):
+        segment = _random_segment(rng)
+        fast = next(extractor.iter_candidates([segment]))
+        assert fast == _reference_row(segment), repr(segment)
+
+
+def test_extract_columns_matches_row_extraction():
+    rng = random.Random(7)
+    segments = EDGE_CASES + [_random_segment(rng) for _ in range(500)]
+
+    rows = extractor.extract_candidates(segments)
+    columns = extractor.extract_columns(segments)
+
+    assert list(columns) == list(CANDIDATE_FIELDS)
+    for name in CANDIDATE_FIELDS:
+        assert columns[name] == [getattr(row, name) for row in rows]
+
+
+def test_extract_columns_uses_default_rows_when_empty():
+    columns = extractor.extract_columns([])
+    rows = extractor.extract_candidates([])
+    assert columns["NOME_CANDIDATO"] == [row.NOME_CANDIDATO for row in rows]
+    assert len(columns["DTMNFR"]) == 2
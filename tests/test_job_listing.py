@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from worker.src.job_index import JobQuery, decode_cursor
+from worker.src.sqlite_storage import SQLiteJobStorage
+from worker.src.storage import JobMetadata, JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+BASE = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+def _populate(storage, count=30):
+    states = [JobState.ready, JobState.failed, JobState.queued]
+    for index in range(count):
+        job_id = f"job-{index:03d}"
+        storage.ensure(job_id, [])
+        error = "OCR falhou" if index % 4 == 0 else None
+        storage.mark_state(job_id, states[index % 3], error=error)
+
+
+def _pages(storage, query):
+    seen = []
+    while True:
+        page = storage.query_jobs(query)
+        seen.extend(page.items)
+        if page.next_cursor is None:
+            return seen
+        query = JobQuery(**{**query.__dict__, "cursor": page.next_cursor})
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStorage(tmp_path)
+    return JobStorage(tmp_path)
+
+
+def test_keyset_pages_cover_every_job_once_in_order(storage):
+    _populate(storage)
+
+    jobs = _pages(storage, JobQuery(limit=7))
+
+    assert len(jobs) == 30
+    assert len({meta.job_id for meta in jobs}) == 30
+    keys = [(meta.updated_at, meta.job_id) for meta in jobs]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_filters_by_state_error_and_date_range(storage):
+    _populate(storage)
+    everything = storage.list_jobs()
+
+    failed = _pages(storage, JobQuery(state=JobState.failed, limit=4))
+    assert {meta.job_id for meta in failed} == {m.job_id for m in everything if m.state == JobState.failed}
+
+    with_error = _pages(storage, JobQuery(has_error=True, limit=3))
+    assert {meta.job_id for meta in with_error} == {m.job_id for m in everything if m.error}
+    without_error = _pages(storage, JobQuery(has_error=False, state=JobState.ready))
+    assert all(meta.error is None and meta.state == JobState.ready for meta in without_error)
+
+    ordered = sorted(everything, key=lambda meta: meta.updated_at)
+    window = _pages(storage, JobQuery(updated_from=ordered[5].updated_at, updated_to=ordered[15].updated_at))
+    assert {meta.job_id for meta in window} == {meta.job_id for meta in ordered[5:15]}
+
+
+def test_updates_move_jobs_without_breaking_later_pages(storage):
+    _populate(storage, count=10)
+    first = storage.query_jobs(JobQuery(limit=4))
+
+    storage.update(first.items[0].job_id, pages=1)
+    rest = _pages(storage, JobQuery(limit=4, cursor=first.next_cursor))
+
+    assert {meta.job_id for meta in first.items} | {meta.job_id for meta in rest} == {
+        f"job-{index:03d}" for index in range(10)
+    }
+    assert not {meta.job_id for meta in first.items} & {meta.job_id for meta in rest}
+
+
+def test_json_index_is_rebuilt_for_an_existing_tree(tmp_path):
+    storage = JobStorage(tmp_path)
+    _populate(storage, count=5)
+    storage.close()
+    (tmp_path / "jobs_index.sqlite3").unlink()
+
+    reopened = JobStorage(tmp_path)
+    assert not (tmp_path / "jobs_index.sqlite3").exists()
+
+    assert [meta.job_id for meta in reopened.list_jobs()] == [meta.job_id for meta in storage.list_jobs()]
+
+
+def test_bad_cursor_is_rejected(storage):
+    with pytest.raises(ValueError):
+        storage.query_jobs(JobQuery(cursor="not-a-cursor"))
+
+
+def test_deep_pages_use_the_state_index(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    storage.import_jobs(
+        JobMetadata(
+            job_id=f"job-{index:05d}",
+            state=JobState.ready,
+            created_at=BASE,
+            updated_at=BASE + timedelta(seconds=index),
+        )
+        for index in range(2000)
+    )
+    cursor = storage.query_jobs(JobQuery(state=JobState.ready, limit=500)).next_cursor
+    cursor = storage.query_jobs(JobQuery(state=JobState.ready, limit=500, cursor=cursor)).next_cursor
+
+    assert decode_cursor(cursor)[1] == "job-01000"
+    with storage.index.connect() as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT job_id FROM jobs WHERE state = ? AND (updated_at, job_id) < (?, ?) "
+            "ORDER BY updated_at DESC, job_id DESC LIMIT 51",
+            ("ready", *decode_cursor(cursor)),
+        ).fetchall()
+    details = " ".join(str(row) for row in plan)
+    assert "jobs_state_updated" in details
+    assert "TEMP B-TREE" not in details
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_list_jobs_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    _populate(JobStorage(tmp_path), count=12)
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/jobs", params={"state": "ready", "limit": 2})
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["state"] for item in payload["items"]] == ["ready", "ready"]
+    assert payload["next_cursor"]
+
+    second = client.get("/api/jobs", params={"state": "ready", "limit": 2, "cursor": payload["next_cursor"]})
+    ids = [item["job_id"] for item in payload["items"] + second.json()["items"]]
+    assert len(set(ids)) == 4
+
+    errors = client.get("/api/jobs", params={"has_error": "true"}).json()
+    assert errors["items"] and all(item["error"] for item in errors["items"])
+    assert errors["next_cursor"] is None
+
+    assert client.get("/api/jobs", params={"cursor": "garbage"}).status_code == 400
+    assert client.get("/api/jobs", params={"state": "nope"}).status_code == 422
+    assert client.get("/api/jobs/job-000").status_code == 200
@@ -0,0 +1,159 @@
+import time
+
+import pytest
+
+from worker.src.daemon import WorkerDaemon, backoff_delay
+from worker.src.job_queue import DEAD, DONE, LEASED, PENDING, JobQueue, queue_path
+from worker.src.storage import JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+LINE = "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Ana"
+
+
+def flaky_runner(job_id, files, base_dir):
+    """Fails on the first attempt of ``flaky-*`` jobs and always for ``broken-*``."""
+
+    marker = f"{base_dir}/{job_id}.attempts"
+    with open(marker, "a") as handle:
+        handle.write("x")
+    with open(marker) as handle:
+        attempts = len(handle.read())
+    if job_id.startswith("broken") or (job_id.startswith("flaky") and attempts == 1):
+        raise RuntimeError(f"attempt {attempts} failed")
+    return attempts
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(queue_path(tmp_path))
+
+
+def test_lease_hides_entries_until_completed(queue):
+    queue.enqueue("a", ["a.pdf"])
+    queue.enqueue("b", ["b.pdf"])
+
+    first = queue.lease("w1", host="h", visibility_timeout=60)
+    second = queue.lease("w2", host="h", visibility_timeout=60)
+    assert (first.job_id, first.files, first.attempts) == ("a", ["a.pdf"], 1)
+    assert second.job_id == "b"
+    assert queue.lease("w1", host="h", visibility_timeout=60) is None
+
+    assert not queue.complete("a", "w2")
+    assert queue.complete("a", "w1")
+    assert queue.counts() == {PENDING: 0, LEASED: 1, DONE: 1, DEAD: 0}
+
+
+def test_failures_back_off_then_go_dead(queue):
+    queue.enqueue("a", [], max_attempts=2)
+
+    job = queue.lease("w", host="h", visibility_timeout=60)
+    assert queue.fail("a", "w", "boom", retry_delay=60) == PENDING
+    assert queue.lease("w", host="h", visibility_timeout=60) is None
+
+    queue.enqueue("b", [], max_attempts=2)
+    queue.lease("w", host="h", visibility_timeout=60)
+    assert queue.fail("b", "w", "boom", retry_delay=0) == PENDING
+    job = queue.lease("w", host="h", visibility_timeout=60)
+    assert (job.job_id, job.attempts, job.last_error) == ("b", 2, "boom")
+    assert queue.fail("b", "w", "boom again", retry_delay=0) == DEAD
+    assert queue.status("b") == DEAD
+
+    assert [backoff_delay(attempt, 5, 30) for attempt in (1, 2, 3, 4)] == [5, 10, 20, 30]
+
+
+def test_expired_leases_are_reaped(queue):
+    queue.enqueue("a", [], max_attempts=2)
+    queue.enqueue("b", [], max_attempts=1)
+    queue.lease("w1", host="h", visibility_timeout=0)
+    queue.lease("w1", host="h", visibility_timeout=0)
+    time.sleep(0.01)
+
+    dead = queue.reap_expired()
+    assert [job.job_id for job in dead] == ["b"]
+    assert queue.status("a") == PENDING
+    assert not queue.heartbeat("a", "w1", 60)
+
+    job = queue.lease("w2", host="h", visibility_timeout=60)
+    assert (job.job_id, job.attempts, job.last_error) == ("a", 2, "visibility timeout expired")
+
+
+def test_host_limit_and_release(queue):
+    for job_id in ("a", "b", "c"):
+        queue.enqueue(job_id, [])
+
+    assert queue.lease("w1", host="h1", visibility_timeout=60, host_limit=1).job_id == "a"
+    assert queue.lease("w2", host="h1", visibility_timeout=60, host_limit=1) is None
+    assert queue.lease("w3", host="h2", visibility_timeout=60, host_limit=1).job_id == "b"
+
+    assert queue.release("a", "w1")
+    job = queue.lease("w2", host="h1", visibility_timeout=60, host_limit=1)
+    assert (job.job_id, job.attempts) == ("a", 1)
+
+
+def test_daemon_processes_queued_jobs(tmp_path):
+    storage = JobStorage(tmp_path)
+    queue = JobQueue(queue_path(tmp_path))
+    for index in range(3):
+        source = tmp_path / f"input-{index}.txt"
+        source.write_text(LINE, encoding="utf-8")
+        storage.ensure(f"job-{index}", [source])
+        queue.enqueue(f"job-{index}", [source])
+
+    daemon = WorkerDaemon(tmp_path, concurrency=2, poll_interval=0.05, queue=queue, storage=storage)
+    daemon.run(until_idle=True)
+
+    assert daemon.completed == 3
+    assert queue.counts()[DONE] == 3
+    assert {storage.load(f"job-{index}").state for index in range(3)} == {JobState.ready}
+
+
+def test_daemon_retries_and_gives_up(tmp_path):
+    storage = JobStorage(tmp_path)
+    queue = JobQueue(queue_path(tmp_path))
+    for job_id in ("flaky-1", "broken-1"):
+        storage.ensure(job_id, [])
+        queue.enqueue(job_id, [], max_attempts=2)
+
+    daemon = WorkerDaemon(
+        tmp_path,
+        concurrency=2,
+        poll_interval=0.05,
+        backoff_base=0,
+        queue=queue,
+        storage=storage,
+        runner=flaky_runner,
+    )
+    daemon.run(until_idle=True)
+
+    assert (daemon.completed, daemon.failed) == (1, 3)
+    assert queue.status("flaky-1") == DONE
+    assert queue.status("broken-1") == DEAD
+    failed = storage.load("broken-1")
+    assert failed.state is JobState.failed
+    assert failed.error == "RuntimeError: attempt 2 failed"
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_post_jobs_stores_the_upload_and_enqueues(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    response = client.post("/api/jobs", files={"file": ("../listas.txt", LINE.encode("utf-8"), "text/plain")})
+    assert response.status_code == 201
+    payload = response.json()
+    assert payload["status"] == "queued"
+
+    upload = tmp_path / "uploads" / payload["job_id"] / "listas.txt"
+    assert upload.read_text(encoding="utf-8") == LINE
+    queue = JobQueue(queue_path(tmp_path))
+    job = queue.lease("w", host="h", visibility_timeout=60)
+    assert (job.job_id, job.files) == (payload["job_id"], [str(upload)])
+
+    rejected = client.post("/api/jobs", files={"file": ("virus.exe", b"MZ", "application/octet-stream")})
+    assert rejected.status_code == 415
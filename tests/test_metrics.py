@@ -0,0 +1,112 @@
+import errno
+import multiprocessing
+
+import pytest
+
+from worker.src import metrics
+from worker.src.metrics import (
+    API_LATENCY,
+    JOB_DURATION,
+    ROWS_PROCESSED,
+    MetricsRegistry,
+    collect,
+    metrics_dir,
+    render_metrics,
+)
+from worker.src.pipeline import process_job
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+
+def _record_rows(directory, count):
+    registry = MetricsRegistry(directory)
+    for _ in range(count):
+        registry.inc(ROWS_PROCESSED, 10)
+    registry.observe(JOB_DURATION, 0.3, state="ready")
+    registry.close()
+
+
+def test_samples_are_summed_across_processes(tmp_path):
+    directory = metrics_dir(tmp_path)
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_record_rows, args=(directory, 5)) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    _record_rows(directory, 1)
+
+    assert len(list(directory.glob("*.db"))) == 3
+    text = render_metrics(directory)
+    assert "cne_rows_processed_total 110" in text.splitlines()
+    assert 'cne_job_duration_seconds_bucket{state="ready",le="0.25"} 0' in text
+    assert 'cne_job_duration_seconds_bucket{state="ready",le="0.5"} 3' in text
+    assert 'cne_job_duration_seconds_bucket{state="ready",le="+Inf"} 3' in text
+    assert 'cne_job_duration_seconds_count{state="ready"} 3' in text
+    assert "# TYPE cne_api_request_duration_seconds histogram" in text
+
+
+def test_value_file_grows_and_reopens(tmp_path):
+    registry = MetricsRegistry(tmp_path)
+    for index in range(3000):
+        registry.observe(API_LATENCY, 0.002, handler=f"handler_{index}")
+    registry.close()
+
+    reopened = MetricsRegistry(tmp_path)
+    reopened.observe(API_LATENCY, 0.002, handler="handler_0")
+    totals = collect(tmp_path)
+    assert totals['["cne_api_request_duration_seconds_count",{"handler":"handler_0"}]'] == 2
+    assert len(totals) == 3 * 3000
+
+
+def test_a_file_that_cannot_grow_drops_samples_instead_of_raising(tmp_path, monkeypatch, caplog):
+    registry = MetricsRegistry(tmp_path)
+    registry.inc(ROWS_PROCESSED, 10)
+
+    def disk_full(fd, length):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(metrics.os, "ftruncate", disk_full)
+    for index in range(3000):
+        registry.observe(API_LATENCY, 0.002, handler=f"handler_{index}")
+    registry.inc(ROWS_PROCESSED, 10)
+
+    assert "Cannot write the metrics file" in caplog.text
+    assert collect(tmp_path)['["cne_rows_processed_total",{}]'] == 10
+
+
+def test_pipeline_runs_feed_the_shared_metrics(tmp_path):
+    source = tmp_path / "lista.txt"
+    source.write_text("DTMNFR=150800;NUM_ORDEM=1;NOME_CANDIDATO=Ana\nDTMNFR=150800;NUM_ORDEM=2;NOME_CANDIDATO=Rui")
+
+    process_job("job-1", [source], base_dir=tmp_path / "data", instrument=True)
+
+    text = render_metrics(metrics_dir(tmp_path / "data"))
+    assert "cne_rows_processed_total 2" in text.splitlines()
+    assert 'cne_stage_duration_seconds_count{stage="ocr"} 1' in text
+    assert 'cne_ocr_page_confidence_bucket{le="0.99"} 1' in text
+    assert 'cne_job_rows_per_second_count 1' in text
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_metrics_and_health_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    health = client.get("/api/health").json()
+    assert health["status"] == "ok" and health["uptime_seconds"] >= 0
+    client.get("/api/jobs/missing")
+    client.get("/api/models/history")
+
+    response = client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    assert 'cne_api_request_duration_seconds_count{handler="read_job"} 1' in text
+    assert 'cne_api_request_duration_seconds_count{handler="get_history"} 1' in text
+    assert 'cne_queue_jobs{job_class="small",status="pending"} 0' in text
@@ -0,0 +1,103 @@
+import os
+
+from worker.src import ocr_stub
+from worker.src.ocr_cache import OCRCache, file_sha256
+from worker.src.pipeline import process_job
+from worker.src.renderer import render_documents
+from worker.src.storage import JobStorage
+from worker.src.types import OCRPage
+
+
+def test_cache_round_trip_and_engine_version(tmp_path):
+    cache = OCRCache(tmp_path / "cache", "engine-1")
+    pages = [OCRPage(document_id="a.pdf", page_number=1, text="DTMNFR=150800", confidence=0.93)]
+
+    assert cache.get("abc", document_id="a.pdf") is None
+    cache.put("abc", pages)
+
+    cached = cache.get("abc", document_id="b.pdf")
+    assert cached == [OCRPage(document_id="b.pdf", page_number=1, text="DTMNFR=150800", confidence=0.93)]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    upgraded = OCRCache(tmp_path / "cache", "engine-2")
+    assert upgraded.get("abc", document_id="a.pdf") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = OCRCache(tmp_path / "cache", "engine-1", max_bytes=10_000)
+    page = OCRPage(document_id="x", page_number=1, text="x" * 3_000, confidence=0.9)
+    for index, digest in enumerate(("first", "second", "third")):
+        cache.put(digest, [page])
+        entry = cache._entry_path(digest)
+        os.utime(entry, ns=(index * 10**9, index * 10**9))
+    cache.get("first", document_id="x")
+
+    cache.put("fourth", [page])
+
+    assert cache.size_bytes() <= 10_000
+    assert cache.get("second", document_id="x") is None
+    assert cache.get("first", document_id="x") is not None
+    assert cache.get("fourth", document_id="x") is not None
+
+
+def test_putting_an_entry_again_does_not_count_it_twice(tmp_path):
+    cache = OCRCache(tmp_path / "cache", "engine-1", max_bytes=10_000)
+    page = OCRPage(document_id="x", page_number=1, text="x" * 3_000, confidence=0.9)
+    cache.put("kept", [page])
+    for _ in range(5):
+        cache.put("again", [page])
+
+    assert cache._size == cache.size_bytes()
+    assert cache.get("kept", document_id="x") is not None
+
+
+def test_identical_bytes_under_another_name_keep_their_own_label(tmp_path):
+    alpha = tmp_path / "alpha.pdf"
+    alpha.write_bytes(b"%PDF-1.4 same bytes")
+    beta = tmp_path / "beta.pdf"
+    beta.write_bytes(alpha.read_bytes())
+    base = tmp_path / "data"
+
+    process_job("job-a", [alpha], base_dir=base)
+    result = process_job("job-b", [beta], base_dir=base)
+
+    text = result.csv_path.read_text(encoding="utf-8")
+    assert "Lista BETA" in text and "Lista ALPHA" not in text
+    assert JobStorage(base).load("job-b").stats["ocr_cache_misses"] == 1
+
+
+def test_run_ocr_skips_work_on_cache_hit(tmp_path, monkeypatch):
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF-1.4 same bytes")
+    copy = tmp_path / "resubmitted" / "scan.pdf"
+    copy.parent.mkdir()
+    copy.write_bytes(scan.read_bytes())
+    cache = OCRCache(tmp_path / "cache", ocr_stub.OCR_ENGINE_VERSION)
+
+    first = ocr_stub.run_ocr("job", render_documents("job", [scan]), cache=cache)
+
+    def fail(*_args):
+        raise AssertionError("OCR should not run on a cache hit")
+
+    monkeypatch.setattr(ocr_stub, "_ocr_document", fail)
+    second = ocr_stub.run_ocr("job", render_documents("job", [copy]), cache=cache)
+
+    assert second[0].text == first[0].text
+    assert second[0].document_id == str(copy)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert file_sha256(scan) == file_sha256(copy)
+
+
+def test_process_job_reports_cache_counters(tmp_path):
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF-1.4")
+    base = tmp_path / "data"
+
+    process_job("job-a", [scan], base_dir=base)
+    process_job("job-b", [scan], base_dir=base)
+
+    storage = JobStorage(base)
+    first = storage.load("job-a").stats
+    second = storage.load("job-b").stats
+    assert (first["ocr_cache_hits"], first["ocr_cache_misses"]) == (0, 1)
+    assert (second["ocr_cache_hits"], second["ocr_cache_misses"]) == (1, 0)
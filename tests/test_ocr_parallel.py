@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+
+import pytest
+
+from worker.src import ocr_stub
+from worker.src.pipeline import process_job
+from worker.src.renderer import render_documents
+
+
+_STUB_TEXT = ocr_stub._stub_text
+
+
+def _exit_on_crash(job_id, artifact):
+    """Stand-in for ``_stub_text`` that kills the worker OCR'ing ``crash.pdf``."""
+
+    if artifact.name.stem == "crash":
+        os._exit(1)
+    return _STUB_TEXT(job_id, artifact)
+
+
+def _inputs(tmp_path, count=6):
+    paths = []
+    for index in range(count):
+        if index % 3 == 2:
+            path = tmp_path / f"scan-{index}.pdf"
+            path.write_bytes(b"%PDF")
+        else:
+            path = tmp_path / f"doc-{index}.txt"
+            path.write_text(
+                f"DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM={index};NOME_CANDIDATO=C{index}",
+                encoding="utf-8",
+            )
+        paths.append(path)
+    return paths
+
+
+def test_parallel_ocr_preserves_input_order(tmp_path):
+    artifacts = render_documents("job-par", _inputs(tmp_path))
+
+    sequential = ocr_stub.run_ocr("job-par", artifacts, workers=0)
+    parallel = ocr_stub.run_ocr("job-par", artifacts, workers=2)
+
+    assert parallel == sequential
+    assert [page.document_id for page in parallel] == [str(a.source_path) for a in artifacts]
+
+
+def test_failed_document_does_not_abort_the_batch(tmp_path, monkeypatch):
+    artifacts = render_documents("job-fail", _inputs(tmp_path, count=3))
+    original = ocr_stub._ocr_document
+
+    def flaky(job_id, artifact):
+        if artifact.source_path.name == "doc-1.txt":
+            raise RuntimeError("engine crashed")
+        return original(job_id, artifact)
+
+    monkeypatch.setattr(ocr_stub, "_ocr_document", flaky)
+    pages = ocr_stub.run_ocr("job-fail", artifacts, workers=0)
+
+    assert len(pages) == 3
+    assert pages[1].text == ""
+    assert pages[1].confidence == 0.0
+    assert "engine crashed" in pages[1].error
+    assert pages[0].error is None and pages[2].error is None
+
+
+def test_resolve_workers_reads_environment(monkeypatch):
+    monkeypatch.setenv(ocr_stub.OCR_WORKERS_ENV, "3")
+    assert ocr_stub.resolve_workers() == 3
+    assert ocr_stub.resolve_workers(1) == 1
+    monkeypatch.setenv(ocr_stub.OCR_WORKERS_ENV, "many")
+    assert ocr_stub.resolve_workers() == 0
+
+
+def test_process_job_with_ocr_pool_matches_inline(tmp_path):
+    files = _inputs(tmp_path)
+
+    inline = process_job("job-inline", files, base_dir=tmp_path / "inline", ocr_workers=0)
+    pooled = process_job("job-inline", files, base_dir=tmp_path / "pooled", ocr_workers=2)
+
+    assert pooled.csv_path.read_bytes() == inline.csv_path.read_bytes()
+    assert pooled.pages_processed == inline.pages_processed == len(files)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="needs forked OCR workers")
+def test_dying_worker_only_fails_its_own_document(tmp_path, monkeypatch):
+    paths = []
+    for stem in ("a", "crash", "b", "c", "d"):
+        path = tmp_path / f"{stem}.pdf"
+        path.write_bytes(f"%PDF {stem}".encode("ascii"))
+        paths.append(path)
+    artifacts = render_documents("job-crash", paths)
+    monkeypatch.setattr(ocr_stub, "_stub_text", _exit_on_crash)
+
+    pages = list(ocr_stub.iter_ocr("job-crash", artifacts, workers=2))
+
+    assert [page.document_id for page in pages] == [str(a.source_path) for a in artifacts]
+    assert "BrokenProcessPool" in pages[1].error
+    for page, stem in zip(pages[:1] + pages[2:], "abcd"):
+        assert page.error is None
+        assert f"NOME_LISTA=Lista {stem.upper()};" in page.text
+
+
+def test_failed_pages_are_left_out_of_the_confidence_mean(tmp_path, monkeypatch):
+    files = _inputs(tmp_path, count=3)
+    original = ocr_stub._ocr_document
+
+    def flaky(job_id, artifact):
+        if artifact.source_path.name == "scan-2.pdf":
+            raise RuntimeError("engine crashed")
+        return original(job_id, artifact)
+
+    monkeypatch.setattr(ocr_stub, "_ocr_document", flaky)
+    result = process_job("job-conf", files, base_dir=tmp_path / "data", ocr_workers=0)
+
+    assert result.ocr_conf_mean == 0.99
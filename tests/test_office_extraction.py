@@ -0,0 +1,141 @@
+import io
+import zipfile
+
+from worker.src import ocr_stub, office
+from worker.src.ocr_cache import OCRCache
+from worker.src.pipeline import process_job
+from worker.src.renderer import render_documents
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+S = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+R = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+
+HEADER = ["DTMNFR", "ORGAO", "SIGLA", "TIPO", "NUM_ORDEM", "NOME_LISTA", "NOME_CANDIDATO"]
+ROWS = [
+    ["150800", "AM", "PS", "2", "1", "Lista A", "Ana Silva"],
+    ["150800", "AM", "PS", "2", "2", "Lista A", "Bruno Costa"],
+    ["150800", "AM", "PS", "3", "1", "Lista A", "Carla Dias"],
+]
+
+
+def _paragraph(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def _write_docx(path, rows):
+    table = "".join(
+        "<w:tr>" + "".join(f"<w:tc>{_paragraph(cell)}</w:tc>" for cell in row) + "</w:tr>" for row in rows
+    )
+    body = (
+        f'<w:document {W}><w:body>{_paragraph("Listas de candidatos")}'
+        f"<w:tbl>{table}</w:tbl>{_paragraph('Fim')}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        package.writestr("word/document.xml", body)
+    return path
+
+
+def _write_xlsx(path, sheets):
+    strings = []
+
+    def cell(reference, value):
+        if value.isdigit():
+            return f'<c r="{reference}"><v>{value}</v></c>'
+        strings.append(value)
+        return f'<c r="{reference}" t="s"><v>{len(strings) - 1}</v></c>'
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        # Tabs are listed out of part order to check the workbook order wins.
+        workbook_sheets = "".join(
+            f'<sheet name="S{index}" sheetId="{index}" r:id="rId{index}"/>' for index in reversed(range(1, len(sheets) + 1))
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{index}" Target="worksheets/sheet{index}.xml"/>' for index in range(1, len(sheets) + 1)
+        )
+        for number, rows in enumerate(sheets, start=1):
+            data = "".join(
+                f'<row r="{line}">'
+                + "".join(cell(f"{chr(ord('A') + column)}{line}", value) for column, value in enumerate(row) if value)
+                + "</row>"
+                for line, row in enumerate(rows, start=1)
+            )
+            package.writestr(f"xl/worksheets/sheet{number}.xml", f"<worksheet {S}><sheetData>{data}</sheetData></worksheet>")
+        package.writestr("xl/workbook.xml", f"<workbook {S} {R}><sheets>{workbook_sheets}</sheets></workbook>")
+        package.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{rels}</Relationships>',
+        )
+        shared = "".join(f"<si><t>{value}</t></si>" for value in strings)
+        package.writestr("xl/sharedStrings.xml", f"<sst {S}>{shared}</sst>")
+    return path
+
+
+def _segment(row):
+    return ";".join(f"{key}={value}" for key, value in zip(HEADER, row))
+
+
+def test_docx_paragraphs_and_table_rows_become_segments(tmp_path):
+    path = _write_docx(tmp_path / "lista.docx", [HEADER, *ROWS])
+
+    with path.open("rb") as handle:
+        lines = list(office.iter_docx_lines(handle))
+
+    assert lines == ["Listas de candidatos", *(_segment(row) for row in ROWS), "Fim"]
+
+
+def test_xlsx_rows_follow_workbook_order_and_keep_gaps(tmp_path):
+    gapped = [HEADER, ["150800", "AM", "PS", "2", "4", "", "Duarte Reis"], ["", "", ""]]
+    path = _write_xlsx(tmp_path / "lista.xlsx", [[HEADER, *ROWS], gapped])
+
+    with path.open("rb") as handle:
+        lines = list(office.iter_xlsx_lines(handle))
+
+    assert lines == [
+        "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=4;NOME_CANDIDATO=Duarte Reis",
+        *(_segment(row) for row in ROWS),
+    ]
+
+
+def test_consumed_elements_are_detached_from_the_tree():
+    rows = "".join(f'<row r="{index}"><c r="A{index}"><v>{index}</v></c></row>' for index in range(1, 5001))
+    part = io.BytesIO(f"<worksheet {S}><sheetData>{rows}</sheetData></worksheet>".encode("utf-8"))
+    events = office._iter_events(part)
+    _event, root = next(events)
+
+    # Only rows the parser has read ahead of the events are still attached.
+    widest = 0
+    for event, element in events:
+        if event == "end" and office._local(element.tag) == "row":
+            widest = max(widest, len(root[0]))
+    assert widest < 1000
+    assert len(root) == 0
+
+
+def test_office_documents_skip_ocr_and_the_cache(tmp_path):
+    docx = _write_docx(tmp_path / "lista.docx", [HEADER, *ROWS])
+    xlsx = _write_xlsx(tmp_path / "lista.xlsx", [[HEADER, *ROWS]])
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a zip")
+    cache = OCRCache(tmp_path / "cache", ocr_stub.OCR_ENGINE_VERSION)
+
+    pages = ocr_stub.run_ocr("job", render_documents("job", [docx, xlsx, broken]), workers=2, cache=cache)
+
+    assert [page.confidence for page in pages[:2]] == [1.0, 1.0]
+    assert "Bruno Costa" in pages[0].text and "Bruno Costa" in pages[1].text
+    assert "Candidato Efetivo" not in pages[0].text
+    assert pages[2].error and pages[2].error.startswith("BadZipFile")
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_spreadsheet_job_produces_its_rows(tmp_path):
+    xlsx = _write_xlsx(tmp_path / "lista.xlsx", [[HEADER, *ROWS]])
+    archive = tmp_path / "lote.zip"
+    with zipfile.ZipFile(archive, "w") as handle:
+        handle.write(xlsx, "lote/lista.xlsx")
+
+    result = process_job("job-xlsx", [archive], base_dir=tmp_path / "data")
+
+    assert result.rows_total == len(ROWS)
+    assert result.ocr_conf_mean == 1.0
+    csv_text = result.csv_path.read_text(encoding="utf-8")
+    assert "Carla Dias" in csv_text
@@ -0,0 +1,91 @@
+import json
+from dataclasses import replace
+
+from worker.src import extractor, normalizer, ocr_stub, renderer, segmenter, validator, writer
+from worker.src import pipeline
+from worker.src.pipeline import process_job
+from worker.src.storage import JobState, JobStorage
+
+
+LINES = [
+    "DTMNFR=150800;ORGAO=CM;SIGLA=PSD;TIPO=2;NUM_ORDEM=2;NOME_LISTA=Lista B;NOME_CANDIDATO=Beatriz",
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=3;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Carlos",
+    "DTMNFR=1508;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=4;NOME_LISTA=Lista A;NOME_CANDIDATO=Ana",
+    "DTMNFR=150800;ORGAO=CM;SIGLA=PSD;TIPO=2;NUM_ORDEM=2;NOME_LISTA=Lista B;NOME_CANDIDATO=Bruno",
+    "DTMNFR=150800;ORGAO=XX;SIGLA=XYZ;TIPO=9;NOME_CANDIDATO=Daniel;INDEPENDENTE=talvez",
+    "DTMNFR=110600|ORGAO=AF|SIGLA=BE|TIPO=2|NUM_ORDEM=1|NOME_CANDIDATO=Eva",
+]
+
+
+def _write_inputs(tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text("\n".join(LINES[:3]), encoding="utf-8")
+    second = tmp_path / "second.csv"
+    second.write_text("\n".join(LINES[3:]), encoding="utf-8")
+    stub = tmp_path / "scan.pdf"
+    stub.write_bytes(b"%PDF")
+    return [first, second, stub]
+
+
+def test_process_job_streams_same_output_as_list_stages(tmp_path):
+    files = _write_inputs(tmp_path)
+    resolved = [path.resolve() for path in files]
+
+    artifacts = renderer.render_documents("job-list", resolved)
+    pages = ocr_stub.run_ocr("job-list", artifacts)
+    rows = normalizer.normalize_rows(extractor.extract_candidates(segmenter.segment_pages(pages)))
+    validated = validator.validate_rows(rows)
+    conf_mean = round(sum(page.confidence for page in pages) / len(pages), 4)
+    summary = validator.summarise_validation(validated, ocr_conf_mean=conf_mean)
+    expected_csv, _ = writer.write_outputs("job-list", validated, summary, tmp_path / "list")
+
+    result = process_job("job-list", files, base_dir=tmp_path / "stream")
+
+    assert result.csv_path.read_bytes() == expected_csv.read_bytes()
+    assert result.pages_processed == len(pages)
+    assert result.rows_total == summary["rows_total"]
+    assert result.ocr_conf_mean == summary["ocr_conf_mean"]
+
+    meta = json.loads((result.csv_path.parent / "meta.json").read_text(encoding="utf-8"))
+    assert meta["rows_err"] == summary["rows_err"]
+
+    stored = JobStorage(tmp_path / "stream").load("job-list")
+    assert stored.state is JobState.ready
+    assert stored.pages == len(pages)
+
+
+def test_iter_candidates_yields_defaults_for_empty_input():
+    assert list(extractor.iter_candidates(iter([]))) == extractor.extract_candidates([])
+
+
+def test_iter_column_chunks_splits_without_losing_rows():
+    segments = [f"DTMNFR=150800;NUM_ORDEM={number}" for number in range(1, 8)]
+
+    chunks = list(extractor.iter_column_chunks(segments, 3))
+
+    assert [len(chunk["NUM_ORDEM"]) for chunk in chunks] == [3, 3, 1]
+    assert sum((chunk["NUM_ORDEM"] for chunk in chunks), []) == extractor.extract_columns(segments)["NUM_ORDEM"]
+    assert len(list(extractor.iter_column_chunks(segments[:6], 3))) == 2
+    assert list(extractor.iter_column_chunks([], 3)) == [extractor.extract_columns([])]
+
+
+def test_large_jobs_are_merged_from_sorted_runs_with_the_same_output(tmp_path, monkeypatch):
+    lines = [
+        f"DTMNFR=15080{number % 3};ORGAO={'AM' if number % 2 else 'XX'};SIGLA={('PS', 'BE', 'ZZ')[number % 3]};"
+        f"TIPO=2;NUM_ORDEM={(number * 7) % 11};NOME_LISTA=Lista {number % 4};NOME_CANDIDATO=Nome {number}"
+        for number in range(200)
+    ]
+    source = tmp_path / "lista.txt"
+    source.write_text("\n".join(lines), encoding="utf-8")
+
+    whole = process_job("job-1", [source], base_dir=tmp_path / "whole", instrument=True)
+    monkeypatch.setattr(pipeline, "BATCH_ROWS", 7)
+    chunked = process_job("job-1", [source], base_dir=tmp_path / "chunked", instrument=True)
+
+    assert chunked.csv_path.read_bytes() == whole.csv_path.read_bytes()
+    for name in ("rows.bin", "rows.idx", "meta.json"):
+        assert (chunked.csv_path.parent / name).read_bytes() == (whole.csv_path.parent / name).read_bytes()
+    assert chunked == replace(whole, csv_path=chunked.csv_path)
+    assert not list(chunked.csv_path.parent.glob("run-*"))
+    timings = JobStorage(tmp_path / "chunked").load("job-1").timings
+    assert [timings[stage]["items_out"] for stage in ("extract", "normalize", "validate", "write")] == [200] * 4
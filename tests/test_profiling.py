@@ -0,0 +1,115 @@
+import pstats
+import threading
+import time
+
+import pytest
+
+from worker.src import pipeline
+from worker.src.pipeline import process_job
+from worker.src.profiling import PROFILE_ENV, JobProfiler
+from worker.src.storage import JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+
+def _write_input(tmp_path):
+    source = tmp_path / "lista.txt"
+    source.write_text(
+        "\n".join(f"DTMNFR=150800;NUM_ORDEM={number};NOME_CANDIDATO=Ana {number}" for number in range(1, 200))
+    )
+    return source
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profiled_run_writes_pstats_and_collapsed_stacks(tmp_path):
+    base = tmp_path / "data"
+
+    process_job("job-1", [_write_input(tmp_path)], base_dir=base, profile=True)
+
+    files = JobStorage(base).load("job-1").profile_files
+    assert set(files) == {"pstats", "collapsed"}
+    stats = pstats.Stats(files["pstats"])
+    assert any(name == "iter_column_chunks" for _file, _line, name in stats.stats)
+    assert files["pstats"] == str(base.resolve() / "processed" / "job-1" / "profile.pstats")
+
+
+def test_sampler_records_collapsed_stacks(tmp_path):
+    profiler = JobProfiler(tmp_path, interval=0.001)
+    profiler.start()
+    _busy(0.1)
+    files = profiler.stop()
+
+    assert profiler.stop() is files
+    lines = (tmp_path / "profile.collapsed").read_text(encoding="utf-8").splitlines()
+    assert lines
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert any("_busy (test_profiling.py:" in line.rsplit(" ", 1)[0].split(";")[-1] for line in lines)
+
+
+def test_profiling_is_off_unless_requested(tmp_path, monkeypatch):
+    base = tmp_path / "data"
+    source = _write_input(tmp_path)
+
+    process_job("job-plain", [source], base_dir=base)
+    assert JobStorage(base).load("job-plain").profile_files == {}
+    assert not (base / "processed" / "job-plain" / "profile.pstats").exists()
+
+    JobStorage(base).ensure("job-flagged", [source])
+    JobStorage(base).update("job-flagged", profile=True)
+    process_job("job-flagged", [source], base_dir=base)
+    assert set(JobStorage(base).load("job-flagged").profile_files) == {"pstats", "collapsed"}
+
+    monkeypatch.setenv(PROFILE_ENV, "1")
+    process_job("job-env", [source], base_dir=base)
+    assert set(JobStorage(base).load("job-env").profile_files) == {"pstats", "collapsed"}
+
+
+def test_a_run_that_fails_early_leaves_no_sampler_running(tmp_path, monkeypatch):
+    def unavailable(*_args, **_kwargs):
+        raise OSError("events directory is read-only")
+
+    monkeypatch.setattr(pipeline, "ProgressPublisher", unavailable)
+    with pytest.raises(OSError):
+        process_job("job-1", [_write_input(tmp_path)], base_dir=tmp_path / "data", profile=True)
+
+    assert not [thread for thread in threading.enumerate() if thread.name == "cne-profile-sampler"]
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_job_status_links_to_profile_downloads(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+
+    from api.app.main import app, job_status_cache
+
+    job_status_cache.clear()
+    client = TestClient(app)
+    created = client.post(
+        "/api/jobs",
+        files={"file": ("lista.txt", b"DTMNFR=150800;NUM_ORDEM=1;NOME_CANDIDATO=Ana\n", "text/plain")},
+        data={"profile": "true"},
+    )
+    job_id = created.json()["job_id"]
+    storage = JobStorage(tmp_path)
+    assert storage.load(job_id).profile is True
+    assert client.get(f"/api/jobs/{job_id}").json().get("profile") is None
+
+    process_job(job_id, [tmp_path / "uploads" / job_id / "lista.txt"], base_dir=tmp_path, storage=storage)
+
+    links = client.get(f"/api/jobs/{job_id}").json()["profile"]
+    assert links == {
+        "pstats": f"/api/jobs/{job_id}/profile/pstats",
+        "collapsed": f"/api/jobs/{job_id}/profile/collapsed",
+    }
+    download = client.get(links["pstats"])
+    assert download.status_code == 200
+    assert f"{job_id}-profile.pstats" in download.headers["content-disposition"]
+    assert client.get(links["collapsed"]).headers["content-type"].startswith("text/plain")
+    assert client.get(f"/api/jobs/{job_id}/profile/other").status_code == 404
@@ -0,0 +1,171 @@
+import asyncio
+import json
+
+import pytest
+
+from api.app.services import format_sse, stream_job_events
+from worker.src.pipeline import process_job
+from worker.src.progress import ProgressPublisher, events_path, finished_run, read_events
+from worker.src.storage import JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+LINES = [
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Ana",
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=3;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Carlos",
+]
+
+
+def _parse_stream(body):
+    messages = []
+    for block in body.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            messages.append(fields)
+    return messages
+
+
+def test_readers_tail_the_event_file(tmp_path):
+    publisher = ProgressPublisher(tmp_path, "job")
+    publisher.emit("state", state="processing")
+    publisher.emit("ocr", current=1, total=2, page=1)
+
+    events, offset, run = read_events(publisher.path)
+    assert [event["stage"] for _, event in events] == ["state", "ocr"]
+    assert events[-1][0] == offset
+    assert run == publisher.run
+
+    with publisher.path.open("ab") as handle:
+        handle.write(b'{"seq": 3, "stage": "ocr"')
+    assert read_events(publisher.path, offset, run) == ([], offset, run)
+    publisher.close()
+
+    ProgressPublisher(tmp_path, "job").close()
+    assert read_events(publisher.path, offset, run) == ([], 0, None)
+    assert read_events(events_path(tmp_path, "missing")) == ([], 0, None)
+
+
+def test_a_rerun_restarts_readers_even_once_it_is_longer(tmp_path):
+    with ProgressPublisher(tmp_path, "job") as first:
+        first.emit("state", state="processing")
+        first.emit("state", state="failed", error="OCR falhou")
+    _events, offset, run = read_events(first.path)
+    assert finished_run(first.path) == run
+
+    with ProgressPublisher(tmp_path, "job") as second:
+        second.emit("state", state="processing")
+        for page in range(1, 6):
+            second.emit("ocr", current=page, total=5, page=page)
+    events, _offset, rerun = read_events(second.path, offset, run)
+
+    assert rerun == second.run != run
+    assert [event["seq"] for _, event in events] == list(range(1, 7))
+    assert finished_run(second.path) is None
+
+
+def test_pipeline_publishes_every_stage(tmp_path):
+    first = tmp_path / "first.txt"
+    first.write_text(LINES[0], encoding="utf-8")
+    second = tmp_path / "second.txt"
+    second.write_text(LINES[1], encoding="utf-8")
+
+    process_job("job-events", [first, second], base_dir=tmp_path / "data")
+
+    events = [event for _, event in read_events(events_path(tmp_path / "data", "job-events"))[0]]
+    assert len({event["run"] for event in events}) == 1
+    assert [event["stage"] for event in events] == [
+        "state", "render", "ocr", "ocr", "segment", "extract", "validate", "write", "state",
+    ]
+    assert [event["seq"] for event in events] == list(range(1, len(events) + 1))
+    assert [(event["current"], event["total"]) for event in events if event["stage"] == "ocr"] == [(1, 2), (2, 2)]
+    assert events[5]["rows"] == 2
+    assert events[0]["state"] == "processing" and events[-1]["state"] == "ready"
+
+
+def test_stream_stops_at_the_final_state(tmp_path):
+    async def run():
+        publisher = ProgressPublisher(tmp_path, "job")
+        publisher.emit("state", state="processing")
+        stream = stream_job_events(publisher.path, state="processing", poll_interval=0.01)
+        first = await stream.__anext__()
+        publisher.emit("write", rows=2)
+        publisher.emit("state", state="ready")
+        rest = [message async for message in stream]
+        publisher.close()
+        return [first, *rest]
+
+    messages = _parse_stream(b"".join(asyncio.run(run())))
+    assert [message["event"] for message in messages] == ["state", "progress", "state"]
+    assert json.loads(messages[-1]["data"])["state"] == "ready"
+
+
+def test_stale_final_state_does_not_end_the_next_run(tmp_path):
+    async def run():
+        with ProgressPublisher(tmp_path, "job") as previous:
+            previous.emit("state", state="failed", error="OCR falhou")
+        stream = stream_job_events(
+            previous.path, state="queued", stale_run=finished_run(previous.path), poll_interval=0.01
+        )
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        assert not pending.done()
+        with ProgressPublisher(tmp_path, "job") as current:
+            current.emit("state", state="processing")
+            current.emit("state", state="ready")
+        return [await pending, *[message async for message in stream]]
+
+    messages = _parse_stream(b"".join(asyncio.run(run())))
+    assert [json.loads(message["data"])["state"] for message in messages] == ["processing", "ready"]
+
+
+def test_finished_job_without_events_gets_its_state():
+    async def run(path):
+        return [message async for message in stream_job_events(path, state="failed")]
+
+    assert asyncio.run(run(events_path("missing", "job"))) == [format_sse({"stage": "state", "state": "failed"})]
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_events_endpoint_replays_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    source = tmp_path / "input.txt"
+    source.write_text("\n".join(LINES), encoding="utf-8")
+    process_job("job-sse", [source], base_dir=tmp_path)
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/jobs/job-sse/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    messages = _parse_stream(response.content)
+    assert json.loads(messages[-1]["data"])["state"] == "ready"
+
+    resumed = client.get("/api/jobs/job-sse/events", headers={"Last-Event-ID": messages[-3]["id"]})
+    assert [json.loads(message["data"])["stage"] for message in _parse_stream(resumed.content)] == ["write", "state"]
+
+    assert client.get("/api/jobs/missing/events").status_code == 404
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_events_of_an_approved_job_end_at_once(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    source = tmp_path / "input.txt"
+    source.write_text("\n".join(LINES), encoding="utf-8")
+    process_job("job-approved", [source], base_dir=tmp_path)
+    storage = JobStorage(tmp_path)
+    storage.mark_state("job-approved", JobState.approved)
+    storage.ensure("job-legacy", [])
+    storage.mark_state("job-legacy", JobState.approved)
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    replayed = _parse_stream(client.get("/api/jobs/job-approved/events").content)
+    assert json.loads(replayed[-1]["data"])["state"] == "ready"
+    legacy = _parse_stream(client.get("/api/jobs/job-legacy/events").content)
+    assert [json.loads(message["data"]) for message in legacy] == [{"stage": "state", "state": "approved"}]
+
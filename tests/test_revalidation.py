@@ -0,0 +1,175 @@
+import random
+import threading
+from dataclasses import replace
+
+import pytest
+
+from helpers import make_row
+from worker.src import normalizer, validator, writer
+from worker.src.revalidation import CellEdit, apply_edits, revalidate_rows
+from worker.src.rowstore import INDEX_FILENAME, ROWS_FILENAME, RowStore
+from worker.src.storage import JobStorage
+
+
+def _random_rows(count, seed):
+    rng = random.Random(seed)
+    return [
+        make_row(
+            DTMNFR=rng.choice(["150800", "1508", "110600"]),
+            ORGAO=rng.choice(["AM", "CM", "XX"]),
+            TIPO=rng.choice(["2", "3"]),
+            SIGLA=rng.choice(["PS", "PSD", "XYZ"]),
+            NOME_LISTA=rng.choice(["Lista A", "Lista B", ""]),
+            NUM_ORDEM=rng.randint(1, 6),
+            NOME_CANDIDATO=f"Nome {index}",
+            INDEPENDENTE=rng.choice(["0", "1", "talvez"]),
+        )
+        for index in range(count)
+    ]
+
+
+def _random_edits(rows, rng):
+    choices = {
+        "SIGLA": ["PS", "PSD", "BE", "XYZ"],
+        "NOME_LISTA": ["Lista A", "Lista C", ""],
+        "NUM_ORDEM": ["1", "2", "9"],
+        "DTMNFR": ["150800", "999999"],
+        "NOME_CANDIDATO": ["Corrigido", "Um nome bem mais comprido que o original"],
+        "INDEPENDENTE": ["1", "talvez"],
+    }
+    edits = []
+    for _ in range(rng.randint(1, 4)):
+        field = rng.choice(sorted(choices))
+        edits.append(CellEdit(rng.randrange(len(rows)), field, rng.choice(choices[field])))
+    return edits
+
+
+def _reference(rows, edits):
+    """Full re-run: apply edits, clear their flags, validate everything again."""
+
+    copies = [replace(row, validation=dict(row.validation)) for row in rows]
+    touched = set()
+    for edit in edits:
+        setattr(copies[edit.row], edit.field, edit.value)
+        copies[edit.row].validation.pop(edit.field, None)
+        touched.add(edit.row)
+    for index in touched:
+        normalizer.normalize_in_place(copies[index])
+    return validator.validate_rows(copies)
+
+
+def _validated(count, seed):
+    return validator.normalize_and_validate(_random_rows(count, seed))
+
+
+def test_revalidate_rows_matches_full_validation():
+    rng = random.Random(7)
+    for seed in range(200):
+        rows = _validated(rng.randint(1, 60), seed)
+        edits = _random_edits(rows, rng)
+        expected = _reference(rows, edits)
+        before = validator.summarise_validation(rows)
+
+        result = revalidate_rows(rows, edits)
+
+        assert rows == expected
+        after = result.delta.apply_to(before)
+        assert after == {**validator.summarise_validation(expected), "ocr_conf_mean": before["ocr_conf_mean"]}
+
+
+def test_revalidate_rows_only_touches_affected_groups():
+    rows = validator.validate_rows(
+        [make_row(NOME_LISTA=name, NUM_ORDEM=n, NOME_CANDIDATO=f"{name}{n}") for name in "ABC" for n in (1, 2, 3)]
+    )
+    untouched = rows[6:]
+
+    result = revalidate_rows(rows, [CellEdit(0, "INDEPENDENTE", "talvez"), CellEdit(5, "NUM_ORDEM", "1")])
+
+    assert (result.start, result.stop) == (0, 6)
+    assert all(a is b for a, b in zip(rows[6:], untouched))
+    assert rows[0].validation["INDEPENDENTE"] == "AVISO"
+    assert [(row.NOME_CANDIDATO, row.NUM_ORDEM) for row in rows[3:6]] == [("B1", 1), ("B3", 2), ("B2", 3)]
+    assert result.positions == {0: 0, 5: 4}
+    assert (result.delta.rows_ok, result.delta.rows_warn, result.delta.rows_err) == (-3, 3, 0)
+
+
+def test_revalidate_rows_moves_row_to_its_new_group():
+    rows = validator.validate_rows([make_row(NOME_CANDIDATO=name) for name in "ABC"])
+
+    result = revalidate_rows(rows, [CellEdit(0, "SIGLA", "XYZ")])
+
+    assert [(row.SIGLA, row.NOME_CANDIDATO, row.NUM_ORDEM) for row in rows] == [
+        ("PS", "B", 1),
+        ("PS", "C", 2),
+        ("XYZ", "A", 1),
+    ]
+    assert rows[2].validation["SIGLA"] == "ERRO"
+    assert result.positions == {0: 2}
+
+
+def test_revalidate_rows_treats_a_cleared_cell_as_empty():
+    rows = validator.validate_rows(
+        [make_row(NOME_CANDIDATO=name, NUM_ORDEM=number) for number, name in enumerate("ABC", 1)]
+    )
+    edits = [CellEdit(0, field, None) for field in ("DTMNFR", "NUM_ORDEM", "NOME_CANDIDATO", "SIGLA")]
+    expected = _reference(rows, [replace(edit, value="") for edit in edits])
+
+    revalidate_rows(rows, edits)
+
+    assert rows == expected
+    assert [(row.DTMNFR, row.SIGLA, row.NOME_CANDIDATO) for row in rows if row.SIGLA == "IND"] == [
+        ("000000", "IND", "CANDIDATO DESCONHECIDO")
+    ]
+
+
+def test_revalidate_rows_rejects_unknown_field():
+    rows = validator.validate_rows([make_row()])
+    with pytest.raises(ValueError):
+        revalidate_rows(rows, [CellEdit(0, "NOPE", "x")])
+    with pytest.raises(ValueError):
+        revalidate_rows(rows, [CellEdit(3, "SIGLA", "PS")])
+
+
+def test_apply_edits_patches_files_like_a_full_rewrite(tmp_path):
+    rng = random.Random(11)
+    storage = JobStorage(tmp_path)
+    for seed in range(25):
+        job_id = f"job{seed}"
+        rows = _validated(rng.randint(1, 40), seed)
+        storage.ensure(job_id, [])
+        summary = validator.summarise_validation(rows, ocr_conf_mean=0.88)
+        writer.write_outputs(job_id, rows, summary, tmp_path)
+        storage.update(job_id, stats=summary)
+
+        edits = _random_edits(rows, rng)
+        expected = _reference(rows, edits)
+        apply_edits(job_id, edits, base_dir=tmp_path, storage=storage)
+
+        reference_dir = tmp_path / "reference"
+        expected_summary = validator.summarise_validation(expected, ocr_conf_mean=0.88)
+        writer.write_outputs(job_id, expected, expected_summary, reference_dir)
+        for name in (writer.csv_filename(job_id), ROWS_FILENAME, INDEX_FILENAME, "meta.json", "preview.json"):
+            patched = (tmp_path / "processed" / job_id / name).read_bytes()
+            assert patched == (reference_dir / "processed" / job_id / name).read_bytes(), name
+        assert storage.load(job_id).stats == expected_summary
+
+
+def test_concurrent_apply_edits_on_one_job_do_not_lose_updates(tmp_path):
+    rows = _validated(40, 5)
+    writer.write_outputs("job", rows, validator.summarise_validation(rows), tmp_path)
+    edits = [[CellEdit(index, "NOME_CANDIDATO", f"Nome revisto {index} " * 8)] for index in range(0, 40, 4)]
+    barrier = threading.Barrier(len(edits))
+
+    def run(edit):
+        barrier.wait()
+        apply_edits("job", edit, base_dir=tmp_path)
+
+    threads = [threading.Thread(target=run, args=(edit,)) for edit in edits]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = _reference(rows, [edit for batch in edits for edit in batch])
+    with RowStore(tmp_path / "processed" / "job") as store:
+        assert store[:] == expected
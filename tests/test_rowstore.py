@@ -0,0 +1,157 @@
+import csv
+import random
+
+import pytest
+
+from helpers import make_row
+from worker.src import validator, writer
+from worker.src.batch import CandidateBatch
+from worker.src.rowstore import INDEX_FILENAME, ROWS_FILENAME, RowStore, splice_rows
+from worker.src.storage import JobState, JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+
+def _validated_rows(count, seed=0):
+    rng = random.Random(seed)
+    rows = [
+        make_row(
+            SIGLA=rng.choice(["PS", "PSD", "XYZ"]),
+            NOME_LISTA=rng.choice(["Lista A", "Lista B", ""]),
+            NUM_ORDEM=rng.randint(1, 5),
+            NOME_CANDIDATO=rng.choice(["Ana", "João Gonçalves", 'Nome; "citado"']),
+            INDEPENDENTE=rng.choice(["0", "talvez"]),
+        )
+        for _ in range(count)
+    ]
+    return validator.normalize_and_validate(rows)
+
+
+def test_row_store_round_trips_rows_and_csv_offsets(tmp_path):
+    rows = _validated_rows(50)
+    csv_path = writer.write_csv("job", rows, tmp_path)
+    data = csv_path.read_bytes()
+
+    with RowStore(csv_path.parent) as store:
+        assert len(store) == len(rows)
+        assert store[:] == rows
+        assert store[-1] == rows[-1]
+        assert list(store.iter_rows(10, 20)) == rows[10:20]
+        assert list(store.iter_rows(45, 100)) == rows[45:]
+        assert list(store.iter_rows(60, 70)) == []
+        for index in (0, 17, 49):
+            start, stop = store.offsets(index)[1], store.offsets(index + 1)[1]
+            assert data[start:stop] == writer.format_csv_row(rows[index])
+        assert store.offsets(len(rows))[1] == len(data)
+
+
+def test_batch_writer_produces_the_same_row_store(tmp_path):
+    rows = _validated_rows(40, seed=1)
+    writer.write_csv("rows", rows, tmp_path)
+    writer.write_batch_csv("batch", CandidateBatch.from_rows(rows), tmp_path)
+
+    for name in (ROWS_FILENAME, INDEX_FILENAME):
+        from_rows = (tmp_path / "processed" / "rows" / name).read_bytes()
+        assert from_rows == (tmp_path / "processed" / "batch" / name).read_bytes()
+
+
+def test_empty_job_has_an_empty_row_store(tmp_path):
+    csv_path = writer.write_csv("job", [], tmp_path)
+
+    with RowStore(csv_path.parent) as store:
+        assert len(store) == 0
+        assert list(store.iter_rows(0, 10)) == []
+
+
+def test_splice_rows_matches_a_full_rewrite(tmp_path):
+    rows = _validated_rows(30, seed=2)
+    csv_path = writer.write_csv("job", rows, tmp_path)
+    replacement = [make_row(NOME_CANDIDATO="Nome muito mais comprido"), make_row(SIMBOLO=None)]
+    for row in replacement:
+        validator._check_row(row)
+
+    splice_rows(csv_path.parent, csv_path, 5, replacement, [writer.format_csv_row(row) for row in replacement])
+
+    expected = rows[:5] + replacement + rows[7:]
+    writer.write_csv("job", expected, tmp_path / "reference")
+    reference_dir = tmp_path / "reference" / "processed" / "job"
+    for name in (csv_path.name, ROWS_FILENAME, INDEX_FILENAME):
+        assert (csv_path.parent / name).read_bytes() == (reference_dir / name).read_bytes(), name
+
+
+def test_splice_rows_leaves_open_readers_on_the_old_files(tmp_path):
+    rows = _validated_rows(30, seed=4)
+    csv_path = writer.write_csv("job", rows, tmp_path)
+    original_csv = csv_path.read_bytes()
+    replacement = [make_row(NOME_CANDIDATO="x" * 500)]
+    validator._check_row(replacement[0])
+
+    with RowStore(csv_path.parent) as before, csv_path.open("rb") as download:
+        splice_rows(csv_path.parent, csv_path, 0, replacement, [writer.format_csv_row(replacement[0])])
+        assert before[:] == rows
+        assert download.read() == original_csv
+
+    with RowStore(csv_path.parent) as after:
+        assert after[:] == replacement + rows[1:]
+    assert not [path.name for path in csv_path.parent.iterdir() if path.suffix == ".tmp"]
+
+
+def test_a_rerun_replaces_the_files_under_open_readers(tmp_path):
+    rows = _validated_rows(30, seed=5)
+    csv_path = writer.write_csv("job", rows, tmp_path)
+    original_csv = csv_path.read_bytes()
+    rerun = _validated_rows(3, seed=6)
+
+    with RowStore(csv_path.parent) as before, csv_path.open("rb") as download:
+        assert writer.write_csv("job", rerun, tmp_path) == csv_path
+        assert before[:] == rows
+        assert download.read() == original_csv
+
+    with RowStore(csv_path.parent) as after:
+        assert after[:] == rerun
+    assert not [path.name for path in csv_path.parent.iterdir() if path.suffix == ".tmp"]
+
+
+def test_row_store_matches_the_csv_read_back(tmp_path):
+    rows = _validated_rows(30, seed=3)
+    rows[0].NOME_CANDIDATO = 'Nome; com "aspas"'
+    rows[1].SIMBOLO = None
+    csv_path = writer.write_csv("job", rows, tmp_path)
+
+    with csv_path.open(encoding="utf-8", newline="") as handle:
+        records = list(csv.reader(handle, delimiter=";"))
+    with RowStore(csv_path.parent) as store:
+        stored = store[:]
+
+    assert records[0] == writer.CSV_COLUMNS
+    assert records[1:] == [[str(value) for value in writer._row_record(row)] for row in stored]
+    assert stored == rows
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_preview_endpoint_pages_through_the_row_store(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+    storage = JobStorage(tmp_path)
+    rows = _validated_rows(25, seed=3)
+    storage.ensure("job-preview", [])
+    csv_path = writer.write_csv("job-preview", rows, tmp_path)
+    storage.mark_state("job-preview", JobState.ready, csv_path=str(csv_path))
+    storage.ensure("job-queued", [])
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    response = client.get("/api/jobs/job-preview/preview", params={"page": 3, "size": 10})
+    assert response.status_code == 200
+    payload = response.json()
+    assert (payload["page"], payload["size"], payload["total"]) == (3, 10, 25)
+    assert [row["NOME_CANDIDATO"] for row in payload["rows"]] == [row.NOME_CANDIDATO for row in rows[20:]]
+    assert payload["rows"][0]["__validation__"] == rows[20].validation
+    assert payload["rows"][0]["NUM_ORDEM"] == rows[20].NUM_ORDEM
+
+    assert client.get("/api/jobs/job-preview/preview", params={"size": 501}).status_code == 422
+    assert client.get("/api/jobs/job-queued/preview").status_code == 404
+    assert client.get("/api/jobs/missing/preview").status_code == 404
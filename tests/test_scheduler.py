@@ -0,0 +1,131 @@
+import zipfile
+
+import pytest
+
+from worker.src.job_queue import JobQueue, queue_path
+from worker.src.scheduler import BULK, SMALL, JobEstimate, estimate_job, tenant_key
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+ONE_PAGE = JobEstimate(pages=1, size=1024, job_class=SMALL)
+TEN_PAGES = JobEstimate(pages=10, size=1024 * 1024, job_class=BULK)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(queue_path(tmp_path))
+
+
+def _drain(queue, **lease_options):
+    order = []
+    while True:
+        job = queue.lease("w", host="h", visibility_timeout=60, **lease_options)
+        if job is None:
+            return order
+        order.append(job.job_id)
+        queue.complete(job.job_id, "w")
+
+
+def test_estimate_classifies_by_media_type_and_size(tmp_path):
+    text = tmp_path / "lista.txt"
+    text.write_text("DTMNFR=150800", encoding="utf-8")
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF" + b"0" * (1024 * 1024))
+    archive = tmp_path / "lote.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+        for index in range(30):
+            handle.writestr(f"lote/{index}.pdf", b"0" * 150 * 1024)
+
+    assert estimate_job([text]) == JobEstimate(pages=1, size=text.stat().st_size, job_class=SMALL)
+    assert estimate_job([scan]).pages == 11
+    assert estimate_job([scan]).job_class == BULK
+    bulk_zip = estimate_job([archive])
+    assert (bulk_zip.pages, bulk_zip.job_class) == (60, BULK)
+    assert bulk_zip.size < 1024 * 1024
+
+    assert tenant_key(" 150800 ", "ana") == "150800"
+    assert tenant_key(None, "ana") == "ana"
+    assert tenant_key("", None) == "anonymous"
+
+
+def test_tenants_take_turns(queue):
+    for index in range(4):
+        queue.enqueue(f"a{index}", [], tenant="150800", estimate=TEN_PAGES)
+    for index in range(2):
+        queue.enqueue(f"b{index}", [], tenant="110600", estimate=TEN_PAGES)
+
+    assert _drain(queue) == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_weights_scale_the_share(queue):
+    queue.set_weight("150800", 2)
+    for index in range(4):
+        queue.enqueue(f"a{index}", [], tenant="150800", estimate=TEN_PAGES)
+        queue.enqueue(f"b{index}", [], tenant="110600", estimate=TEN_PAGES)
+
+    assert _drain(queue)[:6] == ["a0", "b0", "a1", "b1", "a2", "a3"]
+    with pytest.raises(ValueError):
+        queue.set_weight("150800", 0)
+
+
+def test_small_jobs_jump_ahead_and_bulk_is_promoted(tmp_path, queue):
+    for index in range(3):
+        queue.enqueue(f"bulk{index}", [], tenant="150800", estimate=TEN_PAGES)
+    queue.enqueue("small", [], tenant="110600", estimate=ONE_PAGE)
+    assert _drain(queue)[0] == "small"
+
+    eager = JobQueue(queue_path(tmp_path / "eager"), promote_after=0)
+    eager.enqueue("bulk", [], tenant="150800", estimate=TEN_PAGES)
+    eager.enqueue("small", [], tenant="150800", estimate=ONE_PAGE)
+    assert _drain(eager) == ["bulk", "small"]
+
+
+def test_reserved_slots_only_run_small_jobs(queue):
+    for index in range(3):
+        queue.enqueue(f"bulk{index}", [], tenant="150800", estimate=TEN_PAGES)
+
+    options = dict(host="h", visibility_timeout=60, host_limit=2, reserve_small=1)
+    assert queue.lease("w", **options).job_id == "bulk0"
+    assert queue.lease("w", **options) is None
+
+    queue.enqueue("small", [], tenant="110600", estimate=ONE_PAGE)
+    assert queue.lease("w", **options).job_id == "small"
+    assert queue.lease("w", **options) is None
+
+
+def test_class_stats_report_depth_and_waits(queue):
+    queue.enqueue("bulk0", [], estimate=TEN_PAGES)
+    queue.enqueue("bulk1", [], estimate=TEN_PAGES)
+    queue.enqueue("small", [], estimate=ONE_PAGE)
+    queue.lease("w", host="h", visibility_timeout=60)
+
+    stats = queue.class_stats()
+    assert (stats[SMALL].pending, stats[SMALL].running, stats[SMALL].started) == (0, 1, 1)
+    assert stats[SMALL].wait_p95_seconds >= 0
+    assert (stats[BULK].pending, stats[BULK].running, stats[BULK].started) == (2, 0, 0)
+    assert stats[BULK].oldest_pending_seconds >= 0
+    assert stats[BULK].wait_mean_seconds is None
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_queue_endpoint_and_submitter_key(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path))
+
+    from api.app.main import app
+
+    client = TestClient(app)
+    created = client.post(
+        "/api/jobs",
+        files={"file": ("lista.txt", b"DTMNFR=150800", "text/plain")},
+        data={"dtmnfr": "150800"},
+    )
+    assert created.status_code == 201
+
+    payload = client.get("/api/queue").json()
+    assert payload["classes"][SMALL]["pending"] == 1
+    assert payload["classes"][BULK]["pending"] == 0
+    job = JobQueue(queue_path(tmp_path)).lease("w", host="h", visibility_timeout=60)
+    assert (job.job_id, job.tenant, job.job_class) == (created.json()["job_id"], "150800", SMALL)
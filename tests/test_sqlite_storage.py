@@ -0,0 +1,148 @@
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from worker.src.migrate_jobs import main as migrate_main
+from worker.src.sqlite_storage import DATABASE_FILENAME, SQLiteJobStorage
+from worker.src.storage import JobMetadata, JobState, JobStorage, VersionConflict, open_job_storage
+
+
+def _bump(base_dir, job_id, times):
+    storage = SQLiteJobStorage(base_dir)
+
+    def increment(meta):
+        meta.stats = {**meta.stats, "counter": int(meta.stats.get("counter", 0)) + 1}
+
+    for _ in range(times):
+        storage.modify(job_id, increment)
+
+
+def test_sqlite_storage_round_trips_metadata(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    input_file = tmp_path / "input.pdf"
+
+    created = storage.ensure("job", [input_file])
+    assert storage.ensure("job", []) == created
+    ready = storage.mark_state(
+        "job",
+        JobState.ready,
+        csv_path="listas_job.csv",
+        pages=3,
+        stats={"rows_total": 4, "ocr_conf_mean": 0.5},
+    )
+
+    loaded = storage.load("job")
+    assert loaded == ready
+    assert loaded.input_files == [str(input_file)]
+    assert loaded.version == created.version + 1
+    with pytest.raises(FileNotFoundError):
+        storage.load("missing")
+
+
+def test_sqlite_storage_compare_and_swap(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    meta = storage.ensure("job", [])
+
+    storage.update("job", pages=1, expected_version=meta.version)
+    with pytest.raises(VersionConflict):
+        storage.update("job", pages=2, expected_version=meta.version)
+    assert storage.load("job").pages == 1
+
+
+def test_sqlite_storage_serialises_writers_across_processes(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    storage.ensure("job", [])
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        for future in [pool.submit(_bump, tmp_path, "job", 10) for _ in range(4)]:
+            future.result()
+
+    assert storage.load("job").stats["counter"] == 40
+    with sqlite3.connect(tmp_path / DATABASE_FILENAME) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_list_jobs_by_state_uses_the_index(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    storage.import_jobs(
+        JobMetadata(
+            job_id=f"job-{index:04d}",
+            state=JobState.ready if index % 3 == 0 else JobState.failed,
+            created_at=base + timedelta(minutes=index),
+            updated_at=base + timedelta(minutes=index),
+            version=1,
+        )
+        for index in range(300)
+    )
+
+    ready = storage.list_jobs(state=JobState.ready, limit=5)
+    assert [meta.job_id for meta in ready] == ["job-0297", "job-0294", "job-0291", "job-0288", "job-0285"]
+    assert len(storage.list_jobs(state=JobState.failed)) == 200
+
+    with sqlite3.connect(tmp_path / DATABASE_FILENAME) as connection:
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT payload FROM jobs WHERE state = ? ORDER BY updated_at DESC, job_id DESC",
+            ("ready",),
+        ).fetchall()
+    assert "jobs_state_updated" in " ".join(str(row) for row in plan)
+
+
+def test_migration_imports_the_json_tree(tmp_path, capsys):
+    json_storage = JobStorage(tmp_path)
+    for index in range(5):
+        json_storage.ensure(f"job-{index}", [tmp_path / f"{index}.pdf"])
+    json_storage.mark_state("job-2", JobState.ready, pages=7, stats={"rows_total": 12})
+    (tmp_path / "jobs" / "broken").mkdir()
+    (tmp_path / "jobs" / "broken" / "job.json").write_text("{", encoding="utf-8")
+
+    assert migrate_main(["--data-dir", str(tmp_path)]) == 0
+    assert "Imported 5 job(s)" in capsys.readouterr().out
+
+    sqlite_storage = open_job_storage(tmp_path, backend="sqlite")
+    assert isinstance(sqlite_storage, SQLiteJobStorage)
+    for meta in json_storage.iter_jobs():
+        assert sqlite_storage.load(meta.job_id) == meta
+
+    assert migrate_main(["--data-dir", str(tmp_path)]) == 0
+    assert len(sqlite_storage.list_jobs()) == 5
+
+
+def test_open_job_storage_reads_the_backend_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_STORAGE_BACKEND", "sqlite")
+    assert isinstance(open_job_storage(tmp_path), SQLiteJobStorage)
+    monkeypatch.setenv("CNE_STORAGE_BACKEND", "json")
+    assert type(open_job_storage(tmp_path)) is JobStorage
+    with pytest.raises(ValueError):
+        open_job_storage(tmp_path, backend="redis")
+
+
+def test_rebuild_index_rederives_columns_from_the_payload(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    for index in range(3):
+        storage.ensure(f"job-{index}", [])
+    storage.mark_state("job-1", JobState.ready)
+    with sqlite3.connect(tmp_path / DATABASE_FILENAME) as connection:
+        connection.execute("UPDATE jobs SET state = 'queued'")
+    assert storage.list_jobs(state=JobState.ready) == []
+
+    assert storage.rebuild_index() == 3
+    assert [meta.job_id for meta in storage.list_jobs(state=JobState.ready)] == ["job-1"]
+
+
+def test_close_releases_every_thread_connection(tmp_path):
+    storage = SQLiteJobStorage(tmp_path)
+    storage.ensure("job", [])
+    for _ in range(3):
+        worker = threading.Thread(target=storage.load, args=("job",))
+        worker.start()
+        worker.join()
+    # Each new thread closes the connection its exited predecessor left.
+    assert len(storage.index._connections) == 2
+
+    storage.close()
+    assert storage.index._connections == {}
+    assert storage.load("job").job_id == "job"
@@ -0,0 +1,100 @@
+import time
+import tracemalloc
+
+import pytest
+
+from worker.src.instrumentation import STAGE_METRICS_ENV, Instrumentation
+from worker.src.pipeline import process_job
+from worker.src.sqlite_storage import SQLiteJobStorage
+from worker.src.storage import JobStorage
+
+try:  # pragma: no cover - optional FastAPI dependency
+    from fastapi.testclient import TestClient
+except ModuleNotFoundError:  # pragma: no cover - used for skipping API-only tests
+    TestClient = None  # type: ignore[assignment]
+
+STAGES = ["render", "ocr", "segment", "extract", "normalize", "validate", "write"]
+
+
+def _inputs(tmp_path):
+    text = tmp_path / "lista.txt"
+    text.write_text(
+        "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Ana\n"
+        "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=2;NOME_LISTA=Lista A;NOME_CANDIDATO=Bruno",
+        encoding="utf-8",
+    )
+    scan = tmp_path / "scan.pdf"
+    scan.write_bytes(b"%PDF")
+    return [text, scan]
+
+
+def test_disabled_instrumentation_is_a_pass_through():
+    metrics = Instrumentation()
+    items = [1, 2, 3]
+
+    assert metrics.wrap("render", items) is items
+    with metrics.stage("extract", items_in=3) as stage:
+        stage.items_out = 3
+    assert metrics.as_dict() == {}
+
+
+def test_nested_spans_report_exclusive_time():
+    metrics = Instrumentation(enabled=True)
+
+    def slow(count):
+        for index in range(count):
+            time.sleep(0.02)
+            yield index
+
+    upstream = metrics.wrap("render", slow(3))
+    downstream = metrics.wrap("ocr", (item * 2 for item in upstream), upstream="render")
+    with metrics.stage("extract") as stage:
+        stage.items_out = len(list(downstream))
+
+    timings = metrics.as_dict()
+    assert list(timings) == ["render", "ocr", "extract"]
+    assert timings["render"]["wall_ms"] >= 55
+    assert timings["ocr"]["wall_ms"] < 20
+    assert timings["extract"]["wall_ms"] < 20
+    assert (timings["ocr"]["items_in"], timings["ocr"]["items_out"], timings["extract"]["items_out"]) == (3, 3, 3)
+
+
+@pytest.mark.parametrize("storage_class", [JobStorage, SQLiteJobStorage])
+def test_job_timings_are_stored_per_stage(tmp_path, storage_class):
+    storage = storage_class(tmp_path / "data")
+
+    process_job("job-timed", _inputs(tmp_path), base_dir=tmp_path / "data", storage=storage, instrument=True)
+    process_job("job-plain", _inputs(tmp_path), base_dir=tmp_path / "data", storage=storage, instrument=False)
+
+    timings = storage.load("job-timed").timings
+    assert list(timings) == STAGES
+    assert timings["render"]["items_out"] == 2
+    assert (timings["ocr"]["items_in"], timings["ocr"]["items_out"]) == (2, 2)
+    assert (timings["segment"]["items_out"], timings["extract"]["items_in"]) == (4, 4)
+    assert timings["write"]["items_out"] == 4
+    assert all(stage["wall_ms"] >= 0 and stage["cpu_ms"] >= 0 for stage in timings.values())
+    assert "py_peak_kb" not in timings["extract"]
+    assert storage.load("job-plain").timings == {}
+
+
+def test_memory_mode_traces_allocations(tmp_path, monkeypatch):
+    monkeypatch.setenv(STAGE_METRICS_ENV, "memory")
+
+    process_job("job-memory", _inputs(tmp_path), base_dir=tmp_path / "data")
+
+    timings = JobStorage(tmp_path / "data").load("job-memory").timings
+    assert timings["extract"]["py_peak_kb"] >= 0
+    assert not tracemalloc.is_tracing()
+
+
+@pytest.mark.skipif(TestClient is None, reason="FastAPI is not available")
+def test_job_endpoint_exposes_timings(tmp_path, monkeypatch):
+    monkeypatch.setenv("CNE_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv(STAGE_METRICS_ENV, "1")
+    process_job("job-api", _inputs(tmp_path), base_dir=tmp_path / "data")
+
+    from api.app.main import app
+
+    payload = TestClient(app).get("/api/jobs/job-api").json()
+    assert list(payload["stats"]["timings"]) == STAGES
+    assert set(payload["stats"]["timings"]["ocr"]) >= {"wall_ms", "cpu_ms", "items_in", "items_out"}
@@ -0,0 +1,73 @@
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from worker.src.storage import JobState, JobStorage, VersionConflict
+
+
+def _bump(base_dir, job_id, times):
+    storage = JobStorage(base_dir)
+
+    def increment(meta):
+        meta.stats = {**meta.stats, "counter": int(meta.stats.get("counter", 0)) + 1}
+
+    for _ in range(times):
+        storage.modify(job_id, increment)
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    storage = JobStorage(tmp_path)
+    created = storage.ensure("job", [])
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        for future in [pool.submit(_bump, tmp_path, "job", 10) for _ in range(4)]:
+            future.result()
+
+    meta = storage.load("job")
+    assert meta.stats["counter"] == 40
+    assert meta.version == created.version + 40
+
+
+def test_readers_never_see_partial_json(tmp_path):
+    storage = JobStorage(tmp_path)
+    storage.ensure("job", [])
+    meta_path = tmp_path / "jobs" / "job" / "job.json"
+    stop = threading.Event()
+    failures = []
+
+    def read_loop():
+        while not stop.is_set():
+            try:
+                json.loads(meta_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError as exc:  # pragma: no cover - the bug under test
+                failures.append(exc)
+
+    reader = threading.Thread(target=read_loop)
+    reader.start()
+    try:
+        for index in range(50):
+            storage.update("job", error="x" * (index % 50), pages=index)
+    finally:
+        stop.set()
+        reader.join()
+
+    assert failures == []
+    assert not [path for path in meta_path.parent.iterdir() if path.suffix == ".tmp"]
+
+
+def test_compare_and_swap_rejects_stale_versions(tmp_path):
+    storage = JobStorage(tmp_path)
+    meta = storage.ensure("job", [])
+
+    processing = storage.mark_state("job", JobState.processing, expected_version=meta.version)
+    assert processing.version == meta.version + 1
+
+    with pytest.raises(VersionConflict) as excinfo:
+        storage.update("job", pages=3, expected_version=meta.version)
+    assert excinfo.value.actual == processing.version
+    assert storage.load("job").pages is None
+
+    storage.update("job", pages=3, version=999)
+    assert storage.load("job").version == processing.version + 1
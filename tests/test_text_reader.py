@@ -0,0 +1,78 @@
+import tracemalloc
+import zipfile
+
+from worker.src import ocr_stub
+from worker.src.pipeline import process_job
+from worker.src.renderer import render_documents
+
+LINE = "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM={index};NOME_LISTA=Lista A;NOME_CANDIDATO=João {index}\n"
+
+
+def _write_lines(path, count, encoding="utf-8"):
+    with path.open("w", encoding=encoding, newline="") as handle:
+        for index in range(count):
+            handle.write(LINE.format(index=index + 1))
+    return path
+
+
+def test_chunks_end_on_line_breaks_and_round_trip(tmp_path):
+    source = _write_lines(tmp_path / "export.csv", 2000)
+    (artifact,) = render_documents("job", [source])
+
+    chunks = list(ocr_stub.iter_text_chunks(artifact, chunk_size=16 * 1024))
+
+    assert len(chunks) > 5
+    assert all(chunk.endswith("\n") for chunk in chunks)
+    assert "".join(chunks) == source.read_text(encoding="utf-8")
+
+
+def test_encoding_is_detected_once_from_the_prefix(tmp_path):
+    latin = _write_lines(tmp_path / "latin.txt", 50, encoding="latin-1")
+    bom = tmp_path / "bom.txt"
+    bom.write_bytes(b"\xef\xbb\xbf" + "Conceição\n".encode("utf-8"))
+    split = tmp_path / "split.txt"
+    split.write_bytes(b"a" * 4095 + "ç\n".encode("utf-8"))
+
+    assert ocr_stub.detect_encoding(latin.read_bytes()[:100]) == "latin-1"
+    assert ocr_stub.detect_encoding(split.read_bytes()[:4096]) == "utf-8"
+    chunks = {path.name: "".join(ocr_stub.iter_text_chunks(render_documents("j", [path])[0], 4096))
+              for path in (latin, bom, split)}
+    assert chunks["latin.txt"].splitlines()[0].endswith("João 1")
+    assert chunks["bom.txt"] == "Conceição\n"
+    assert chunks["split.txt"].endswith("ç\n")
+
+
+def test_large_text_inputs_become_several_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr_stub, "TEXT_CHUNK_BYTES", 8 * 1024)
+    source = _write_lines(tmp_path / "export.csv", 1500)
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+        handle.write(source, "export.csv")
+
+    pages = ocr_stub.run_ocr("job", render_documents("job", [source]))
+    assert [page.page_number for page in pages] == list(range(1, len(pages) + 1))
+    assert len(pages) > 5
+    assert ocr_stub.run_ocr("job", render_documents("job", [archive]), workers=2) == [
+        page.__class__(**{**page.__dict__, "document_id": f"{archive}!export.csv"}) for page in pages
+    ]
+
+    result = process_job("job-large", [source], base_dir=tmp_path / "data")
+    assert result.rows_total == 1500
+    assert result.pages_processed == len(pages)
+
+
+def test_reading_a_large_file_keeps_memory_flat(tmp_path):
+    source = _write_lines(tmp_path / "big.csv", 150_000)
+    (artifact,) = render_documents("job", [source])
+    size = source.stat().st_size
+
+    tracemalloc.start()
+    try:
+        total = sum(len(chunk) for chunk in ocr_stub.iter_text_chunks(artifact, chunk_size=256 * 1024))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert total == len(source.read_text(encoding="utf-8"))
+    assert size > 10 * 1024 * 1024
+    assert peak < 3 * 1024 * 1024
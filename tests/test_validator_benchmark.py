@@ -0,0 +1,106 @@
+"""Micro-benchmark for the fused normalize+validate stage.
+
+The timing test only runs with ``CNE_RUN_BENCHMARKS=1``; it writes rows/sec
+for the legacy copy-then-double-sort path and the fused in-place path to the
+terminal, with output capturing turned off for that line::
+
+    CNE_RUN_BENCHMARKS=1 python -m pytest -q tests/test_validator_benchmark.py
+"""
+import copy
+import os
+import sys
+import time
+from collections import defaultdict
+from dataclasses import replace
+
+import pytest
+
+from worker.src import normalizer, validator
+from worker.src.types import CandidateRow
+
+BENCH_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def _legacy_normalize_rows(rows):
+    normalised = []
+    for row in rows:
+        copied = normalizer.normalize_in_place(replace(row))
+        copied.validation = dict(row.validation)
+        normalised.append(copied)
+    return normalised
+
+
+def _legacy_validate_rows(rows):
+    validated = []
+    for row in rows:
+        validator._check_row(row)
+        validated.append(row)
+    validated.sort(key=validator._row_sort_key)
+    grouped = defaultdict(list)
+    for row in validated:
+        grouped[validator._group_key(row)].append(row)
+    for rows_group in grouped.values():
+        for index, row in enumerate(rows_group, start=1):
+            if row.NUM_ORDEM != index:
+                row.validation["NUM_ORDEM"] = "AVISO"
+                row.NUM_ORDEM = index
+            else:
+                row.validation.setdefault("NUM_ORDEM", "OK")
+    validated.sort(key=validator._row_sort_key)
+    return validated
+
+
+def _make_rows(count):
+    rows = []
+    for index in range(count):
+        rows.append(
+            CandidateRow(
+                DTMNFR=f"{150800 + index % 40}",
+                ORGAO=("am", "CM", "AF", "XX")[index % 4],
+                TIPO=("2", "3")[index % 2],
+                SIGLA=("PS", "PSD", "be", "XYZ")[index % 4],
+                SIMBOLO=None,
+                NOME_LISTA=f" Lista {index % 25} " if index % 11 else "",
+                NUM_ORDEM=(index * 7) % 30,
+                NOME_CANDIDATO=f"Candidato {index}",
+                PARTIDO_PROPONENTE="PS",
+                INDEPENDENTE=("0", "1", "", "talvez")[index % 4],
+            )
+        )
+    return rows
+
+
+def test_fused_stage_matches_separate_stages():
+    rows = _make_rows(2_000)
+    expected = _legacy_validate_rows(_legacy_normalize_rows(copy.deepcopy(rows)))
+    staged = validator.validate_rows(normalizer.normalize_rows(copy.deepcopy(rows)))
+
+    fused_input = copy.deepcopy(rows)
+    fused = validator.normalize_and_validate(fused_input)
+
+    assert fused is fused_input
+    assert fused == staged == expected
+
+
+@pytest.mark.skipif(
+    os.environ.get("CNE_RUN_BENCHMARKS") != "1",
+    reason="set CNE_RUN_BENCHMARKS=1 to run micro-benchmarks",
+)
+@pytest.mark.parametrize("count", BENCH_SIZES)
+def test_benchmark_fused_normalize_validate(count, capsys):
+    rows = _make_rows(count)
+    before_input = copy.deepcopy(rows)
+    started = time.perf_counter()
+    before = _legacy_validate_rows(_legacy_normalize_rows(before_input))
+    before_rate = count / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    after = validator.normalize_and_validate(rows)
+    after_rate = count / (time.perf_counter() - started)
+
+    with capsys.disabled():
+        sys.stdout.write(
+            f"\n{count:>9} rows: before {before_rate:>12,.0f} rows/s  "
+            f"after {after_rate:>12,.0f} rows/s  ({after_rate / before_rate:.2f}x)\n"
+        )
+    assert after == before
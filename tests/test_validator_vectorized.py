@@ -0,0 +1,79 @@
+import copy
+
+import pytest
+
+from helpers import random_raw_rows
+from worker.src import normalizer, validator
+from worker.src.batch import VALIDATED_FIELDS, CandidateBatch
+from worker.src.runs import SortedRuns
+from worker.src.types import CANDIDATE_FIELDS
+
+np = pytest.importorskip("numpy")
+
+
+def _normalized_batch(seed, count):
+    batch = CandidateBatch.from_columns(
+        {name: [getattr(row, name) for row in random_raw_rows(seed, count)] for name in CANDIDATE_FIELDS}
+    )
+    return normalizer.normalize_batch(batch)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_numpy_engine_matches_python_engine(seed):
+    python_batch = _normalized_batch(seed, 3000)
+    numpy_batch = copy.deepcopy(python_batch)
+
+    python_summary = validator.validate_and_summarise(python_batch, ocr_conf_mean=None, engine="python")
+    numpy_summary = validator.validate_and_summarise(numpy_batch, ocr_conf_mean=None, engine="numpy")
+
+    assert numpy_batch.columns == python_batch.columns
+    assert numpy_batch.flags == python_batch.flags
+    assert numpy_summary == python_summary
+
+
+def test_numpy_engine_matches_validate_rows():
+    rows = normalizer.normalize_rows(random_raw_rows(9, 500))
+    expected = validator.validate_rows(copy.deepcopy(rows))
+
+    batch = CandidateBatch.from_rows(rows)
+    summary = validator.validate_and_summarise(batch, ocr_conf_mean=0.5, engine="numpy")
+
+    assert batch.to_rows() == expected
+    assert summary == validator.summarise_validation(expected, ocr_conf_mean=0.5)
+
+
+def test_numpy_engine_falls_back_for_non_integer_ordering():
+    batch = CandidateBatch()
+    batch.append(("150800", "AM", "2", "PS", None, "Lista", "1", "Ana", None, "0"))
+    batch.append(("150800", "AM", "2", "PS", None, "Lista", 1, "Bruno", None, "0"))
+
+    validator.validate_batch(batch, engine="numpy")
+
+    assert batch.columns["NUM_ORDEM"] == [1, 2]
+    assert list(batch.flags["NUM_ORDEM"]) == [1, 1]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        validator.validate_batch(CandidateBatch(), engine="gpu")
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+def test_merged_sorted_runs_match_one_batch(engine, tmp_path):
+    whole = _normalized_batch(4, 3000)
+    chunks = [
+        CandidateBatch.from_columns({name: values[start : start + 700] for name, values in whole.columns.items()})
+        for start in range(0, 3000, 700)
+    ]
+    summary = validator.validate_and_summarise(whole, engine=engine)
+
+    tally = validator.ValidationTally()
+    with SortedRuns(tmp_path) as runs:
+        for chunk in chunks:
+            runs.add(validator.sort_batch(chunk, engine=engine))
+        merged = list(validator.renumber_records(runs.merge(validator.record_sort_key), tally))
+
+    assert [list(values) for values, _codes in merged] == [list(row) for row in zip(*whole.columns.values())]
+    expected_codes = map(bytes, zip(*(whole.flags[name] for name in VALIDATED_FIELDS)))
+    assert [codes for _values, codes in merged] == list(expected_codes)
+    assert tally.summary() == summary
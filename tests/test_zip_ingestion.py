@@ -0,0 +1,90 @@
+import zipfile
+
+from worker.src import ocr_stub, renderer
+from worker.src.ocr_cache import OCRCache
+from worker.src.pipeline import process_job
+
+LINES = [
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Ana",
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=2;NOME_LISTA=Lista A;NOME_CANDIDATO=Bruno",
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=3;NOME_LISTA=Lista A;NOME_CANDIDATO=Carla",
+    "DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=3;NUM_ORDEM=1;NOME_LISTA=Lista A;NOME_CANDIDATO=Duarte",
+]
+
+
+def _write_parts(tmp_path):
+    parts = {
+        "lote/parte-1.txt": "\n".join(LINES[:2]),
+        "lote/parte-2.csv": "\n".join(LINES[2:]),
+        "lote/scan.pdf": "%PDF",
+    }
+    loose = []
+    for name, text in parts.items():
+        path = tmp_path / "loose" / name.split("/")[-1]
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        loose.append(path)
+    archive = tmp_path / "lote.zip"
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_DEFLATED) as handle:
+        handle.writestr("lote/", "")
+        handle.writestr("__MACOSX/lote/._parte-1.txt", "junk")
+        for name, text in parts.items():
+            handle.writestr(name, text)
+    return archive, loose
+
+
+def test_zip_members_become_artifacts_in_archive_order(tmp_path):
+    archive, _ = _write_parts(tmp_path)
+
+    artifacts = renderer.render_documents("job", [archive])
+    assert [artifact.member for artifact in artifacts] == ["lote/parte-1.txt", "lote/parte-2.csv", "lote/scan.pdf"]
+    assert [artifact.media_type for artifact in artifacts] == ["text/plain", "text/csv", "application/pdf"]
+    assert artifacts[0].document_id == f"{archive}!lote/parte-1.txt"
+    assert renderer.count_documents([archive, archive]) == 6
+    with renderer.open_document(artifacts[1]) as handle:
+        assert handle.read().decode("utf-8") == "\n".join(LINES[2:])
+
+
+def test_ocr_streams_members_lazily(tmp_path):
+    archive, _ = _write_parts(tmp_path)
+    consumed = []
+
+    def tracked(artifacts):
+        for artifact in artifacts:
+            consumed.append(artifact.member)
+            yield artifact
+
+    pages = ocr_stub.iter_ocr("job", tracked(renderer.iter_documents("job", [archive])), workers=0)
+    first = next(pages)
+    assert first.text == "\n".join(LINES[:2])
+    assert consumed == ["lote/parte-1.txt"]
+
+
+def test_zip_job_matches_the_loose_files_without_extracting(tmp_path):
+    archive, loose = _write_parts(tmp_path)
+
+    zipped = process_job("zipped", [archive], base_dir=tmp_path / "data", ocr_workers=2)
+    plain = process_job("plain", loose, base_dir=tmp_path / "data-loose")
+
+    assert zipped.csv_path.read_bytes() == plain.csv_path.read_bytes()
+    assert zipped.pages_processed == 3
+    extracted = [path.name for path in (tmp_path / "data").rglob("*") if path.name.startswith("parte-")]
+    assert extracted == []
+
+
+def test_zip_members_are_cached_by_their_own_content(tmp_path):
+    archive, loose = _write_parts(tmp_path)
+    cache = OCRCache(tmp_path / "cache", ocr_stub.OCR_ENGINE_VERSION)
+
+    renamed = loose[2].with_name("digitalizacao.pdf")
+    renamed.write_bytes(loose[2].read_bytes())
+
+    zipped = list(ocr_stub.iter_ocr("job", renderer.iter_documents("job", [archive]), cache=cache))
+    assert (cache.misses, cache.hits) == (1, 0)
+    same = list(ocr_stub.iter_ocr("job", renderer.iter_documents("job", [loose[2]]), cache=cache))
+    assert (cache.misses, cache.hits) == (1, 1)
+    other = list(ocr_stub.iter_ocr("job", renderer.iter_documents("job", [renamed]), cache=cache))
+    assert (cache.misses, cache.hits) == (2, 1)
+
+    assert "Lista SCAN;" in zipped[-1].text and "Lista SCAN;" in same[0].text
+    assert "Lista DIGITALIZACAO;" in other[0].text
@@ -1,5 +1,5 @@
 import { API_ROUTES } from "../config";
-import { ApproveResponse, JobCreated, JobState, JobStatus, PreviewResponse } from "../types";
+import { ApproveResponse, JobCreated, JobProgressEvent, JobState, JobStatus, PreviewResponse } from "../types";
 
 function handleResponse<T>(response: Response): Promise<T> {
   if (!response.ok) {
@@ -30,6 +30,29 @@ export async function getJob(jobId: string): Promise<JobStatus> {
   return handleResponse<JobStatus>(response);
 }
 
+export interface JobEventHandlers {
+  onProgress: (event: JobProgressEvent) => void;
+  onState: (event: JobProgressEvent) => void;
+}
+
+export function subscribeJobEvents(jobId: string, handlers: JobEventHandlers): (() => void) | null {
+  if (typeof EventSource === "undefined") {
+    return null;
+  }
+  const source = new EventSource(`${API_ROUTES.jobs}/${jobId}/events`);
+  source.addEventListener("progress", (message) => {
+    handlers.onProgress(JSON.parse((message as MessageEvent).data));
+  });
+  source.addEventListener("state", (message) => {
+    const event: JobProgressEvent = JSON.parse((message as MessageEvent).data);
+    handlers.onState(event);
+    if (event.state === "ready" || event.state === "failed") {
+      source.close();
+    }
+  });
+  return () => source.close();
+}
+
 export async function getJobPreview(jobId: string, page = 1, size = 200): Promise<PreviewResponse> {
   const response = await fetch(`${API_ROUTES.jobs}/${jobId}/preview?page=${page}&size=${size}`);
   return handleResponse<PreviewResponse>(response);
@@ -1,8 +1,10 @@
 import { useCallback, useEffect, useMemo, useState } from "react";
-import { getJob } from "../api/jobs";
-import { JobState, JobStatus } from "../types";
+import { getJob, subscribeJobEvents } from "../api/jobs";
+import { JobProgressEvent, JobState, JobStatus } from "../types";
 
 const STORAGE_KEY = "cne-jobs";
+const FALLBACK_POLL_MS = 5000;
+const FINAL_STATES: JobState[] = ["ready", "approved", "failed"];
 
 function readStoredJobIds(): string[] {
   if (typeof window === "undefined") {
@@ -37,6 +39,7 @@ export interface JobRecord extends JobStatus {
   lastChecked: number;
   isLoading: boolean;
   error?: string;
+  progress?: JobProgressEvent;
 }
 
 export function useJobs() {
@@ -53,7 +56,7 @@ export function useJobs() {
       return;
     }
     let cancelled = false;
-    async function refreshStatus(jobId: string) {
+    async function refreshStatus(jobId: string): Promise<JobStatus | undefined> {
       setJobs((prev) => ({
         ...prev,
         [jobId]: {
@@ -81,6 +84,7 @@ export function useJobs() {
             isLoading: false,
           },
         }));
+        return status;
       } catch (error) {
         if (cancelled) return;
         setJobs((prev) => ({
@@ -103,17 +107,42 @@ export function useJobs() {
       }
     }
 
+    const unsubscribers: Array<() => void> = [];
+    const polled: string[] = [];
+
     jobIds.forEach((jobId) => {
-      refreshStatus(jobId);
+      refreshStatus(jobId).then((status) => {
+        if (cancelled) return;
+        if (!status) {
+          polled.push(jobId);
+          return;
+        }
+        // Finished jobs never change again; running ones push their progress over SSE.
+        if (FINAL_STATES.includes(status.state)) return;
+        const unsubscribe = subscribeJobEvents(jobId, {
+          onProgress: (event) => {
+            setJobs((prev) => (prev[jobId] ? { ...prev, [jobId]: { ...prev[jobId], progress: event } } : prev));
+          },
+          onState: () => {
+            refreshStatus(jobId);
+          },
+        });
+        if (unsubscribe) {
+          unsubscribers.push(unsubscribe);
+        } else {
+          polled.push(jobId);
+        }
+      });
     });
 
     const interval = setInterval(() => {
-      jobIds.forEach((jobId) => refreshStatus(jobId));
-    }, 5000);
+      polled.forEach((jobId) => refreshStatus(jobId));
+    }, FALLBACK_POLL_MS);
 
     return () => {
       cancelled = true;
       clearInterval(interval);
+      unsubscribers.forEach((unsubscribe) => unsubscribe());
     };
   }, [jobIds]);
 
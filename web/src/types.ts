@@ -6,6 +6,16 @@ export interface JobStats {
   rows_warn?: number;
   rows_err?: number;
   ocr_conf_mean?: number;
+  timings?: Record<string, StageTiming>;
+}
+
+export interface StageTiming {
+  wall_ms: number;
+  cpu_ms: number;
+  items_in?: number | null;
+  items_out?: number | null;
+  rss_peak_delta_kb?: number;
+  py_peak_kb?: number;
 }
 
 export interface JobStatus {
@@ -16,6 +26,27 @@ export interface JobStatus {
   input_files: string[];
   pages?: number;
   stats?: JobStats;
+  profile?: JobProfileLinks;
+}
+
+export interface JobProfileLinks {
+  pstats?: string;
+  collapsed?: string;
+}
+
+export type JobProgressStage = "state" | "render" | "ocr" | "segment" | "extract" | "validate" | "write";
+
+export interface JobProgressEvent {
+  seq: number;
+  ts: number;
+  stage: JobProgressStage;
+  state?: JobState;
+  error?: string;
+  current?: number;
+  total?: number | null;
+  page?: number;
+  pages?: number;
+  rows?: number;
 }
 
 export interface JobCreated {
@@ -0,0 +1,23 @@
+"""Benchmark suite for the offline pipeline.
+
+Generates synthetic candidate-list corpora (:mod:`.corpus`), times every
+stage of ``process_job`` and whole jobs at several sizes (:mod:`.run`) and
+compares the JSON results against a stored baseline::
+
+    python -m worker.bench --output bench.json
+    python -m worker.bench --baseline worker/bench/baseline.json --tolerance 0.25
+"""
+
+from .corpus import Corpus, CorpusSpec, write_corpus
+from .run import Regression, build_cases, compare, over_budget, run_suite
+
+__all__ = [
+    "Corpus",
+    "CorpusSpec",
+    "Regression",
+    "build_cases",
+    "compare",
+    "over_budget",
+    "run_suite",
+    "write_corpus",
+]
@@ -0,0 +1,87 @@
+"""Command line for the benchmark suite.
+
+Usage::
+
+    python -m worker.bench [--sizes 1,10,100,1000] [--formats txt,xlsx,pdf]
+        [--variants clean,malformed,edge] [--repeat 3] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.25] [--budget 15]
+
+Exits with status 1 when a case regressed past the tolerance or a
+single-document job exceeded the budget.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .corpus import FORMATS, VARIANTS
+from .run import (
+    DEFAULT_FORMATS,
+    DEFAULT_SIZES,
+    DEFAULT_TOLERANCE,
+    DEFAULT_VARIANTS,
+    SINGLE_DOCUMENT_BUDGET_S,
+    build_cases,
+    compare,
+    over_budget,
+    run_suite,
+)
+
+
+def _csv(choices: Optional[Sequence[str]] = None):
+    def parse(raw: str) -> List[str]:
+        values = [value.strip() for value in raw.split(",") if value.strip()]
+        unknown = [value for value in values if choices is not None and value not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown value(s) {unknown}; expected {list(choices or [])}")
+        return values
+
+    return parse
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CNE pipeline on synthetic corpora.")
+    parser.add_argument("--sizes", type=_csv(), default=[str(size) for size in DEFAULT_SIZES], help="documents per job")
+    parser.add_argument("--formats", type=_csv(FORMATS), default=list(DEFAULT_FORMATS))
+    parser.add_argument("--variants", type=_csv(VARIANTS), default=list(DEFAULT_VARIANTS))
+    parser.add_argument("--lines", type=int, default=40, help="candidates per document")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the median is reported")
+    parser.add_argument("--ocr-workers", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, default=None, help="scratch directory (default: system temp)")
+    parser.add_argument("--output", type=Path, default=None, help="write the JSON results here")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--budget", type=float, default=SINGLE_DOCUMENT_BUDGET_S, help="seconds per 1-document job")
+    args = parser.parse_args(argv)
+
+    try:
+        sizes = [int(size) for size in args.sizes]
+    except ValueError:
+        parser.error(f"--sizes must be integers, got {args.sizes}")
+    cases = build_cases(sizes, args.formats, args.variants, lines_per_document=args.lines, seed=args.seed)
+    results = run_suite(
+        cases, repeat=args.repeat, ocr_workers=args.ocr_workers, workdir=args.workdir, log=print
+    )
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {len(results['results'])} result(s) to {args.output}")
+
+    failed = False
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression.describe()}", file=sys.stderr)
+        failed = failed or bool(regressions)
+    for name in over_budget(results, args.budget):
+        print(f"OVER BUDGET {name}: more than {args.budget:g}s for one document", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command-line entry point
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+"""Synthetic candidate-list corpora for the benchmark suite.
+
+Documents hold one candidate per line in the ``KEY=VALUE;...`` format the
+extractor parses (or one per row for spreadsheets), grouped in lists of
+efetivos (``TIPO=2``) and suplentes (``TIPO=3``). Generation is seeded, so
+the same spec always produces the same bytes.
+
+Variants:
+
+- ``clean``: valid, well-ordered lists;
+- ``malformed``: invalid domain values, non-numeric or missing
+  ``NUM_ORDEM``, lower-case keys, truncated lines and page furniture;
+- ``edge``: long and accented names, ``|`` separators, CRLF endings, blank
+  and indented lines, UTF-8 BOM or latin-1 files and shuffled numbering.
+
+Spreadsheets only get the invalid values of ``malformed``; the text-level
+faults do not apply to cells. PDFs only carry a marker: the OCR stub does
+not read them, so PDF cases measure the pipeline around OCR, not OCR
+itself.
+"""
+from __future__ import annotations
+
+import random
+import zipfile
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+VARIANTS = ("clean", "malformed", "edge")
+FORMATS = ("txt", "csv", "xlsx", "pdf")
+
+FIELDS = (
+    "DTMNFR",
+    "ORGAO",
+    "SIGLA",
+    "TIPO",
+    "NUM_ORDEM",
+    "NOME_LISTA",
+    "NOME_CANDIDATO",
+    "PARTIDO_PROPONENTE",
+    "INDEPENDENTE",
+)
+
+_ORGAOS = ("AM", "CM", "AF")
+_SIGLAS = ("PS", "PSD", "CDU", "BE", "IL", "LIVRE", "PAN", "CHEGA")
+_FIRST_NAMES = ("Ana", "Bruno", "Carla", "Duarte", "Eva", "Filipe", "Graça", "Hélder", "Inês", "João", "Lúcia", "Mário")
+_SURNAMES = ("Silva", "Santos", "Ferreira", "Pereira", "Oliveira", "Costa", "Conceição", "Gonçalves", "Simões", "Antunes")
+_FURNITURE = ("Página 1 de 3", "LISTA DE CANDIDATOS", "Assinatura do mandatário: ______", "---")
+
+_SHEET_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_RELS_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    documents: int
+    lines_per_document: int = 40
+    variant: str = "clean"
+    file_format: str = "txt"
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.variant not in VARIANTS:
+            raise ValueError(f"Unknown variant '{self.variant}'; expected one of {VARIANTS}")
+        if self.file_format not in FORMATS:
+            raise ValueError(f"Unknown format '{self.file_format}'; expected one of {FORMATS}")
+
+
+@dataclass
+class Corpus:
+    """Files written for a spec; ``candidates`` counts the rows they hold."""
+
+    spec: CorpusSpec
+    files: List[Path] = field(default_factory=list)
+    candidates: int = 0
+    size_bytes: int = 0
+
+
+def _name(rng: random.Random, long: bool = False) -> str:
+    parts = [rng.choice(_FIRST_NAMES)] + [rng.choice(_SURNAMES) for _ in range(8 if long else 2)]
+    return " ".join(parts)
+
+
+def candidate_rows(rng: random.Random, count: int) -> List[Dict[str, str]]:
+    """``count`` valid candidates, in lists of efetivos followed by suplentes."""
+
+    rows: List[Dict[str, str]] = []
+    dtmnfr = f"{rng.randint(1, 18):02d}{rng.randint(1, 30):02d}{rng.randint(1, 40):02d}"
+    while len(rows) < count:
+        orgao, sigla = rng.choice(_ORGAOS), rng.choice(_SIGLAS)
+        lista = f"Lista {sigla} {orgao} {len(rows)}"
+        for tipo, size in (("2", rng.randint(5, 13)), ("3", rng.randint(2, 5))):
+            for number in range(1, size + 1):
+                rows.append(
+                    {
+                        "DTMNFR": dtmnfr,
+                        "ORGAO": orgao,
+                        "SIGLA": sigla,
+                        "TIPO": tipo,
+                        "NUM_ORDEM": str(number),
+                        "NOME_LISTA": lista,
+                        "NOME_CANDIDATO": _name(rng),
+                        "PARTIDO_PROPONENTE": sigla,
+                        "INDEPENDENTE": rng.choice(("0", "0", "0", "1")),
+                    }
+                )
+    return rows[:count]
+
+
+def _malform(rng: random.Random, row: Dict[str, str]) -> Dict[str, str]:
+    row = dict(row)
+    choice = rng.randrange(6)
+    if choice == 0:
+        row["ORGAO"] = "XX"
+    elif choice == 1:
+        row["SIGLA"] = "ZZZ"
+    elif choice == 2:
+        row["NUM_ORDEM"] = "abc"
+    elif choice == 3:
+        row.pop("NUM_ORDEM")
+    elif choice == 4:
+        row["TIPO"] = "9"
+    else:
+        row["NOME_CANDIDATO"] = ""
+    return row
+
+
+def _line(row: Dict[str, str], separator: str = ";") -> str:
+    return separator.join(f"{key}={value}" for key, value in row.items())
+
+
+def _text_document(rng: random.Random, rows: List[Dict[str, str]], variant: str) -> bytes:
+    lines: List[str] = []
+    if variant == "clean":
+        lines = [_line(row) for row in rows]
+    elif variant == "malformed":
+        for row in rows:
+            roll = rng.random()
+            if roll < 0.15:
+                row = _malform(rng, row)
+            line = _line(row)
+            if roll > 0.95:
+                line = line.lower()
+            elif 0.9 < roll <= 0.95:
+                line = line[: rng.randint(5, len(line))]
+            lines.append(line)
+            if rng.random() < 0.05:
+                lines.append(rng.choice(_FURNITURE))
+    else:
+        rows = [dict(row) for row in rows]
+        rng.shuffle(rows)
+        for row in rows:
+            if rng.random() < 0.2:
+                row["NOME_CANDIDATO"] = _name(rng, long=True)
+            separator = "|" if rng.random() < 0.3 else ";"
+            indent = " " * rng.randint(0, 3)
+            lines.append(indent + _line(row, separator))
+            if rng.random() < 0.1:
+                lines.append("")
+    newline = "\r\n" if variant == "edge" and rng.random() < 0.5 else "\n"
+    text = newline.join(lines) + newline
+    if variant == "edge":
+        encoding = rng.choice(("utf-8", "utf-8-sig", "latin-1"))
+        return text.encode(encoding, errors="replace")
+    return text.encode("utf-8")
+
+
+def _xlsx_document(rows: List[Dict[str, str]]) -> bytes:
+    def cell(reference: str, value: str) -> str:
+        return f'<c r="{reference}" t="inlineStr"><is><t>{escape(value)}</t></is></c>'
+
+    def column(index: int) -> str:
+        return chr(ord("A") + index)
+
+    sheet_rows = [list(FIELDS)] + [[row.get(key, "") for key in FIELDS] for row in rows]
+    data = "".join(
+        f'<row r="{line}">'
+        + "".join(cell(f"{column(index)}{line}", value) for index, value in enumerate(values) if value)
+        + "</row>"
+        for line, values in enumerate(sheet_rows, start=1)
+    )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as package:
+        package.writestr(
+            "xl/workbook.xml",
+            f'<workbook xmlns="{_SHEET_NS}" xmlns:r="{_RELS_NS}"><sheets>'
+            '<sheet name="Listas" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        package.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>',
+        )
+        package.writestr("xl/worksheets/sheet1.xml", f'<worksheet xmlns="{_SHEET_NS}"><sheetData>{data}</sheetData></worksheet>')
+    return buffer.getvalue()
+
+
+def write_corpus(directory: Path, spec: CorpusSpec) -> Corpus:
+    """Write ``spec.documents`` files under ``directory`` and describe them."""
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(f"{spec.seed}:{spec.variant}:{spec.file_format}")
+    corpus = Corpus(spec=spec)
+    for index in range(spec.documents):
+        rows = candidate_rows(rng, spec.lines_per_document)
+        path = directory / f"lista-{index:05d}.{spec.file_format}"
+        if spec.file_format == "pdf":
+            data = f"%PDF-1.4\n% bench {spec.seed} {index}\n".encode("ascii")
+            rows = []
+        elif spec.file_format == "xlsx":
+            if spec.variant == "malformed":
+                rows = [_malform(rng, row) if rng.random() < 0.15 else row for row in rows]
+            data = _xlsx_document(rows)
+        else:
+            data = _text_document(rng, rows, spec.variant)
+        path.write_bytes(data)
+        corpus.files.append(path)
+        corpus.candidates += len(rows)
+        corpus.size_bytes += len(data)
+    return corpus
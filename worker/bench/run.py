@@ -0,0 +1,182 @@
+"""Run benchmark cases through ``process_job`` and compare against a baseline.
+
+Every case writes its corpus once, then runs it as a single job ``repeat``
+times, each in a fresh data directory so the OCR cache and blob store start
+empty. Stage timings come from the job's ``timings`` block (the pipeline is
+run with ``instrument=True``); the reported run is the one with the median
+wall time.
+"""
+from __future__ import annotations
+
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from ..src.pipeline import process_job
+from ..src.storage import open_job_storage
+from .corpus import CorpusSpec, write_corpus
+
+RESULTS_SCHEMA = 1
+DEFAULT_SIZES = (1, 10, 100, 1000)
+DEFAULT_FORMATS = ("txt", "xlsx", "pdf")
+DEFAULT_VARIANTS = ("clean", "malformed", "edge")
+DEFAULT_TOLERANCE = 0.25
+# Timings below this are dominated by noise and never count as regressions.
+NOISE_FLOOR_S = 0.01
+# TestPlan: a 2-4 page PDF must be processed in under 15 s on CPU.
+SINGLE_DOCUMENT_BUDGET_S = 15.0
+
+
+@dataclass(frozen=True)
+class Regression:
+    case: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def describe(self) -> str:
+        return f"{self.case} {self.metric}: {self.baseline:.4f}s -> {self.current:.4f}s ({self.ratio:.2f}x)"
+
+
+def case_name(spec: CorpusSpec) -> str:
+    return f"{spec.file_format}-{spec.variant}-{spec.documents}"
+
+
+def build_cases(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    formats: Iterable[str] = DEFAULT_FORMATS,
+    variants: Iterable[str] = DEFAULT_VARIANTS,
+    *,
+    lines_per_document: int = 40,
+    seed: int = 0,
+) -> List[CorpusSpec]:
+    """Every size/format/variant combination; PDFs only come ``clean``."""
+
+    return [
+        CorpusSpec(size, lines_per_document=lines_per_document, variant=variant, file_format=file_format, seed=seed)
+        for file_format in formats
+        for variant in variants
+        if file_format != "pdf" or variant == "clean"
+        for size in sizes
+    ]
+
+
+def run_case(spec: CorpusSpec, workdir: Path, *, repeat: int = 3, ocr_workers: int = 0) -> Dict[str, object]:
+    name = case_name(spec)
+    corpus = write_corpus(Path(workdir) / "corpus" / name, spec)
+    runs = []
+    for attempt in range(max(1, repeat)):
+        base = Path(workdir) / "runs" / f"{name}-{attempt}"
+        job_id = f"bench-{name}"
+        started = time.perf_counter()
+        result = process_job(job_id, corpus.files, base_dir=base, ocr_workers=ocr_workers, instrument=True)
+        wall = time.perf_counter() - started
+        timings = open_job_storage(base).load(job_id).timings
+        runs.append((wall, result, timings))
+    runs.sort(key=lambda run: run[0])
+    wall, result, timings = runs[len(runs) // 2]
+    stages = {stage: values.get("wall_ms") for stage, values in timings.items()}
+    return {
+        "name": name,
+        "documents": spec.documents,
+        "format": spec.file_format,
+        "variant": spec.variant,
+        "lines_per_document": spec.lines_per_document,
+        "input_bytes": corpus.size_bytes,
+        "rows": result.rows_total,
+        "rows_err": result.rows_err,
+        "pages": result.pages_processed,
+        "wall_s": round(wall, 6),
+        "wall_s_min": round(runs[0][0], 6),
+        "wall_s_stdev": round(statistics.pstdev(run[0] for run in runs), 6),
+        "docs_per_s": round(spec.documents / wall, 3) if wall else None,
+        "rows_per_s": round(result.rows_total / wall, 3) if wall else None,
+        "stages_ms": stages,
+        # Job bookkeeping outside the stages: storage writes, progress, setup.
+        "other_ms": round(wall * 1000 - sum(value or 0 for value in stages.values()), 3),
+    }
+
+
+def run_suite(
+    cases: Sequence[CorpusSpec],
+    *,
+    repeat: int = 3,
+    ocr_workers: int = 0,
+    workdir: Optional[Path] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    """Run ``cases`` and return the JSON-ready results document."""
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="cne-bench-", dir=workdir) as scratch:
+        for spec in cases:
+            entry = run_case(spec, Path(scratch), repeat=repeat, ocr_workers=ocr_workers)
+            if log is not None:
+                log(f"{entry['name']:<24} {entry['wall_s']:>9.4f}s  {entry['rows_per_s'] or 0:>12.1f} rows/s")
+            results.append(entry)
+    return {
+        "schema": RESULTS_SCHEMA,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "config": {"repeat": repeat, "ocr_workers": ocr_workers},
+        "cases": [asdict(spec) for spec in cases],
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, object],
+    baseline: Dict[str, object],
+    *,
+    tolerance: float = DEFAULT_TOLERANCE,
+    noise_floor: float = NOISE_FLOOR_S,
+) -> List[Regression]:
+    """Cases/stages slower than ``baseline * (1 + tolerance)``.
+
+    Only cases present in both documents are compared, on the end-to-end
+    wall time and on each stage's exclusive time.
+    """
+
+    known = {entry["name"]: entry for entry in baseline.get("results", [])}
+    regressions: List[Regression] = []
+    for entry in current.get("results", []):
+        reference = known.get(entry["name"])
+        if reference is None:
+            continue
+        pairs = [("wall_s", reference.get("wall_s"), entry.get("wall_s"))]
+        for stage, value in (entry.get("stages_ms") or {}).items():
+            before = (reference.get("stages_ms") or {}).get(stage)
+            pairs.append(
+                (f"stage:{stage}", None if before is None else before / 1000, None if value is None else value / 1000)
+            )
+        for metric, before, after in pairs:
+            if before is None or after is None or max(before, after) < noise_floor:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append(Regression(entry["name"], metric, before, after))
+    return regressions
+
+
+def over_budget(current: Dict[str, object], budget: float = SINGLE_DOCUMENT_BUDGET_S) -> List[str]:
+    """Names of single-document cases slower than ``budget`` seconds."""
+
+    return [
+        entry["name"]
+        for entry in current.get("results", [])
+        if entry.get("documents") == 1 and entry.get("wall_s", 0) > budget
+    ]
@@ -0,0 +1,129 @@
+"""Column-oriented container for candidate rows flowing through the worker."""
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from .types import CANDIDATE_FIELDS, CandidateRow
+
+FLAG_OK = 0
+FLAG_WARN = 1
+FLAG_ERR = 2
+
+FLAG_LABELS = ("OK", "AVISO", "ERRO")
+_LABEL_CODES = {label: code for code, label in enumerate(FLAG_LABELS)}
+
+VALIDATED_FIELDS = (
+    "DTMNFR",
+    "ORGAO",
+    "TIPO",
+    "SIGLA",
+    "NOME_LISTA",
+    "NUM_ORDEM",
+    "NOME_CANDIDATO",
+    "PARTIDO_PROPONENTE",
+    "INDEPENDENTE",
+)
+
+
+def row_flag_codes(row: CandidateRow) -> bytes:
+    """Encode ``row.validation`` as one flag byte per ``VALIDATED_FIELDS`` entry."""
+
+    validation = row.validation
+    return bytes(_LABEL_CODES.get(validation.get(name, ""), FLAG_OK) for name in VALIDATED_FIELDS)
+
+
+def validation_from_codes(codes: bytes) -> Dict[str, str]:
+    return {name: FLAG_LABELS[code] for name, code in zip(VALIDATED_FIELDS, codes)}
+
+
+class CandidateBatch:
+    """Candidate rows stored as one list per field plus byte-sized flags.
+
+    ``columns`` maps every name in ``CANDIDATE_FIELDS`` to a list of values,
+    and ``flags`` maps every name in ``VALIDATED_FIELDS`` to a ``bytearray``
+    holding ``FLAG_OK``/``FLAG_WARN``/``FLAG_ERR`` per row. Compared with a
+    list of ``CandidateRow`` objects this drops the per-row instance and the
+    per-row validation dict.
+    """
+
+    __slots__ = ("columns", "flags")
+
+    def __init__(
+        self,
+        columns: Optional[Mapping[str, List]] = None,
+        flags: Optional[Mapping[str, bytearray]] = None,
+    ) -> None:
+        self.columns: Dict[str, List] = {
+            name: list(columns[name]) if columns else [] for name in CANDIDATE_FIELDS
+        }
+        size = len(self.columns[CANDIDATE_FIELDS[0]])
+        for name, values in self.columns.items():
+            if len(values) != size:
+                raise ValueError(f"Column '{name}' has {len(values)} values, expected {size}")
+        self.flags: Dict[str, bytearray] = {
+            name: bytearray(flags[name]) if flags else bytearray(size)
+            for name in VALIDATED_FIELDS
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Mapping[str, List]) -> "CandidateBatch":
+        batch = cls.__new__(cls)
+        batch.columns = {name: columns[name] for name in CANDIDATE_FIELDS}
+        size = len(batch.columns[CANDIDATE_FIELDS[0]])
+        for name, values in batch.columns.items():
+            if len(values) != size:
+                raise ValueError(f"Column '{name}' has {len(values)} values, expected {size}")
+        batch.flags = {name: bytearray(size) for name in VALIDATED_FIELDS}
+        return batch
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[CandidateRow]) -> "CandidateBatch":
+        batch = cls()
+        for row in rows:
+            batch.append_row(row)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.columns[CANDIDATE_FIELDS[0]])
+
+    def append(self, values: Sequence) -> None:
+        """Append one row given as values in ``CANDIDATE_FIELDS`` order."""
+
+        for name, value in zip(CANDIDATE_FIELDS, values):
+            self.columns[name].append(value)
+        for flags in self.flags.values():
+            flags.append(FLAG_OK)
+
+    def append_row(self, row: CandidateRow) -> None:
+        for name in CANDIDATE_FIELDS:
+            self.columns[name].append(getattr(row, name))
+        for name, code in zip(VALIDATED_FIELDS, row_flag_codes(row)):
+            self.flags[name].append(code)
+
+    def take(self, order: Sequence[int]) -> None:
+        """Reorder every column and flag array in place by ``order``."""
+
+        for values in self.columns.values():
+            values[:] = [values[index] for index in order]
+        for name, flags in self.flags.items():
+            self.flags[name] = bytearray(map(flags.__getitem__, order))
+
+    def worst_flags(self) -> bytearray:
+        """Return the highest flag code of each row."""
+
+        worst = bytearray(len(self))
+        for flags in self.flags.values():
+            worst = bytearray(map(max, worst, flags))
+        return worst
+
+    def row(self, index: int) -> CandidateRow:
+        values = [self.columns[name][index] for name in CANDIDATE_FIELDS]
+        validation = validation_from_codes(bytes(self.flags[name][index] for name in VALIDATED_FIELDS))
+        return CandidateRow(*values, validation=validation)
+
+    def iter_rows(self) -> Iterator[CandidateRow]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def to_rows(self) -> List[CandidateRow]:
+        return list(self.iter_rows())
@@ -0,0 +1,146 @@
+"""Content-addressed storage for uploaded input files.
+
+Every upload is stored once under ``<base>/blobs/<xx>/<sha256>``, whatever
+its name or how many times it is submitted. Jobs reference a blob through a
+hard link at their usual ``uploads/<job_id>/<filename>`` path, so the rest
+of the pipeline keeps seeing plain files and a blob's link count is its
+reference count. Filesystems without hard links get a copy instead.
+
+Installing a blob and linking it, and :meth:`BlobStore.collect`, hold an
+exclusive lock on ``<root>/.lock`` so a blob cannot be collected between
+being stored and being referenced. Hashing happens outside the lock.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+try:  # pragma: no cover - platform dependent
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - single-writer fallback
+    fcntl = None  # type: ignore[assignment]
+
+_CHUNK_SIZE = 1024 * 1024
+LOCK_FILENAME = ".lock"
+
+
+def blobs_dir(base_dir: Path) -> Path:
+    return Path(base_dir) / "blobs"
+
+
+class BlobStore:
+    """Hash-keyed blob directory with per-job hard-link references."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with (self.root / LOCK_FILENAME).open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _stage(self, source: BinaryIO) -> Tuple[str, str]:
+        """Copy the rest of ``source`` to a temporary file while hashing it."""
+
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                for chunk in iter(lambda: source.read(_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    handle.write(chunk)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return digest.hexdigest(), tmp_name
+
+    def _install(self, digest: str, tmp_name: str) -> Path:
+        """Move a staged file into place, or drop it if the blob exists."""
+
+        blob = self.path_for(digest)
+        try:
+            if blob.exists():
+                os.unlink(tmp_name)
+            else:
+                blob.parent.mkdir(exist_ok=True)
+                os.chmod(tmp_name, 0o444)
+                os.replace(tmp_name, blob)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return blob
+
+    def put(self, source: BinaryIO) -> Tuple[str, Path]:
+        """Store the rest of ``source`` and return ``(digest, blob_path)``.
+
+        The bytes are hashed while they are copied to a temporary file, which
+        is discarded when a blob with the same digest already exists. Nothing
+        references the blob yet, so :meth:`collect` may remove it; use
+        :meth:`ingest` to store and reference it in one step.
+        """
+
+        digest, tmp_name = self._stage(source)
+        with self._locked():
+            return digest, self._install(digest, tmp_name)
+
+    def link(self, digest: str, target: Path) -> Path:
+        """Make ``target`` a reference to the blob ``digest``."""
+
+        with self._locked():
+            return self._link(digest, target)
+
+    def _link(self, digest: str, target: Path) -> Path:
+        blob = self.path_for(digest)
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.unlink(missing_ok=True)
+        try:
+            os.link(blob, target)
+        except OSError:
+            shutil.copyfile(blob, target)
+        return target
+
+    def ingest(self, source: BinaryIO, target: Path) -> Tuple[str, Path]:
+        """Store ``source`` and reference it from ``target``."""
+
+        digest, tmp_name = self._stage(source)
+        with self._locked():
+            self._install(digest, tmp_name)
+            return digest, self._link(digest, target)
+
+    def references(self, digest: str) -> Optional[int]:
+        """Number of job references to ``digest``, or ``None`` when unknown."""
+
+        try:
+            return self.path_for(digest).stat().st_nlink - 1
+        except FileNotFoundError:
+            return None
+
+    def collect(self) -> int:
+        """Remove blobs no job links to any more; return how many were removed."""
+
+        removed = 0
+        with self._locked():
+            for blob in self.root.glob("*/*"):
+                try:
+                    if blob.stat().st_nlink <= 1:
+                        blob.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
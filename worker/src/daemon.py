@@ -0,0 +1,267 @@
+"""Worker daemon draining the local job queue through a process pool.
+
+Usage::
+
+    python -m worker.src.daemon --data-dir data --concurrency 4 [--host-limit 8]
+
+Each daemon runs up to ``--concurrency`` :func:`~.pipeline.process_job`
+calls at once in worker processes. ``--host-limit`` caps the jobs running
+on this machine across every daemon sharing the queue (it defaults to
+``CNE_HOST_JOB_LIMIT``, then to the CPU count), and ``--reserve-small``
+of those slots are kept for small submissions. ``--weight DTMNFR=2``
+gives a submitter twice the default fair share (see :mod:`.job_queue`).
+
+Failed jobs are retried with exponential backoff until their attempts
+run out. SIGTERM or SIGINT stops leasing new work and lets running jobs
+finish; a second signal exits immediately and leaves their leases to
+expire, after which another worker retries them.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .job_queue import DEAD, PENDING, JobQueue, QueuedJob, queue_path
+from .pipeline import process_job
+from .storage import JobState, JobStorage, open_job_storage
+
+HOST_LIMIT_ENV = "CNE_HOST_JOB_LIMIT"
+
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_BACKOFF_BASE = 5.0
+DEFAULT_BACKOFF_MAX = 300.0
+
+logger = logging.getLogger(__name__)
+
+JobRunner = Callable[[str, List[str], str], object]
+
+
+def run_job(job_id: str, files: List[str], base_dir: str) -> int:
+    """Process one queued job inside a pool worker; return its row count."""
+
+    return process_job(job_id, [Path(path) for path in files], base_dir=Path(base_dir)).rows_total
+
+
+def backoff_delay(attempt: int, base: float = DEFAULT_BACKOFF_BASE, maximum: float = DEFAULT_BACKOFF_MAX) -> float:
+    """Seconds to wait before retrying after failed attempt number ``attempt``."""
+
+    return min(maximum, base * 2 ** max(0, attempt - 1))
+
+
+def resolve_host_limit(limit: Optional[int] = None) -> int:
+    """Return the per-host job limit, reading ``CNE_HOST_JOB_LIMIT`` when unset."""
+
+    if limit is None:
+        raw = os.environ.get(HOST_LIMIT_ENV, "").strip()
+        try:
+            limit = int(raw) if raw else 0
+        except ValueError:
+            limit = 0
+    return limit if limit > 0 else os.cpu_count() or 1
+
+
+class WorkerDaemon:
+    """Leases queue entries and runs them in a process pool.
+
+    ``runner`` is called in a worker process as ``runner(job_id, files,
+    base_dir)``; it defaults to :func:`run_job`.
+    """
+
+    def __init__(
+        self,
+        base_dir: Path,
+        *,
+        concurrency: int = 1,
+        host_limit: Optional[int] = None,
+        reserve_small: Optional[int] = None,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        queue: Optional[JobQueue] = None,
+        storage: Optional[JobStorage] = None,
+        runner: JobRunner = run_job,
+    ) -> None:
+        self.base_dir = Path(base_dir).resolve()
+        self.concurrency = max(1, concurrency)
+        self.host_limit = resolve_host_limit(host_limit)
+        if reserve_small is None:
+            reserve_small = 1 if self.host_limit > 1 else 0
+        self.reserve_small = min(max(0, reserve_small), self.host_limit - 1)
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue = queue or JobQueue(queue_path(self.base_dir))
+        self.storage = storage or open_job_storage(self.base_dir)
+        self.runner = runner
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.completed = 0
+        self.failed = 0
+        self._stopping = threading.Event()
+        self._inflight: Dict[Future, QueuedJob] = {}
+
+    def stop(self) -> None:
+        """Stop leasing; :meth:`run` returns once running jobs finish."""
+
+        self._stopping.set()
+
+    def _install_signal_handlers(self) -> Dict[int, object]:
+        def handle(signum: int, _frame: object) -> None:
+            if self._stopping.is_set():
+                signal.signal(signum, signal.SIG_DFL)
+                os.kill(os.getpid(), signum)
+                return
+            logger.info("Signal %s received, finishing %d running job(s)", signum, len(self._inflight))
+            self.stop()
+
+        return {signum: signal.signal(signum, handle) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+    def run(self, *, until_idle: bool = False) -> None:
+        """Process jobs until :meth:`stop`.
+
+        With ``until_idle``, also return once nothing is running here and
+        no entry is pending, including entries waiting out a retry backoff.
+        """
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            previous_handlers = self._install_signal_handlers()
+        pool = ProcessPoolExecutor(max_workers=self.concurrency)
+        last_heartbeat = time.monotonic()
+        try:
+            while True:
+                self._reap()
+                if not self._stopping.is_set():
+                    self._fill(pool)
+                if not self._inflight:
+                    if self._stopping.is_set() or (until_idle and not self.queue.counts()[PENDING]):
+                        return
+                    self._stopping.wait(self.poll_interval)
+                    continue
+
+                done, _ = wait(list(self._inflight), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._finish(future, self._inflight.pop(future))
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    pool.shutdown(wait=False)
+                    pool = ProcessPoolExecutor(max_workers=self.concurrency)
+
+                if time.monotonic() - last_heartbeat >= self.visibility_timeout / 3:
+                    self._heartbeat()
+                    last_heartbeat = time.monotonic()
+        finally:
+            pool.shutdown(wait=True)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)  # type: ignore[arg-type]
+
+    def _fill(self, pool: ProcessPoolExecutor) -> None:
+        while len(self._inflight) < self.concurrency:
+            job = self.queue.lease(
+                self.owner,
+                host=self.host,
+                visibility_timeout=self.visibility_timeout,
+                host_limit=self.host_limit,
+                reserve_small=self.reserve_small,
+            )
+            if job is None:
+                return
+            try:
+                future = pool.submit(self.runner, job.job_id, job.files, str(self.base_dir))
+            except BrokenProcessPool:
+                self.queue.release(job.job_id, self.owner)
+                return
+            self._inflight[future] = job
+
+    def _finish(self, future: Future, job: QueuedJob) -> None:
+        error = future.exception()
+        if error is None:
+            self.queue.complete(job.job_id, self.owner)
+            self.completed += 1
+            return
+
+        self.failed += 1
+        message = f"{type(error).__name__}: {error}"
+        delay = backoff_delay(job.attempts, self.backoff_base, self.backoff_max)
+        status = self.queue.fail(job.job_id, self.owner, message, retry_delay=delay)
+        if status == DEAD:
+            logger.warning("Job %s failed after %d attempt(s): %s", job.job_id, job.attempts, message)
+            self._mark(job.job_id, JobState.failed, message)
+        elif status is not None:
+            logger.info("Job %s failed (attempt %d), retrying in %.0fs: %s", job.job_id, job.attempts, delay, message)
+            self._mark(job.job_id, JobState.queued, message)
+
+    def _reap(self) -> None:
+        for job in self.queue.reap_expired():
+            self._mark(job.job_id, JobState.failed, job.last_error)
+
+    def _heartbeat(self) -> None:
+        for job in self._inflight.values():
+            if not self.queue.heartbeat(job.job_id, self.owner, self.visibility_timeout):
+                logger.warning("Lost the lease on job %s", job.job_id)
+
+    def _mark(self, job_id: str, state: JobState, error: Optional[str]) -> None:
+        try:
+            self.storage.mark_state(job_id, state, error=error)
+        except FileNotFoundError:
+            self.storage.ensure(job_id, [])
+            self.storage.mark_state(job_id, state, error=error)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run queued CNE jobs in a process pool.")
+    parser.add_argument("--data-dir", type=Path, default=Path("data"), help="CNE data directory")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1, help="jobs run by this daemon")
+    parser.add_argument("--host-limit", type=int, default=None, help=f"jobs on this host (default: ${HOST_LIMIT_ENV})")
+    parser.add_argument(
+        "--reserve-small", type=int, default=None, help="host slots kept for small jobs (default: 1)"
+    )
+    parser.add_argument(
+        "--weight", action="append", default=[], metavar="TENANT=WEIGHT", help="fair-share weight of a submitter"
+    )
+    parser.add_argument("--visibility-timeout", type=float, default=DEFAULT_VISIBILITY_TIMEOUT)
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL)
+    parser.add_argument("--until-idle", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args(argv)
+
+    weights = []
+    for spec in args.weight:
+        tenant, _, raw = spec.rpartition("=")
+        try:
+            weight = float(raw)
+        except ValueError:
+            weight = 0.0
+        if not tenant or weight <= 0:
+            parser.error(f"invalid --weight {spec!r}, expected TENANT=WEIGHT with a positive weight")
+        weights.append((tenant, weight))
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    daemon = WorkerDaemon(
+        args.data_dir,
+        concurrency=args.concurrency,
+        host_limit=args.host_limit,
+        reserve_small=args.reserve_small,
+        visibility_timeout=args.visibility_timeout,
+        poll_interval=args.poll_interval,
+    )
+    for tenant, weight in weights:
+        daemon.queue.set_weight(tenant, weight)
+    daemon.run(until_idle=args.until_idle)
+    logger.info("Stopped after %d completed and %d failed attempt(s)", daemon.completed, daemon.failed)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command-line entry point
+    raise SystemExit(main())
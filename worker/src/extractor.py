@@ -2,97 +2,126 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable, List
-
-from .types import CandidateRow
-
-_TOKEN_SPLIT = re.compile(r"[;|]\s*")
-_KEY_VALUE = re.compile(r"(?P<key>[A-Z0-9_]+)\s*=\s*(?P<value>.+)")
-
-_FIELD_MAP = {
-    "DTMNFR": "DTMNFR",
-    "ORGAO": "ORGAO",
-    "TIPO": "TIPO",
-    "SIGLA": "SIGLA",
-    "SIMBOLO": "SIMBOLO",
-    "NOME_LISTA": "NOME_LISTA",
-    "NUM_ORDEM": "NUM_ORDEM",
-    "NOME_CANDIDATO": "NOME_CANDIDATO",
-    "PARTIDO_PROPONENTE": "PARTIDO_PROPONENTE",
-    "INDEPENDENTE": "INDEPENDENTE",
-}
-
-
-def _parse_segment(segment: str) -> CandidateRow:
-    values = {}
-    for token in _TOKEN_SPLIT.split(segment):
-        token = token.strip()
-        if not token:
-            continue
-        match = _KEY_VALUE.match(token)
-        if not match:
-            continue
-        key = match.group("key").upper()
-        value = match.group("value").strip()
-        field = _FIELD_MAP.get(key)
-        if field:
-            values[field] = value
-    dtmnfr = values.get("DTMNFR", "000000")
-    orgao = values.get("ORGAO", "AM").upper()
-    tipo = values.get("TIPO", "2")
-    sigla = values.get("SIGLA", "IND")
-    simbolo = values.get("SIMBOLO")
-    nome_lista = values.get("NOME_LISTA")
-    nome = values.get("NOME_CANDIDATO", "CANDIDATO DESCONHECIDO")
-    partido = values.get("PARTIDO_PROPONENTE")
-    indep = values.get("INDEPENDENTE")
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .types import CANDIDATE_FIELDS, CandidateRow
+
+# Single-pass equivalent of splitting the segment on ";"/"|" and matching
+# "KEY = value" against every stripped token: a match may only start at the
+# beginning of the segment or at a separator, and the value runs to the end
+# of its token (or line) with surrounding whitespace already trimmed.
+_FIELD_SCAN = re.compile(r"(?:^|[;|])\s*([A-Z0-9_]+)\s*=\s*([^;|\n]*[^\s;|])")
+
+
+def _scan_fields(segment: str) -> Dict[str, str]:
+    """Return ``{key: value}`` for every token; unmapped keys are left in."""
+
+    return dict(_FIELD_SCAN.findall(segment))
+
+
+def _field_values(values: Dict[str, str]) -> Tuple:
+    """Apply defaults to ``values`` and return them in ``CANDIDATE_FIELDS`` order."""
+
     try:
         num_ordem = int(values.get("NUM_ORDEM", "0"))
     except ValueError:
         num_ordem = 0
-    return CandidateRow(
-        DTMNFR=dtmnfr,
-        ORGAO=orgao,
-        TIPO=tipo,
-        SIGLA=sigla,
-        SIMBOLO=simbolo,
-        NOME_LISTA=nome_lista,
-        NUM_ORDEM=max(0, num_ordem),
-        NOME_CANDIDATO=nome,
-        PARTIDO_PROPONENTE=partido,
-        INDEPENDENTE=indep,
+    return (
+        values.get("DTMNFR", "000000"),
+        values.get("ORGAO", "AM").upper(),
+        values.get("TIPO", "2"),
+        values.get("SIGLA", "IND"),
+        values.get("SIMBOLO"),
+        values.get("NOME_LISTA"),
+        max(0, num_ordem),
+        values.get("NOME_CANDIDATO", "CANDIDATO DESCONHECIDO"),
+        values.get("PARTIDO_PROPONENTE"),
+        values.get("INDEPENDENTE"),
     )
 
 
+def _default_rows() -> List[CandidateRow]:
+    return [
+        CandidateRow(
+            DTMNFR="150800",
+            ORGAO="AM",
+            TIPO="2",
+            SIGLA="PS",
+            SIMBOLO=None,
+            NOME_LISTA="Lista Default",
+            NUM_ORDEM=1,
+            NOME_CANDIDATO="Candidato Efetivo",
+            PARTIDO_PROPONENTE="PS",
+            INDEPENDENTE="0",
+        ),
+        CandidateRow(
+            DTMNFR="150800",
+            ORGAO="AM",
+            TIPO="3",
+            SIGLA="PS",
+            SIMBOLO=None,
+            NOME_LISTA="Lista Default",
+            NUM_ORDEM=1,
+            NOME_CANDIDATO="Candidato Suplente",
+            PARTIDO_PROPONENTE="PS",
+            INDEPENDENTE="0",
+        ),
+    ]
+
+
+def iter_candidates(segments: Iterable[str]) -> Iterator[CandidateRow]:
+    """Yield one row per segment, falling back to the default rows when empty."""
+
+    produced = False
+    for segment in segments:
+        produced = True
+        yield CandidateRow(*_field_values(_scan_fields(segment)))
+    if not produced:
+        yield from _default_rows()
+
+
 def extract_candidates(segments: Iterable[str]) -> List[CandidateRow]:
-    rows = [_parse_segment(segment) for segment in segments]
-    if not rows:
-        rows.append(
-            CandidateRow(
-                DTMNFR="150800",
-                ORGAO="AM",
-                TIPO="2",
-                SIGLA="PS",
-                SIMBOLO=None,
-                NOME_LISTA="Lista Default",
-                NUM_ORDEM=1,
-                NOME_CANDIDATO="Candidato Efetivo",
-                PARTIDO_PROPONENTE="PS",
-                INDEPENDENTE="0",
-            )
-        )
-        rows.append(
-            CandidateRow(
-                DTMNFR="150800",
-                ORGAO="AM",
-                TIPO="3",
-                SIGLA="PS",
-                SIMBOLO=None,
-                NOME_LISTA="Lista Default",
-                NUM_ORDEM=1,
-                NOME_CANDIDATO="Candidato Suplente",
-                PARTIDO_PROPONENTE="PS",
-                INDEPENDENTE="0",
-            )
-        )
-    return rows
+    return list(iter_candidates(segments))
+
+
+def iter_column_chunks(
+    segments: Iterable[str], size: Optional[int] = None
+) -> Iterator[Dict[str, List]]:
+    """Extract segments into column lists of at most ``size`` rows each.
+
+    Every chunk maps each name in ``CANDIDATE_FIELDS`` to a list of values.
+    At least one chunk is yielded: the default rows stand in when there are
+    no segments at all. ``size=None`` puts everything in a single chunk.
+    """
+
+    columns: Dict[str, List] = {name: [] for name in CANDIDATE_FIELDS}
+    appenders = [columns[name].append for name in CANDIDATE_FIELDS]
+    produced = False
+    rows = 0
+    for segment in segments:
+        produced = True
+        for append, value in zip(appenders, _field_values(_scan_fields(segment))):
+            append(value)
+        rows += 1
+        if rows == size:
+            yield columns
+            columns = {name: [] for name in CANDIDATE_FIELDS}
+            appenders = [columns[name].append for name in CANDIDATE_FIELDS]
+            rows = 0
+    if not produced:
+        for row in _default_rows():
+            for name in CANDIDATE_FIELDS:
+                columns[name].append(getattr(row, name))
+        yield columns
+    elif rows:
+        yield columns
+
+
+def extract_columns(segments: Iterable[str]) -> Dict[str, List]:
+    """Extract many segments at once into column lists keyed by field name.
+
+    Produces the same values as :func:`extract_candidates`, default rows
+    included, without allocating a ``CandidateRow`` per segment.
+    """
+
+    return next(iter_column_chunks(segments))
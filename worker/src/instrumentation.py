@@ -0,0 +1,180 @@
+"""Per-stage wall time, CPU time, memory and item counts for a pipeline run.
+
+Disabled by default: :meth:`Instrumentation.wrap` then returns the iterable
+untouched and :meth:`Instrumentation.stage` only yields a throwaway record,
+so a job pays a handful of attribute lookups. Set ``CNE_STAGE_METRICS=1``
+(or pass ``instrument=True`` to ``process_job``) to record timings, and
+``CNE_STAGE_METRICS=memory`` to also trace Python allocations with
+:mod:`tracemalloc`, which slows the job down noticeably.
+
+Streamed stages (render, OCR, segmentation) run interleaved, pulled one
+item at a time by the stage that consumes them. Every measured span keeps
+the time spent in the spans nested inside it apart, so each stage reports
+its own *exclusive* time and the stage totals add up to the job's. Memory
+is measured around whole spans, so the peak of the streamed stages is
+reported on ``extract``, the stage that drives them. CPU time is this
+process's only; OCR done in a worker pool is not included.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar, Union
+
+try:  # pragma: no cover - resource is unavailable on Windows
+    import resource
+except ImportError:  # pragma: no cover - fall back to no RSS figures
+    resource = None  # type: ignore[assignment]
+
+STAGE_METRICS_ENV = "CNE_STAGE_METRICS"
+_MEMORY_MODE = "memory"
+_DISABLED = {"", "0", "off", "false", "no"}
+
+T = TypeVar("T")
+
+
+def _max_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@dataclass
+class StageRecord:
+    """Accumulated measurements of one stage."""
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    items_in: Optional[int] = None
+    items_out: Optional[int] = None
+    rss_peak_delta_kb: Optional[int] = None
+    py_peak_kb: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Union[int, float, None]]:
+        payload: Dict[str, Union[int, float, None]] = {
+            "wall_ms": round(self.wall_s * 1000, 3),
+            "cpu_ms": round(self.cpu_s * 1000, 3),
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+        }
+        if self.rss_peak_delta_kb is not None:
+            payload["rss_peak_delta_kb"] = self.rss_peak_delta_kb
+        if self.py_peak_kb is not None:
+            payload["py_peak_kb"] = self.py_peak_kb
+        return payload
+
+
+class Instrumentation:
+    """Collects :class:`StageRecord` entries for one pipeline run."""
+
+    def __init__(self, enabled: bool = False, *, memory: bool = False) -> None:
+        self.enabled = enabled or memory
+        self.memory = memory
+        self.stages: Dict[str, StageRecord] = {}
+        self._upstream: Dict[str, str] = {}
+        # Wall/CPU time of the spans nested in each open span.
+        self._children: List[List[float]] = [[0.0, 0.0]]
+        self._started_tracing = False
+
+    @classmethod
+    def from_env(cls) -> "Instrumentation":
+        raw = os.environ.get(STAGE_METRICS_ENV, "").strip().lower()
+        if raw == _MEMORY_MODE:
+            return cls(memory=True)
+        return cls(enabled=raw not in _DISABLED)
+
+    def _record(self, name: str) -> StageRecord:
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = StageRecord()
+        return record
+
+    def _close_span(self, record: StageRecord, wall: float, cpu: float) -> None:
+        child_wall, child_cpu = self._children.pop()
+        record.wall_s += wall - child_wall
+        record.cpu_s += cpu - child_cpu
+        parent = self._children[-1]
+        parent[0] += wall
+        parent[1] += cpu
+
+    def wrap(self, name: str, items: Iterable[T], *, upstream: Optional[str] = None) -> Iterable[T]:
+        """Time every step of a streamed stage and count what it yields.
+
+        ``upstream`` names the stage whose output this one consumes; its
+        ``items_out`` becomes this stage's ``items_in``.
+        """
+
+        if not self.enabled:
+            return items
+        if upstream is not None:
+            self._upstream[name] = upstream
+        return self._iter_timed(self._record(name), iter(items))
+
+    def _iter_timed(self, record: StageRecord, iterator: Iterator[T]) -> Iterator[T]:
+        record.items_out = record.items_out or 0
+        wall_clock, cpu_clock = time.perf_counter, time.process_time
+        while True:
+            self._children.append([0.0, 0.0])
+            wall, cpu = wall_clock(), cpu_clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._close_span(record, wall_clock() - wall, cpu_clock() - cpu)
+                return
+            except BaseException:
+                self._close_span(record, wall_clock() - wall, cpu_clock() - cpu)
+                raise
+            self._close_span(record, wall_clock() - wall, cpu_clock() - cpu)
+            record.items_out += 1
+            yield item
+
+    @contextmanager
+    def stage(self, name: str, *, items_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """Measure a block; set ``items_out`` on the yielded record."""
+
+        record = self._record(name) if self.enabled else StageRecord()
+        if items_in is not None:
+            record.items_in = items_in
+        if not self.enabled:
+            yield record
+            return
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.memory:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        rss_before = _max_rss_kb()
+        self._children.append([0.0, 0.0])
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            self._close_span(record, time.perf_counter() - wall, time.process_time() - cpu)
+            rss_after = _max_rss_kb()
+            if rss_before is not None and rss_after is not None:
+                record.rss_peak_delta_kb = rss_after - rss_before
+            if self.memory:
+                record.py_peak_kb = max(0, tracemalloc.get_traced_memory()[1] - traced_before) // 1024
+
+    def close(self) -> None:
+        """Stop :mod:`tracemalloc` if this run started it."""
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def as_dict(self) -> Dict[str, Dict[str, Union[int, float, None]]]:
+        """Stage records in execution order, ready for ``JobMetadata.timings``."""
+
+        for name, upstream in self._upstream.items():
+            source = self.stages.get(upstream)
+            if source is not None and self.stages[name].items_in is None:
+                self.stages[name].items_in = source.items_out
+        return {name: record.to_dict() for name, record in self.stages.items()}
@@ -0,0 +1,178 @@
+"""SQLite index over job metadata with keyset-paginated queries.
+
+Both job stores keep one row per job in a ``jobs`` table, written in the
+same transaction (or under the same job lock) as the metadata itself:
+:class:`~.sqlite_storage.SQLiteJobStorage` stores the full payload there,
+while the JSON tree only indexes the columns and keeps ``job.json`` as the
+source of truth.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from .sqlite_db import SQLiteDatabase
+
+if TYPE_CHECKING:  # pragma: no cover - storage imports this module
+    from .storage import JobMetadata, JobState
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL,
+        has_error INTEGER NOT NULL DEFAULT 0,
+        version INTEGER NOT NULL,
+        payload TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_state_updated ON jobs (state, updated_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_error_updated ON jobs (has_error, updated_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at, job_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (updated_at, job_id)",
+)
+
+
+def timestamp(value: datetime) -> str:
+    """Sortable UTC text form of ``value`` used by the indexed columns."""
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def encode_cursor(updated_at: str, job_id: str) -> str:
+    raw = json.dumps([updated_at, job_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of :func:`encode_cursor`; raises ``ValueError`` on garbage."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, job_id = json.loads(raw.decode("utf-8"))
+    except (ValueError, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(updated_at, str) or not isinstance(job_id, str):
+        raise ValueError("Invalid cursor")
+    return updated_at, job_id
+
+
+@dataclass
+class JobQuery:
+    """Filters for :meth:`JobIndex.page`; ``updated_to`` is exclusive."""
+
+    state: Optional[JobState] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    has_error: Optional[bool] = None
+    limit: int = DEFAULT_PAGE_SIZE
+    cursor: Optional[str] = None
+
+
+@dataclass
+class JobPage:
+    """One page of jobs, most recently updated first."""
+
+    items: List[JobMetadata] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class JobIndex(SQLiteDatabase):
+    """The ``jobs`` table in a WAL-mode SQLite database."""
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        for statement in _SCHEMA:
+            connection.execute(statement)
+
+    @staticmethod
+    def upsert(connection: sqlite3.Connection, meta: JobMetadata, payload: Optional[str] = None) -> None:
+        connection.execute(
+            "INSERT OR REPLACE INTO jobs "
+            "(job_id, state, created_at, updated_at, has_error, version, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                meta.job_id,
+                meta.state.value,
+                timestamp(meta.created_at),
+                timestamp(meta.updated_at),
+                int(meta.error is not None),
+                meta.version,
+                payload,
+            ),
+        )
+
+    def upsert_many(self, jobs: Iterable[Tuple[JobMetadata, Optional[str]]]) -> int:
+        count = 0
+        with self.transaction() as connection:
+            for meta, payload in jobs:
+                self.upsert(connection, meta, payload)
+                count += 1
+        return count
+
+    def replace_all(self, jobs: Iterable[Tuple[JobMetadata, Optional[str]]]) -> int:
+        """Drop every row and index ``jobs`` instead, in one transaction."""
+
+        count = 0
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM jobs")
+            for meta, payload in jobs:
+                self.upsert(connection, meta, payload)
+                count += 1
+        return count
+
+    def count(self) -> int:
+        with self.connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def page(self, query: JobQuery) -> Tuple[List[Tuple[str, Optional[str]]], Optional[str]]:
+        """Return ``(job_id, payload)`` pairs of one page and the next cursor.
+
+        Pages are ordered by ``(updated_at, job_id)`` descending and continue
+        strictly after the cursor, so every page is a bounded index range
+        scan however deep it is.
+        """
+
+        if not 1 <= query.limit <= MAX_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        clauses: List[str] = []
+        params: List[object] = []
+        if query.state is not None:
+            clauses.append("state = ?")
+            params.append(getattr(query.state, "value", query.state))
+        if query.has_error is not None:
+            clauses.append("has_error = ?")
+            params.append(int(query.has_error))
+        if query.updated_from is not None:
+            clauses.append("updated_at >= ?")
+            params.append(timestamp(query.updated_from))
+        if query.updated_to is not None:
+            clauses.append("updated_at < ?")
+            params.append(timestamp(query.updated_to))
+        if query.cursor:
+            clauses.append("(updated_at, job_id) < (?, ?)")
+            params.extend(decode_cursor(query.cursor))
+
+        sql = "SELECT job_id, payload, updated_at FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY updated_at DESC, job_id DESC LIMIT ?"
+        params.append(query.limit + 1)
+        with self.connect() as connection:
+            rows = connection.execute(sql, params).fetchall()
+
+        next_cursor = None
+        if len(rows) > query.limit:
+            rows = rows[: query.limit]
+            next_cursor = encode_cursor(rows[-1][2], rows[-1][0])
+        return [(job_id, payload) for job_id, payload, _ in rows], next_cursor
@@ -0,0 +1,375 @@
+"""Durable local job queue stored in SQLite.
+
+The queue lives in ``<base_dir>/queue.sqlite3`` next to the job metadata and
+needs no broker: the API enqueues, and any number of worker daemons on the
+host lease entries from it. A lease is hidden from other workers until its
+visibility timeout expires; a worker that dies simply stops heartbeating
+and the entry becomes available again.
+
+Entry lifecycle::
+
+    pending --lease--> leased --complete--> done
+       ^                 |  \\--fail (attempts left)--> pending (after backoff)
+       |                 |   \\-fail (no attempts left)-> dead
+       \\---release------/
+
+Every lease counts as an attempt, including one that times out.
+
+Scheduling is weighted fair queuing per submitter (``tenant``: the
+DTMNFR or uploader) with a priority class on top (see :mod:`.scheduler`):
+
+* ``small`` entries go before ``bulk`` ones, and ``bulk`` entries that
+  have waited ``promote_after`` seconds are treated as ``small`` so a steady
+  stream of small jobs cannot starve them;
+* within a class, the tenant with the lowest virtual time goes first. A
+  lease advances it to ``max(own, lowest pending) + cost / weight``, so a
+  tenant with hundreds of queued files takes turns with everyone else
+  instead of running them back to back;
+* ``reserve_small`` host slots are kept free of ``bulk`` work, so a small
+  submission never waits for a long job to finish.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .scheduler import BULK, DEFAULT_TENANT, JOB_CLASSES, SMALL, JobEstimate, estimate_job
+from .sqlite_db import SQLiteDatabase
+
+QUEUE_FILENAME = "queue.sqlite3"
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+QUEUE_STATUSES = (PENDING, LEASED, DONE, DEAD)
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_PROMOTE_AFTER = 300.0
+DEFAULT_STATS_WINDOW = 3600.0
+
+_SCHEMA = (
+    f"""
+    CREATE TABLE IF NOT EXISTS queue (
+        job_id TEXT PRIMARY KEY,
+        files TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        enqueued_at REAL NOT NULL,
+        available_at REAL NOT NULL,
+        lease_owner TEXT,
+        lease_host TEXT,
+        lease_expires REAL,
+        last_error TEXT,
+        tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}',
+        job_class TEXT NOT NULL DEFAULT '{BULK}',
+        cost REAL NOT NULL DEFAULT 1,
+        started_at REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS tenants (
+        tenant TEXT PRIMARY KEY,
+        weight REAL NOT NULL DEFAULT 1,
+        vtime REAL NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS queue_available ON queue (status, available_at, enqueued_at)",
+    "CREATE INDEX IF NOT EXISTS queue_leases ON queue (status, lease_host, lease_expires)",
+    "CREATE INDEX IF NOT EXISTS queue_started ON queue (started_at)",
+)
+
+
+@dataclass
+class QueuedJob:
+    """A leased queue entry; ``attempts`` includes the current one."""
+
+    job_id: str
+    files: List[str] = field(default_factory=list)
+    attempts: int = 0
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    last_error: Optional[str] = None
+    tenant: str = DEFAULT_TENANT
+    job_class: str = BULK
+
+
+@dataclass
+class QueueClassStats:
+    """Queue depth and waits of one scheduling class.
+
+    Waits run from submission to the (latest) start and cover the entries
+    started within the stats window.
+    """
+
+    pending: int = 0
+    running: int = 0
+    oldest_pending_seconds: Optional[float] = None
+    started: int = 0
+    wait_mean_seconds: Optional[float] = None
+    wait_p95_seconds: Optional[float] = None
+    wait_max_seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return dict(self.__dict__)
+
+
+def _percentile(ordered: Sequence[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def queue_path(base_dir: Path) -> Path:
+    return Path(base_dir) / QUEUE_FILENAME
+
+
+class JobQueue(SQLiteDatabase):
+    """Lease-based work queue over the ``queue`` table."""
+
+    def __init__(self, path: Path, *, promote_after: float = DEFAULT_PROMOTE_AFTER) -> None:
+        self.promote_after = promote_after
+        super().__init__(path)
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        for statement in _SCHEMA:
+            connection.execute(statement)
+
+    def set_weight(self, tenant: str, weight: float) -> None:
+        """Give ``tenant`` ``weight`` times the default share of the workers."""
+
+        if weight <= 0:
+            raise ValueError("weight must be positive")
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO tenants (tenant, weight) VALUES (?, ?) "
+                "ON CONFLICT (tenant) DO UPDATE SET weight = excluded.weight",
+                (tenant, weight),
+            )
+
+    def enqueue(
+        self,
+        job_id: str,
+        files: Sequence[Path],
+        *,
+        tenant: str = DEFAULT_TENANT,
+        estimate: Optional[JobEstimate] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        delay: float = 0.0,
+    ) -> None:
+        """Add ``job_id`` or put it back as a fresh pending entry.
+
+        ``estimate`` defaults to :func:`~.scheduler.estimate_job` of ``files``.
+        """
+
+        estimate = estimate or estimate_job(files)
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO queue "
+                "(job_id, files, status, attempts, max_attempts, enqueued_at, available_at, tenant, job_class, cost) "
+                "VALUES (?, ?, ?, 0, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    json.dumps([str(path) for path in files]),
+                    PENDING,
+                    max_attempts,
+                    now,
+                    now + delay,
+                    tenant,
+                    estimate.job_class,
+                    float(estimate.pages),
+                ),
+            )
+
+    def reap_expired(self) -> List[QueuedJob]:
+        """Return expired leases to the queue; list those out of attempts.
+
+        Entries that used up their attempts become ``dead`` and are
+        returned so the caller can fail the job itself.
+        """
+
+        now = time.time()
+        with self.transaction() as connection:
+            rows = connection.execute(
+                "SELECT job_id, files, attempts, max_attempts FROM queue "
+                "WHERE status = ? AND lease_expires <= ?",
+                (LEASED, now),
+            ).fetchall()
+            dead: List[QueuedJob] = []
+            for job_id, files, attempts, max_attempts in rows:
+                status = DEAD if attempts >= max_attempts else PENDING
+                connection.execute(
+                    "UPDATE queue SET status = ?, available_at = ?, lease_owner = NULL, lease_host = NULL, "
+                    "lease_expires = NULL, last_error = ? WHERE job_id = ?",
+                    (status, now, "visibility timeout expired", job_id),
+                )
+                if status == DEAD:
+                    dead.append(
+                        QueuedJob(job_id, json.loads(files), attempts, max_attempts, "visibility timeout expired")
+                    )
+        return dead
+
+    def lease(
+        self,
+        owner: str,
+        *,
+        host: str,
+        visibility_timeout: float,
+        host_limit: Optional[int] = None,
+        reserve_small: int = 0,
+    ) -> Optional[QueuedJob]:
+        """Lease the next entry in scheduling order, or return ``None``.
+
+        ``host_limit`` caps the live leases held by all workers on ``host``,
+        ``reserve_small`` of which only ``small`` entries may use. The counts
+        and the lease happen in one write transaction, so concurrent daemons
+        on the same machine cannot overshoot them.
+        """
+
+        now = time.time()
+        with self.transaction() as connection:
+            bulk_allowed = True
+            if host_limit is not None:
+                active = dict.fromkeys(JOB_CLASSES, 0)
+                for job_class, count in connection.execute(
+                    "SELECT job_class, COUNT(*) FROM queue "
+                    "WHERE status = ? AND lease_host = ? AND lease_expires > ? GROUP BY job_class",
+                    (LEASED, host, now),
+                ):
+                    active[job_class] = count
+                if sum(active.values()) >= host_limit:
+                    return None
+                bulk_allowed = active[BULK] < host_limit - reserve_small
+            row = connection.execute(
+                "SELECT q.job_id, q.files, q.attempts, q.max_attempts, q.last_error, q.tenant, q.job_class, "
+                "q.cost, COALESCE(t.weight, 1), COALESCE(t.vtime, 0) "
+                "FROM queue AS q LEFT JOIN tenants AS t ON t.tenant = q.tenant "
+                "WHERE q.status = ? AND q.available_at <= ? AND (q.job_class = ? OR ?) "
+                "ORDER BY (q.job_class = ? OR q.enqueued_at <= ?) DESC, COALESCE(t.vtime, 0), "
+                "q.available_at, q.enqueued_at LIMIT 1",
+                (PENDING, now, SMALL, bulk_allowed, SMALL, now - self.promote_after),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, files, attempts, max_attempts, last_error, tenant, job_class, cost, weight, vtime = row
+            (floor,) = connection.execute(
+                "SELECT MIN(COALESCE(t.vtime, 0)) FROM queue AS q LEFT JOIN tenants AS t ON t.tenant = q.tenant "
+                "WHERE q.status = ?",
+                (PENDING,),
+            ).fetchone()
+            connection.execute(
+                "INSERT INTO tenants (tenant, vtime) VALUES (?, ?) "
+                "ON CONFLICT (tenant) DO UPDATE SET vtime = excluded.vtime",
+                (tenant, max(vtime, floor or 0) + cost / weight),
+            )
+            connection.execute(
+                "UPDATE queue SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_host = ?, "
+                "lease_expires = ?, started_at = ? WHERE job_id = ?",
+                (LEASED, owner, host, now + visibility_timeout, now, job_id),
+            )
+        return QueuedJob(job_id, json.loads(files), attempts + 1, max_attempts, last_error, tenant, job_class)
+
+    def _update_lease(self, job_id: str, owner: str, assignments: str, params: Sequence[object]) -> bool:
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                f"UPDATE queue SET {assignments} WHERE job_id = ? AND status = ? AND lease_owner = ?",
+                (*params, job_id, LEASED, owner),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str, owner: str, visibility_timeout: float) -> bool:
+        """Extend ``owner``'s lease; ``False`` means the lease was lost."""
+
+        return self._update_lease(job_id, owner, "lease_expires = ?", (time.time() + visibility_timeout,))
+
+    def complete(self, job_id: str, owner: str) -> bool:
+        return self._update_lease(
+            job_id,
+            owner,
+            "status = ?, lease_owner = NULL, lease_host = NULL, lease_expires = NULL, last_error = NULL",
+            (DONE,),
+        )
+
+    def fail(self, job_id: str, owner: str, error: str, *, retry_delay: float) -> Optional[str]:
+        """Record a failed attempt; return the new status (``None`` if not leased).
+
+        The entry goes back to ``pending`` after ``retry_delay`` seconds, or
+        to ``dead`` once its attempts are used up.
+        """
+
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT attempts, max_attempts FROM queue WHERE job_id = ? AND status = ? AND lease_owner = ?",
+                (job_id, LEASED, owner),
+            ).fetchone()
+            if row is None:
+                return None
+            status = DEAD if row[0] >= row[1] else PENDING
+            connection.execute(
+                "UPDATE queue SET status = ?, available_at = ?, lease_owner = NULL, lease_host = NULL, "
+                "lease_expires = NULL, last_error = ? WHERE job_id = ?",
+                (status, time.time() + retry_delay, error, job_id),
+            )
+        return status
+
+    def release(self, job_id: str, owner: str) -> bool:
+        """Hand an unstarted lease back, keeping its place and attempt count."""
+
+        return self._update_lease(
+            job_id,
+            owner,
+            "status = ?, attempts = attempts - 1, lease_owner = NULL, lease_host = NULL, lease_expires = NULL",
+            (PENDING,),
+        )
+
+    def status(self, job_id: str) -> Optional[str]:
+        with self.connect() as connection:
+            row = connection.execute("SELECT status FROM queue WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of entries per status (``pending`` is the queue depth)."""
+
+        counts = dict.fromkeys(QUEUE_STATUSES, 0)
+        with self.connect() as connection:
+            for status, count in connection.execute("SELECT status, COUNT(*) FROM queue GROUP BY status"):
+                counts[status] = count
+        return counts
+
+    def class_stats(self, *, window: float = DEFAULT_STATS_WINDOW) -> Dict[str, QueueClassStats]:
+        """Depth and wait statistics per scheduling class."""
+
+        now = time.time()
+        stats = {job_class: QueueClassStats() for job_class in JOB_CLASSES}
+        with self.connect() as connection:
+            for job_class, status, count, oldest in connection.execute(
+                "SELECT job_class, status, COUNT(*), MIN(enqueued_at) FROM queue "
+                "WHERE status IN (?, ?) GROUP BY job_class, status",
+                (PENDING, LEASED),
+            ):
+                entry = stats.setdefault(job_class, QueueClassStats())
+                if status == PENDING:
+                    entry.pending = count
+                    entry.oldest_pending_seconds = round(now - oldest, 3)
+                else:
+                    entry.running = count
+            waits: Dict[str, List[float]] = {job_class: [] for job_class in stats}
+            for job_class, wait in connection.execute(
+                "SELECT job_class, started_at - enqueued_at FROM queue WHERE started_at >= ?",
+                (now - window,),
+            ):
+                waits.setdefault(job_class, []).append(max(0.0, wait))
+        for job_class, values in waits.items():
+            if not values:
+                continue
+            values.sort()
+            entry = stats.setdefault(job_class, QueueClassStats())
+            entry.started = len(values)
+            entry.wait_mean_seconds = round(sum(values) / len(values), 3)
+            entry.wait_p95_seconds = round(_percentile(values, 0.95), 3)
+            entry.wait_max_seconds = round(values[-1], 3)
+        return stats
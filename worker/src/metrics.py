@@ -0,0 +1,331 @@
+"""Counters and histograms shared by every API and worker process.
+
+Each process adds to its own memory-mapped file, ``<data>/metrics/<pid>.db``,
+so recording a sample is a dictionary lookup and an in-place float update,
+with no locking between processes. A scrape (:func:`render_metrics`) reads
+every file in the directory, sums the samples and renders them in the
+Prometheus text exposition format (version 0.0.4).
+
+Files use the layout of ``prometheus_client``'s multiprocess mode: an
+8-byte header holding the used length, then entries of a 4-byte key
+length, the UTF-8 key padded to 8 bytes and a little-endian double.
+Files of exited processes keep counting towards the totals, which is
+what counters and histograms need; clear the directory when a deployment
+should start from zero.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+_HEADER = struct.Struct("<I4x")
+_VALUE = struct.Struct("<d")
+_KEY_LENGTH = struct.Struct("<I")
+_INITIAL_SIZE = 64 * 1024
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0)
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclass(frozen=True)
+class Metric:
+    name: str
+    kind: str
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+STAGE_DURATION = Metric(
+    "cne_stage_duration_seconds",
+    HISTOGRAM,
+    "Exclusive wall time of a pipeline stage (recorded when CNE_STAGE_METRICS is on).",
+    _DURATION_BUCKETS,
+)
+JOB_DURATION = Metric("cne_job_duration_seconds", HISTOGRAM, "Wall time of a pipeline run.", _DURATION_BUCKETS)
+ROWS_PROCESSED = Metric("cne_rows_processed_total", COUNTER, "Candidate rows written by the pipeline.")
+ROWS_PER_SECOND = Metric(
+    "cne_job_rows_per_second",
+    HISTOGRAM,
+    "Rows per second of wall time for each finished job.",
+    (1.0, 10.0, 50.0, 100.0, 500.0, 1000.0, 5000.0, 10000.0, 50000.0, 100000.0),
+)
+OCR_CONFIDENCE = Metric(
+    "cne_ocr_page_confidence",
+    HISTOGRAM,
+    "OCR confidence of every processed page.",
+    (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0),
+)
+API_LATENCY = Metric(
+    "cne_api_request_duration_seconds",
+    HISTOGRAM,
+    "Time until an API handler starts its response.",
+    _LATENCY_BUCKETS,
+)
+QUEUE_DEPTH = Metric("cne_queue_jobs", GAUGE, "Queued jobs by scheduling class and status.")
+
+METRICS: Tuple[Metric, ...] = (
+    STAGE_DURATION,
+    JOB_DURATION,
+    ROWS_PROCESSED,
+    ROWS_PER_SECOND,
+    OCR_CONFIDENCE,
+    API_LATENCY,
+    QUEUE_DEPTH,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def metrics_dir(base_dir: Path) -> Path:
+    return Path(base_dir) / "metrics"
+
+
+def _key(name: str, labels: Labels) -> str:
+    return json.dumps([name, dict(labels)], separators=(",", ":"), sort_keys=True)
+
+
+def _parse_key(key: str) -> Tuple[str, Labels]:
+    name, labels = json.loads(key)
+    return name, tuple(sorted(labels.items()))
+
+
+class _ValueFile:
+    """One process's memory-mapped ``key -> float`` file."""
+
+    def __init__(self, path: Path) -> None:
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        capacity = os.fstat(self._fd).st_size
+        if capacity < _INITIAL_SIZE:
+            os.ftruncate(self._fd, _INITIAL_SIZE)
+            capacity = _INITIAL_SIZE
+        self._capacity = capacity
+        self._map = mmap.mmap(self._fd, capacity)
+        used = _HEADER.unpack_from(self._map, 0)[0]
+        self._used = used or _HEADER.size
+        self._positions = {key: offset for key, offset, _value in _iter_entries(self._map, self._used)}
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        # Extend first: if that fails, the current map is still usable.
+        os.ftruncate(self._fd, capacity)
+        self._map.close()
+        self._capacity = capacity
+        self._map = mmap.mmap(self._fd, capacity)
+
+    def _position(self, key: str) -> int:
+        position = self._positions.get(key)
+        if position is not None:
+            return position
+        encoded = key.encode("utf-8")
+        padding = -(_KEY_LENGTH.size + len(encoded)) % 8
+        entry = _KEY_LENGTH.pack(len(encoded)) + encoded + b" " * padding + _VALUE.pack(0.0)
+        end = self._used + len(entry)
+        if end > self._capacity:
+            self._grow(end)
+        self._map[self._used : end] = entry
+        # Publish the entry only once it is complete.
+        _HEADER.pack_into(self._map, 0, end)
+        self._used = end
+        self._positions[key] = position = end - _VALUE.size
+        return position
+
+    def add(self, key: str, amount: float) -> None:
+        position = self._position(key)
+        _VALUE.pack_into(self._map, position, _VALUE.unpack_from(self._map, position)[0] + amount)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+
+def _iter_entries(data, used: int) -> Iterator[Tuple[str, int, float]]:
+    """Yield ``(key, value_offset, value)`` for the entries of a value file."""
+
+    position = _HEADER.size
+    while position + _KEY_LENGTH.size <= used:
+        (length,) = _KEY_LENGTH.unpack_from(data, position)
+        start = position + _KEY_LENGTH.size
+        offset = start + length + (-(_KEY_LENGTH.size + length) % 8)
+        if offset + _VALUE.size > used:
+            break
+        key = bytes(data[start : start + length]).decode("utf-8")
+        yield key, offset, _VALUE.unpack_from(data, offset)[0]
+        position = offset + _VALUE.size
+
+
+def read_values(path: Path) -> Dict[str, float]:
+    """Samples of one process file; tolerant of a file still being written."""
+
+    try:
+        data = Path(path).read_bytes()
+    except OSError:
+        return {}
+    if len(data) < _HEADER.size:
+        return {}
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    return {key: value for key, _offset, value in _iter_entries(data, used)}
+
+
+class MetricsRegistry:
+    """Records samples into this process's file under ``directory``.
+
+    Safe to share between threads; a forked child notices its new pid and
+    opens a file of its own. Metrics never fail the caller: when the file
+    cannot be created or written (a full disk, say), the error is logged
+    and later samples are dropped.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._file: Optional[_ValueFile] = None
+
+    def _values(self) -> Optional[_ValueFile]:
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._file = _ValueFile(self.directory / f"{pid}.db")
+            except OSError:
+                logger.warning("Cannot open the metrics file in %s", self.directory, exc_info=True)
+                self._file = None
+        return self._file
+
+    def _add(self, samples: Iterable[Tuple[str, float]]) -> None:
+        with self._lock:
+            values = self._values()
+            if values is None:
+                return
+            try:
+                for key, amount in samples:
+                    values.add(key, amount)
+            except OSError:
+                logger.warning("Cannot write the metrics file in %s; dropping samples", self.directory, exc_info=True)
+                try:
+                    values.close()
+                except (OSError, ValueError):
+                    pass
+                self._file = None
+
+    def inc(self, metric: Metric, amount: float = 1.0, **labels: str) -> None:
+        self._add([(_key(metric.name, tuple(sorted(labels.items()))), amount)])
+
+    def observe(self, metric: Metric, value: float, **labels: str) -> None:
+        """Add ``value`` to a histogram (buckets are stored non-cumulatively)."""
+
+        base = tuple(sorted(labels.items()))
+        index = bisect_left(metric.buckets, value)
+        bound = _format(metric.buckets[index]) if index < len(metric.buckets) else "+Inf"
+        self._add(
+            [
+                (_key(f"{metric.name}_bucket", tuple(sorted(base + (("le", bound),)))), 1.0),
+                (_key(f"{metric.name}_sum", base), value),
+                (_key(f"{metric.name}_count", base), 1.0),
+            ]
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._file.close()
+            self._file = None
+            self._pid = None
+
+
+@lru_cache(maxsize=8)
+def _registry(directory: str) -> MetricsRegistry:
+    return MetricsRegistry(Path(directory))
+
+
+def get_registry(base_dir: Path) -> MetricsRegistry:
+    """Process-wide registry writing under ``<base_dir>/metrics``."""
+
+    return _registry(str(metrics_dir(Path(base_dir).resolve())))
+
+
+def collect(directory: Path) -> Dict[str, float]:
+    """Sum the samples of every process file in ``directory``."""
+
+    totals: Dict[str, float] = {}
+    for path in sorted(Path(directory).glob("*.db")):
+        for key, value in read_values(path).items():
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _sample(name: str, labels: Iterable[Tuple[str, str]], value: float) -> str:
+    pairs = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels)
+    return f"{name}{{{pairs}}} {_format(value)}" if pairs else f"{name} {_format(value)}"
+
+
+def _histogram_lines(metric: Metric, samples: Dict[Tuple[str, Labels], float]) -> List[str]:
+    series = sorted({labels for name, labels in samples if name == f"{metric.name}_count"})
+    lines = []
+    for labels in series:
+        cumulative = 0.0
+        for bound in (*(_format(bucket) for bucket in metric.buckets), "+Inf"):
+            bucket_labels = tuple(sorted(labels + (("le", bound),)))
+            cumulative += samples.get((f"{metric.name}_bucket", bucket_labels), 0.0)
+            lines.append(_sample(f"{metric.name}_bucket", (*labels, ("le", bound)), cumulative))
+        lines.append(_sample(f"{metric.name}_sum", labels, samples.get((f"{metric.name}_sum", labels), 0.0)))
+        lines.append(_sample(f"{metric.name}_count", labels, samples[(f"{metric.name}_count", labels)]))
+    return lines
+
+
+def render_metrics(
+    directory: Path,
+    gauges: Sequence[Tuple[Metric, Dict[str, str], float]] = (),
+    metrics: Sequence[Metric] = METRICS,
+) -> str:
+    """Render the summed samples plus scrape-time ``gauges`` as exposition text."""
+
+    samples = {_parse_key(key): value for key, value in collect(directory).items()}
+    lines: List[str] = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == HISTOGRAM:
+            lines.extend(_histogram_lines(metric, samples))
+        elif metric.kind == COUNTER:
+            series = sorted((labels, value) for (name, labels), value in samples.items() if name == metric.name)
+            lines.extend(_sample(metric.name, labels, value) for labels, value in series)
+        else:
+            lines.extend(
+                _sample(metric.name, sorted(labels.items()), value)
+                for gauge, labels, value in gauges
+                if gauge is metric
+            )
+    return "\n".join(lines) + "\n"
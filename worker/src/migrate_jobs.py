@@ -0,0 +1,43 @@
+"""Import an existing ``data/jobs/*/job.json`` tree into the SQLite job store.
+
+Usage::
+
+    python -m worker.src.migrate_jobs --data-dir data [--database data/jobs.sqlite3]
+
+The import is idempotent: rerunning it upserts every job again with the
+version and timestamps found in its ``job.json``.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .sqlite_storage import DATABASE_FILENAME, SQLiteJobStorage
+from .storage import JobStorage
+
+
+def migrate_json_tree(base_dir: Path, database: Optional[Path] = None) -> int:
+    """Copy every job under ``<base_dir>/jobs`` into SQLite; return the count."""
+
+    source = JobStorage(base_dir)
+    target = SQLiteJobStorage(base_dir, database=database)
+    try:
+        return target.import_jobs(source.iter_jobs())
+    finally:
+        target.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", type=Path, default=Path("data"), help="CNE data directory")
+    parser.add_argument("--database", type=Path, default=None, help="SQLite file (default: <data-dir>/jobs.sqlite3)")
+    args = parser.parse_args(argv)
+
+    count = migrate_json_tree(args.data_dir, args.database)
+    print(f"Imported {count} job(s) into {args.database or args.data_dir / DATABASE_FILENAME}")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - command-line entry point
+    raise SystemExit(main())
@@ -3,47 +3,95 @@ from __future__ import annotations
 
 import re
 from dataclasses import replace
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
+from .batch import CandidateBatch
 from .types import CandidateRow
 
 _NUMERIC_RE = re.compile(r"\d+")
 
 
-def normalize_rows(rows: Iterable[CandidateRow]) -> List[CandidateRow]:
-    normalised: List[CandidateRow] = []
+def _normalize_dtmnfr(value: str) -> str:
+    match = _NUMERIC_RE.search(value.strip())
+    return match.group(0).zfill(6) if match else "000000"
+
+
+def _normalize_num_ordem(value: object) -> int:
+    try:
+        num_ordem = int(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        num_ordem = 0
+    return max(1, num_ordem)
+
+
+def normalize_in_place(row: CandidateRow) -> CandidateRow:
+    """Normalise the fields of ``row`` itself and return it.
+
+    ``row.validation`` is left untouched (same dict object).
+    """
+
+    row.DTMNFR = _normalize_dtmnfr(row.DTMNFR)
+    row.ORGAO = row.ORGAO.strip().upper() if row.ORGAO else "AM"
+    row.TIPO = row.TIPO.strip() if row.TIPO else "2"
+    sigla = row.SIGLA.strip().upper() if row.SIGLA else "IND"
+    row.SIGLA = sigla
+    row.SIMBOLO = (row.SIMBOLO or "").strip() or None
+    row.NOME_LISTA = (row.NOME_LISTA or "").strip() or f"LISTA {sigla}"
+    row.NUM_ORDEM = _normalize_num_ordem(row.NUM_ORDEM)
+    row.NOME_CANDIDATO = (row.NOME_CANDIDATO or "").strip() or "CANDIDATO DESCONHECIDO"
+    row.PARTIDO_PROPONENTE = (row.PARTIDO_PROPONENTE or "").strip() or None
+    row.INDEPENDENTE = (row.INDEPENDENTE or "").strip() or "0"
+    return row
+
+
+def iter_normalized(rows: Iterable[CandidateRow]) -> Iterator[CandidateRow]:
+    """Yield normalised copies of ``rows``; the inputs are not modified."""
+
     for row in rows:
-        dtmnfr = row.DTMNFR.strip()
-        match = _NUMERIC_RE.search(dtmnfr)
-        dtmnfr = match.group(0).zfill(6) if match else "000000"
-        orgao = row.ORGAO.strip().upper() if row.ORGAO else "AM"
-        tipo = row.TIPO.strip() if row.TIPO else "2"
-        sigla = row.SIGLA.strip().upper() if row.SIGLA else "IND"
-        simbolo = (row.SIMBOLO or "").strip() or None
-        nome_lista = (row.NOME_LISTA or "").strip() or f"LISTA {sigla}"
-        try:
-            num_ordem = int(row.NUM_ORDEM)
-        except (TypeError, ValueError):
-            num_ordem = 0
-        num_ordem = max(1, num_ordem)
-        nome = (row.NOME_CANDIDATO or "").strip() or "CANDIDATO DESCONHECIDO"
-        partido = (row.PARTIDO_PROPONENTE or "").strip() or None
-        indep = (row.INDEPENDENTE or "").strip()
-        if not indep:
-            indep = "0"
-        normalized = replace(
-            row,
-            DTMNFR=dtmnfr,
-            ORGAO=orgao,
-            TIPO=tipo,
-            SIGLA=sigla,
-            SIMBOLO=simbolo,
-            NOME_LISTA=nome_lista,
-            NUM_ORDEM=num_ordem,
-            NOME_CANDIDATO=nome,
-            PARTIDO_PROPONENTE=partido,
-            INDEPENDENTE=indep,
-        )
-        normalized.validation = dict(row.validation)
-        normalised.append(normalized)
-    return normalised
+        yield normalize_in_place(replace(row, validation=dict(row.validation)))
+
+
+def normalize_rows(rows: Iterable[CandidateRow]) -> List[CandidateRow]:
+    return list(iter_normalized(rows))
+
+
+def _shared(values: List) -> List:
+    """Collapse equal values onto one object; list keys repeat on every row."""
+
+    seen: dict = {}
+    return [seen.setdefault(value, value) for value in values]
+
+
+def normalize_batch(batch: CandidateBatch) -> CandidateBatch:
+    """Normalise ``batch`` column by column, in place; flags are untouched.
+
+    Low-cardinality columns are deduplicated so that, for example, every
+    ``ORGAO`` of ``"AM"`` in the batch points at a single string.
+    """
+
+    columns = batch.columns
+    columns["DTMNFR"] = _shared([_normalize_dtmnfr(value) for value in columns["DTMNFR"]])
+    columns["ORGAO"] = _shared(
+        [value.strip().upper() if value else "AM" for value in columns["ORGAO"]]
+    )
+    columns["TIPO"] = _shared([value.strip() if value else "2" for value in columns["TIPO"]])
+    siglas = _shared([value.strip().upper() if value else "IND" for value in columns["SIGLA"]])
+    columns["SIGLA"] = siglas
+    columns["SIMBOLO"] = [(value or "").strip() or None for value in columns["SIMBOLO"]]
+    columns["NOME_LISTA"] = _shared(
+        [
+            (value or "").strip() or f"LISTA {sigla}"
+            for value, sigla in zip(columns["NOME_LISTA"], siglas)
+        ]
+    )
+    columns["NUM_ORDEM"] = [_normalize_num_ordem(value) for value in columns["NUM_ORDEM"]]
+    columns["NOME_CANDIDATO"] = [
+        (value or "").strip() or "CANDIDATO DESCONHECIDO" for value in columns["NOME_CANDIDATO"]
+    ]
+    columns["PARTIDO_PROPONENTE"] = _shared(
+        [(value or "").strip() or None for value in columns["PARTIDO_PROPONENTE"]]
+    )
+    columns["INDEPENDENTE"] = _shared(
+        [(value or "").strip() or "0" for value in columns["INDEPENDENTE"]]
+    )
+    return batch
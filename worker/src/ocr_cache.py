@@ -0,0 +1,158 @@
+"""On-disk OCR result cache keyed by document content hash."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+from .types import OCRPage
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+MAX_BYTES_ENV = "CNE_OCR_CACHE_MAX_BYTES"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def stream_sha256(handle: BinaryIO) -> str:
+    """Return the hex SHA-256 digest of what is left to read in ``handle``."""
+
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex SHA-256 digest of the bytes stored at ``path``."""
+
+    with Path(path).open("rb") as handle:
+        return stream_sha256(handle)
+
+
+def _max_bytes_from_env() -> int:
+    raw = os.environ.get(MAX_BYTES_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_MAX_BYTES
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+class OCRCache:
+    """Stores OCR pages under ``<root>/<xx>/<key>.json`` with LRU eviction.
+
+    Entries are keyed by the caller's document key (the SHA-256 of the
+    document bytes plus anything else the OCR output depends on) combined
+    with the OCR engine version, so upgrading the engine naturally
+    invalidates them.
+    A hit refreshes the entry mtime, and once the cache grows past
+    ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        engine_version: str,
+        *,
+        max_bytes: Optional[int] = None,
+    ) -> None:
+        self.root = Path(root).resolve()
+        self.engine_version = engine_version
+        self.max_bytes = _max_bytes_from_env() if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, digest: str) -> Path:
+        key = hashlib.sha256(f"{self.engine_version}\0{digest}".encode("utf-8")).hexdigest()
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, digest: str, *, document_id: str) -> Optional[List[OCRPage]]:
+        """Return cached pages for ``digest`` relabelled as ``document_id``."""
+
+        path = self._entry_path(digest)
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [
+            OCRPage(
+                document_id=document_id,
+                page_number=int(item["page_number"]),
+                text=str(item["text"]),
+                confidence=float(item["confidence"]),
+            )
+            for item in payload.get("pages", [])
+        ]
+
+    def put(self, digest: str, pages: List[OCRPage]) -> None:
+        path = self._entry_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "engine_version": self.engine_version,
+            "pages": [
+                {
+                    "page_number": page.page_number,
+                    "text": page.text,
+                    "confidence": page.confidence,
+                }
+                for page in pages
+            ],
+        }
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        try:
+            replaced = path.stat().st_size
+        except FileNotFoundError:
+            replaced = 0
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_name, path)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        if self._size is None:
+            self._size = self.size_bytes()
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def size_bytes(self) -> int:
+        total = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                continue
+        return total
+
+    def evict(self) -> int:
+        """Drop least recently used entries until under ``max_bytes``."""
+
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        entries.sort(key=lambda entry: entry[0])
+        removed = 0
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self._size = total
+        return removed
@@ -1,12 +1,32 @@
 """Stub OCR implementation to keep the pipeline offline friendly."""
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Iterable, List
+import codecs
+import mmap
+import os
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Union
 
+from . import office
+from .ocr_cache import OCRCache, file_sha256, stream_sha256
+from .renderer import open_document
 from .types import DocumentArtifact, OCRPage
 
 _TEXTUAL_SUFFIXES = {".txt", ".csv", ".md", ".json"}
+_NATIVE_SUFFIXES = {".docx", ".xlsx"}
+_OCR_SUFFIXES = {".pdf"}
+
+TEXT_CHUNK_BYTES = 1024 * 1024
+_ENCODING_PROBE_BYTES = 64 * 1024
+
+OCR_ENGINE_VERSION = "stub-1"
+# Documents whose pages are kept for reuse by identical ones later in a job.
+DEDUP_WINDOW = 256
+OCR_WORKERS_ENV = "CNE_OCR_WORKERS"
 
 
 def _confidence_for_suffix(suffix: str) -> float:
@@ -14,22 +34,134 @@ def _confidence_for_suffix(suffix: str) -> float:
         return 0.99
     if suffix == ".pdf":
         return 0.93
-    if suffix in {".docx", ".xlsx"}:
-        return 0.9
+    if suffix in _NATIVE_SUFFIXES:
+        return 1.0
     return 0.75
 
 
-def _read_text_file(path: Path) -> str:
+def detect_encoding(prefix: bytes) -> str:
+    """Pick the codec of a text document from its first bytes.
+
+    A UTF-8 BOM or a prefix that decodes as UTF-8 (a multi-byte sequence
+    cut at the end of the prefix is fine) means UTF-8; anything else is
+    read as latin-1, which accepts every byte.
+    """
+
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
     try:
-        return path.read_text(encoding="utf-8")
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
     except UnicodeDecodeError:
-        return path.read_text(encoding="latin-1")
-    except OSError:
-        return ""
+        return "latin-1"
+    return "utf-8"
+
+
+def _iter_blocks(artifact: DocumentArtifact, block_size: int) -> Iterator[bytes]:
+    if artifact.member is not None:
+        with open_document(artifact) as handle:
+            yield from iter(lambda: handle.read(block_size), b"")
+        return
+    with artifact.source_path.open("rb") as handle:
+        size = handle.seek(0, os.SEEK_END)
+        if not size:
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            for start in range(0, size, block_size):
+                yield view[start : start + block_size]
+
+
+def iter_text_chunks(artifact: DocumentArtifact, chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Decode a text document lazily, in chunks that end on a line break.
+
+    Files are memory-mapped (ZIP members streamed) and decoded
+    incrementally with the codec :func:`detect_encoding` picks from the
+    first block, so memory stays around ``chunk_size`` (default
+    ``TEXT_CHUNK_BYTES``) whatever the file size. Invalid UTF-8 found after
+    that prefix is replaced rather than triggering a second decode of the
+    whole file.
+    """
+
+    chunk_size = chunk_size or TEXT_CHUNK_BYTES
+    decoder = None
+    pending = ""
+    for block in _iter_blocks(artifact, chunk_size):
+        if decoder is None:
+            encoding = detect_encoding(block[:_ENCODING_PROBE_BYTES])
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        pending += decoder.decode(block)
+        if len(pending) < chunk_size:
+            continue
+        cut = pending.rfind("\n")
+        if cut < 0:
+            cut = pending.rfind("\r")
+        if cut >= 0:
+            yield pending[: cut + 1]
+            pending = pending[cut + 1 :]
+    if decoder is not None:
+        pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _iter_text_pages(artifact: DocumentArtifact, confidence: float) -> Iterator[OCRPage]:
+    """One page per chunk of a text document; unreadable files give one empty page."""
+
+    number = 0
+    try:
+        for chunk in iter_text_chunks(artifact):
+            number += 1
+            yield OCRPage(
+                document_id=artifact.document_id,
+                page_number=number,
+                text=chunk.strip(),
+                confidence=confidence,
+            )
+    except (OSError, KeyError, zipfile.BadZipFile):
+        pass
+    if not number:
+        yield OCRPage(document_id=artifact.document_id, page_number=1, text="", confidence=confidence)
+
+
+def _iter_native_pages(artifact: DocumentArtifact, confidence: float) -> Iterator[OCRPage]:
+    """Pages of a DOCX/XLSX read natively, grouped up to ``TEXT_CHUNK_BYTES``.
+
+    Unlike plain text, a document that cannot be parsed raises, so the
+    caller reports it as a failed page.
+    """
+
+    number = 0
+    lines: List[str] = []
+    size = 0
+    with open_document(artifact) as handle:
+        for line in office.iter_lines(artifact.name.suffix.lower(), handle):
+            lines.append(line)
+            size += len(line) + 1
+            if size >= TEXT_CHUNK_BYTES:
+                number += 1
+                yield OCRPage(
+                    document_id=artifact.document_id,
+                    page_number=number,
+                    text="\n".join(lines),
+                    confidence=confidence,
+                )
+                lines, size = [], 0
+    if lines or not number:
+        yield OCRPage(
+            document_id=artifact.document_id,
+            page_number=number + 1,
+            text="\n".join(lines),
+            confidence=confidence,
+        )
+
+
+def _stub_label(job_id: str, artifact: DocumentArtifact) -> str:
+    """List label the stub writes for ``artifact``; it comes from the file name."""
+
+    return artifact.name.stem.upper() or job_id[:6].upper()
 
 
 def _stub_text(job_id: str, artifact: DocumentArtifact) -> str:
-    base = artifact.source_path.stem.upper() or job_id[:6].upper()
+    base = _stub_label(job_id, artifact)
     return (
         f"DTMNFR=150800;ORGAO=AM;SIGLA=PS;TIPO=2;NUM_ORDEM=1;NOME_LISTA=Lista {base};"
         "NOME_CANDIDATO=Candidato Efetivo;PARTIDO_PROPONENTE=PS;INDEPENDENTE=0\n"
@@ -38,25 +170,293 @@ def _stub_text(job_id: str, artifact: DocumentArtifact) -> str:
     )
 
 
-def run_ocr(job_id: str, artifacts: Iterable[DocumentArtifact]) -> List[OCRPage]:
-    pages: List[OCRPage] = []
-    for artifact in artifacts:
-        suffix = artifact.source_path.suffix.lower()
-        if suffix in _TEXTUAL_SUFFIXES:
-            text = _read_text_file(artifact.source_path)
-        elif suffix == ".pdf":
-            text = _stub_text(job_id, artifact)
-        elif suffix in {".docx", ".xlsx"}:
-            text = _stub_text(job_id, artifact)
-        else:
-            text = _read_text_file(artifact.source_path)
-        confidence = _confidence_for_suffix(suffix)
-        pages.append(
-            OCRPage(
-                document_id=str(artifact.source_path),
-                page_number=1,
-                text=text.strip(),
-                confidence=confidence,
-            )
+def _ocr_document(job_id: str, artifact: DocumentArtifact) -> Iterable[OCRPage]:
+    """OCR a single document; module level so process pools can pickle it.
+
+    Text and Office documents are read directly and come back as a lazy
+    page iterator, which must be consumed in the calling process; OCR'd
+    documents as a list.
+    """
+
+    suffix = artifact.name.suffix.lower()
+    confidence = _confidence_for_suffix(suffix)
+    if suffix in _NATIVE_SUFFIXES:
+        return _iter_native_pages(artifact, confidence)
+    if suffix not in _OCR_SUFFIXES:
+        return _iter_text_pages(artifact, confidence)
+    return [
+        OCRPage(
+            document_id=artifact.document_id,
+            page_number=1,
+            text=_stub_text(job_id, artifact).strip(),
+            confidence=confidence,
         )
-    return pages
+    ]
+
+
+def _failed_page(artifact: DocumentArtifact, exc: BaseException) -> OCRPage:
+    return OCRPage(
+        document_id=artifact.document_id,
+        page_number=1,
+        text="",
+        confidence=0.0,
+        error=f"{type(exc).__name__}: {exc}",
+    )
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """Return the OCR pool size, reading ``CNE_OCR_WORKERS`` when unset."""
+
+    if workers is None:
+        raw = os.environ.get(OCR_WORKERS_ENV, "").strip()
+        try:
+            workers = int(raw) if raw else 0
+        except ValueError:
+            workers = 0
+    return max(0, workers)
+
+
+def _document_digest(artifact: DocumentArtifact) -> Optional[str]:
+    """SHA-256 of a document that needs real OCR; ``None`` for the rest."""
+
+    if artifact.name.suffix.lower() not in _OCR_SUFFIXES:
+        return None
+    try:
+        if artifact.member is None:
+            return file_sha256(artifact.source_path)
+        with open_document(artifact) as handle:
+            return stream_sha256(handle)
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+
+
+def _document_key(job_id: str, artifact: DocumentArtifact) -> Optional[str]:
+    """Cache and dedup key of a document that needs OCR; ``None`` for the rest.
+
+    It must cover everything the OCR output depends on. For the stub that is
+    the bytes and the label taken from the file name, so identical files
+    under different names get entries of their own.
+    """
+
+    digest = _document_digest(artifact)
+    if digest is None:
+        return None
+    return f"{digest}:{_stub_label(job_id, artifact)}"
+
+
+def _lookup_cache(
+    cache: Optional[OCRCache], artifact: DocumentArtifact, key: Optional[str]
+) -> Optional[List[OCRPage]]:
+    if cache is None or key is None:
+        return None
+    return cache.get(key, document_id=artifact.document_id)
+
+
+def _store_cache(
+    cache: Optional[OCRCache], key: Optional[str], pages: List[OCRPage]
+) -> None:
+    if cache is None or key is None or any(page.error for page in pages):
+        return
+    cache.put(key, pages)
+
+
+def _relabel(pages: List[OCRPage], artifact: DocumentArtifact) -> List[OCRPage]:
+    """``pages`` of an identical document, attributed to ``artifact``."""
+
+    document_id = artifact.document_id
+    return [page if page.document_id == document_id else replace(page, document_id=document_id) for page in pages]
+
+
+def _remember(seen: OrderedDict[str, object], key: str, value: object) -> None:
+    """Record ``key`` as the most recent entry, forgetting the oldest beyond the window."""
+
+    seen[key] = value
+    seen.move_to_end(key)
+    while len(seen) > DEDUP_WINDOW:
+        seen.popitem(last=False)
+
+
+def _guard(artifact: DocumentArtifact, pages: Iterable[OCRPage]) -> Iterator[OCRPage]:
+    """Yield ``pages``, ending with a failed page if reading them raises."""
+
+    try:
+        yield from pages
+    except Exception as exc:  # keep the job alive when one document fails
+        yield _failed_page(artifact, exc)
+
+
+def _iter_ocr_sequential(
+    job_id: str,
+    artifacts: Iterable[DocumentArtifact],
+    cache: Optional[OCRCache],
+) -> Iterator[OCRPage]:
+    seen: OrderedDict[str, List[OCRPage]] = OrderedDict()
+    for artifact in artifacts:
+        key = _document_key(job_id, artifact)
+        if key in seen:
+            seen.move_to_end(key)
+            yield from _relabel(seen[key], artifact)
+            continue
+        pages = _lookup_cache(cache, artifact, key)
+        if pages is None:
+            try:
+                pages = _ocr_document(job_id, artifact)
+            except Exception as exc:  # keep the job alive when one document fails
+                pages = [_failed_page(artifact, exc)]
+            if key is not None:
+                pages = list(_guard(artifact, pages))
+                _store_cache(cache, key, pages)
+        if key is not None:
+            _remember(seen, key, pages)
+        yield from _guard(artifact, pages)
+
+
+class _OCRPool:
+    """Process pool that outlives a worker dying in the middle of a document.
+
+    A worker that exits abruptly breaks a ``ProcessPoolExecutor`` for good:
+    its pending futures fail and ``submit`` raises ``BrokenProcessPool``.
+    Submissions then go to a fresh pool, and :meth:`run_alone` re-runs a
+    document whose future failed that way in a single-worker pool of its
+    own, so only the document that kills its worker ends up failed.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self._workers = workers
+        self._pool = ProcessPoolExecutor(max_workers=workers)
+        self._isolated: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, job_id: str, artifact: DocumentArtifact) -> Future:
+        try:
+            return self._pool.submit(_ocr_document, job_id, artifact)
+        except BrokenProcessPool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = ProcessPoolExecutor(max_workers=self._workers)
+            return self._pool.submit(_ocr_document, job_id, artifact)
+
+    def run_alone(self, job_id: str, artifact: DocumentArtifact) -> Iterable[OCRPage]:
+        """OCR ``artifact`` with nothing else in flight; raises if it breaks the pool."""
+
+        if self._isolated is None:
+            self._isolated = ProcessPoolExecutor(max_workers=1)
+        try:
+            return self._isolated.submit(_ocr_document, job_id, artifact).result()
+        except BrokenProcessPool:
+            self._isolated.shutdown(wait=False)
+            self._isolated = None
+            raise
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+        if self._isolated is not None:
+            self._isolated.shutdown()
+
+
+def _iter_ocr_parallel(
+    job_id: str,
+    artifacts: Iterable[DocumentArtifact],
+    workers: int,
+    cache: Optional[OCRCache],
+) -> Iterator[OCRPage]:
+    """Dispatch OCR documents to the pool; other documents are read inline.
+
+    Text and Office pages are produced lazily in this process when their
+    turn comes, so a large CSV or sheet is never pickled back from a worker
+    in one piece. A document identical to one already submitted waits on
+    the same future instead of being OCR'd again. A worker that dies takes
+    only its own document down (see :class:`_OCRPool`).
+    """
+
+    window = workers * 2
+    pending: Deque[Tuple[DocumentArtifact, Optional[str], Union[Future, Iterable[OCRPage]]]] = deque()
+    seen: OrderedDict[str, Union[Future, List[OCRPage]]] = OrderedDict()
+
+    def drain_one() -> Iterable[OCRPage]:
+        artifact, key, outcome = pending.popleft()
+        if not isinstance(outcome, Future):
+            return _guard(artifact, outcome)
+        try:
+            pages = outcome.result()
+        except BrokenProcessPool:
+            # Any worker may have died; run this document again on its own.
+            try:
+                pages = pool.run_alone(job_id, artifact)
+            except Exception as exc:  # it was this document that killed the worker
+                return [_failed_page(artifact, exc)]
+        except Exception as exc:  # keep the job alive when one document fails
+            return [_failed_page(artifact, exc)]
+        if key is not None:
+            if key in seen:
+                seen[key] = pages
+            _store_cache(cache, key, pages)
+        return _relabel(pages, artifact)
+
+    pool = _OCRPool(workers)
+    try:
+        for artifact in artifacts:
+            key = _document_key(job_id, artifact)
+            known = seen.get(key) if key is not None else None
+            if known is not None:
+                seen.move_to_end(key)
+                outcome = known if isinstance(known, Future) else _relabel(known, artifact)
+                pending.append((artifact, None, outcome))
+                continue
+            cached = _lookup_cache(cache, artifact, key)
+            if cached is not None:
+                _remember(seen, key, cached)
+                pending.append((artifact, None, cached))
+            elif artifact.name.suffix.lower() not in _OCR_SUFFIXES:
+                try:
+                    pages = _ocr_document(job_id, artifact)
+                except Exception as exc:  # keep the job alive when one document fails
+                    pages = [_failed_page(artifact, exc)]
+                pending.append((artifact, None, pages))
+            else:
+                future = pool.submit(job_id, artifact)
+                if key is not None:
+                    _remember(seen, key, future)
+                pending.append((artifact, key, future))
+            if len(pending) >= window:
+                yield from drain_one()
+        while pending:
+            yield from drain_one()
+    finally:
+        pool.shutdown()
+
+
+def iter_ocr(
+    job_id: str,
+    artifacts: Iterable[DocumentArtifact],
+    *,
+    workers: Optional[int] = None,
+    cache: Optional[OCRCache] = None,
+) -> Iterator[OCRPage]:
+    """Yield OCR pages lazily so downstream stages never hold the full batch.
+
+    With ``workers`` greater than one, documents are dispatched to a process
+    pool with at most ``2 * workers`` in flight, and their pages are yielded
+    in input order as soon as each document finishes. A document that raises
+    yields a single empty page carrying ``error`` instead of failing the job.
+
+    Documents that need OCR are hashed first (see :func:`_document_key`):
+    one identical to one of the last ``DEDUP_WINDOW`` distinct documents of
+    the same call reuses its pages (relabelled, in its own position) instead
+    of being OCR'd again. When
+    ``cache`` is given, they are also served from the cache on a hit and
+    stored on a miss.
+    """
+
+    count = resolve_workers(workers)
+    if count > 1:
+        return _iter_ocr_parallel(job_id, artifacts, count, cache)
+    return _iter_ocr_sequential(job_id, artifacts, cache)
+
+
+def run_ocr(
+    job_id: str,
+    artifacts: Iterable[DocumentArtifact],
+    *,
+    workers: Optional[int] = None,
+    cache: Optional[OCRCache] = None,
+) -> List[OCRPage]:
+    return list(iter_ocr(job_id, artifacts, workers=workers, cache=cache))
@@ -0,0 +1,247 @@
+"""Native text extraction for Office Open XML documents (DOCX/XLSX).
+
+Both formats are ZIP containers of XML parts, so their text is read
+directly instead of being rasterised and OCR'd. Parts are streamed through
+:func:`xml.etree.ElementTree.iterparse` and elements are detached from
+the tree as soon as they are consumed, so large sheets never sit in memory
+as a whole tree.
+
+Tables map straight to segments: when the first row of a table (or sheet)
+names candidate fields (``DTMNFR``, ``NOME_CANDIDATO``...), every following
+row becomes a ``KEY=value;...`` line the extractor understands; otherwise
+the non-empty cells are joined with ``;`` as they are.
+"""
+from __future__ import annotations
+
+import posixpath
+import re
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import Element, iterparse
+
+from .types import CANDIDATE_FIELDS
+
+_DOCX_BODY = "word/document.xml"
+_XLSX_WORKBOOK = "xl/workbook.xml"
+_XLSX_WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+_XLSX_SHARED_STRINGS = "xl/sharedStrings.xml"
+_XLSX_SHEETS = re.compile(r"xl/worksheets/sheet(\d+)\.xml")
+
+_FIELDS = frozenset(CANDIDATE_FIELDS)
+_CELL_COLUMN = re.compile(r"[A-Z]+")
+
+
+def _local(tag: str) -> str:
+    """Tag name without its namespace (transitional and strict OOXML alike)."""
+
+    return tag.rsplit("}", 1)[-1]
+
+
+def _attribute(element, name: str) -> Optional[str]:
+    for key, value in element.attrib.items():
+        if _local(key) == name:
+            return value
+    return None
+
+
+def _iter_events(part: BinaryIO) -> Iterator[Tuple[str, Element]]:
+    """``start``/``end`` events of ``part``, dropping each element once handled.
+
+    Clearing an element still leaves it attached to its parent, so the root
+    would keep one empty element per row. ElementTree has no
+    ``getprevious``, so open elements are tracked on a stack and each one is
+    removed from its parent after its ``end`` event has been processed.
+    """
+
+    parents: List[Element] = []
+    for event, element in iterparse(part, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            yield event, element
+            continue
+        parents.pop()
+        yield event, element
+        element.clear()
+        if parents:
+            parents[-1].remove(element)
+
+
+def _header(cells: List[str]) -> Optional[List[str]]:
+    keys = [cell.strip().upper().replace(" ", "_") for cell in cells]
+    return keys if _FIELDS.intersection(keys) else None
+
+
+class _Table:
+    """Turns the rows of one table into segments, keyed by a field header."""
+
+    def __init__(self) -> None:
+        self.header: Optional[List[str]] = None
+        self.first = True
+
+    def line(self, cells: List[str]) -> Optional[str]:
+        cells = [cell.strip() for cell in cells]
+        if not any(cells):
+            return None
+        if self.first:
+            self.first = False
+            self.header = _header(cells)
+            if self.header is not None:
+                return None
+        if self.header is None:
+            return ";".join(cell for cell in cells if cell)
+        pairs = zip(self.header, cells)
+        return ";".join(f"{key}={value}" for key, value in pairs if key in _FIELDS and value)
+
+
+def iter_docx_lines(handle: BinaryIO) -> Iterator[str]:
+    """Yield the paragraphs and table rows of a DOCX, in document order."""
+
+    with zipfile.ZipFile(handle) as package, package.open(_DOCX_BODY) as part:
+        tables: List[_Table] = []
+        rows: List[List[str]] = []
+        cells: List[List[str]] = []
+        text: List[str] = []
+        for event, element in _iter_events(part):
+            tag = _local(element.tag)
+            if event == "start":
+                if tag == "tbl":
+                    tables.append(_Table())
+                elif tag == "tr":
+                    rows.append([])
+                elif tag == "tc":
+                    cells.append([])
+                elif tag == "p":
+                    text = []
+                continue
+            if tag == "t":
+                text.append(element.text or "")
+            elif tag in {"tab", "br"}:
+                text.append(" ")
+            elif tag == "p":
+                paragraph = "".join(text).strip()
+                if cells:
+                    cells[-1].append(paragraph)
+                elif paragraph:
+                    yield paragraph
+            elif tag == "tc" and cells:
+                rows[-1].append(" ".join(part for part in cells.pop() if part))
+            elif tag == "tr" and rows:
+                line = tables[-1].line(rows.pop())
+                if line:
+                    yield line
+            elif tag == "tbl" and tables:
+                tables.pop()
+
+
+def _column_index(reference: Optional[str], default: int) -> int:
+    match = _CELL_COLUMN.match(reference or "")
+    if match is None:
+        return default
+    index = 0
+    for letter in match.group():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def _shared_strings(package: zipfile.ZipFile) -> List[str]:
+    if _XLSX_SHARED_STRINGS not in package.namelist():
+        return []
+    strings: List[str] = []
+    with package.open(_XLSX_SHARED_STRINGS) as part:
+        text: List[str] = []
+        for event, element in _iter_events(part):
+            tag = _local(element.tag)
+            if event == "start":
+                if tag == "si":
+                    text = []
+                continue
+            if tag == "t":
+                text.append(element.text or "")
+            elif tag == "si":
+                strings.append("".join(text))
+    return strings
+
+
+def _sheet_parts(package: zipfile.ZipFile) -> List[str]:
+    """Worksheet parts in workbook tab order, falling back to part numbering."""
+
+    names = set(package.namelist())
+    if _XLSX_WORKBOOK in names and _XLSX_WORKBOOK_RELS in names:
+        with package.open(_XLSX_WORKBOOK_RELS) as part:
+            targets: Dict[str, str] = {}
+            for _, element in iterparse(part):
+                if _local(element.tag) == "Relationship":
+                    target = element.get("Target", "")
+                    if target.startswith("/"):
+                        target = target.lstrip("/")
+                    else:
+                        target = posixpath.normpath(posixpath.join("xl", target))
+                    targets[element.get("Id", "")] = target
+        with package.open(_XLSX_WORKBOOK) as part:
+            ordered = [
+                targets.get(_attribute(element, "id") or "", "")
+                for _, element in iterparse(part)
+                if _local(element.tag) == "sheet"
+            ]
+        ordered = [target for target in ordered if target in names]
+        if ordered:
+            return ordered
+    numbered = (_XLSX_SHEETS.fullmatch(name) for name in names)
+    return [match.group() for match in sorted(filter(None, numbered), key=lambda match: int(match.group(1)))]
+
+
+def _iter_sheet_rows(part: BinaryIO, strings: List[str]) -> Iterator[List[str]]:
+    row: Dict[int, str] = {}
+    value: Optional[str] = None
+    inline: List[str] = []
+    for event, element in _iter_events(part):
+        tag = _local(element.tag)
+        if event == "start":
+            if tag == "row":
+                row = {}
+            elif tag == "c":
+                value, inline = None, []
+            continue
+        if tag == "v":
+            value = element.text
+        elif tag == "t":
+            inline.append(element.text or "")
+        elif tag == "c":
+            kind = element.get("t", "n")
+            if kind == "s" and value is not None:
+                try:
+                    value = strings[int(value)]
+                except (ValueError, IndexError):
+                    value = None
+            elif kind == "inlineStr":
+                value = "".join(inline)
+            if value:
+                row[_column_index(element.get("r"), len(row))] = value
+        elif tag == "row":
+            if row:
+                width = max(row) + 1
+                yield [row.get(index, "") for index in range(width)]
+
+
+def iter_xlsx_lines(handle: BinaryIO) -> Iterator[str]:
+    """Yield one line per non-empty row of every worksheet, in tab order."""
+
+    with zipfile.ZipFile(handle) as package:
+        strings = _shared_strings(package)
+        for name in _sheet_parts(package):
+            table = _Table()
+            with package.open(name) as part:
+                for cells in _iter_sheet_rows(part, strings):
+                    line = table.line(cells)
+                    if line:
+                        yield line
+
+
+def iter_lines(suffix: str, handle: BinaryIO) -> Iterable[str]:
+    """Dispatch to the extractor for ``suffix`` (``.docx`` or ``.xlsx``)."""
+
+    if suffix == ".docx":
+        return iter_docx_lines(handle)
+    if suffix == ".xlsx":
+        return iter_xlsx_lines(handle)
+    raise ValueError(f"no native extractor for {suffix!r}")
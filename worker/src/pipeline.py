@@ -1,12 +1,158 @@
 """High-level orchestration of the candidate list processing pipeline."""
 from __future__ import annotations
 
+import time
+from contextlib import closing
+from itertools import islice
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from . import extractor, normalizer, ocr_stub, renderer, segmenter, validator, writer
-from .storage import JobState, JobStorage
-from .types import PipelineResult
+from .batch import CandidateBatch
+from .instrumentation import Instrumentation
+from .metrics import JOB_DURATION, OCR_CONFIDENCE, ROWS_PER_SECOND, ROWS_PROCESSED, STAGE_DURATION
+from .metrics import MetricsRegistry, get_registry
+from .ocr_cache import OCRCache
+from .profiling import JobProfiler, profiling_enabled
+from .progress import STATE_EVENT, ProgressPublisher
+from .runs import SortedRuns
+from .storage import JobState, JobStorage, open_job_storage
+from .types import CANDIDATE_FIELDS, OCRPage, PipelineResult
+
+# Rows extracted, normalised and sorted at a time. A job that fits in one
+# chunk is validated as a single batch; larger jobs spill sorted runs.
+BATCH_ROWS = 100_000
+
+
+class _PageTracker:
+    """Counts pages and accumulates OCR confidence while they stream past.
+
+    Failed pages (``error`` set) are counted as errors and left out of the
+    confidence mean and histogram: their 0.0 is not a reading.
+
+    With a ``progress`` publisher, every page is also reported as an
+    ``ocr`` event: ``current`` of ``total`` documents and its page number.
+    With a metrics ``registry``, page confidences feed its histogram.
+    """
+
+    def __init__(
+        self,
+        progress: Optional[ProgressPublisher] = None,
+        documents: Optional[int] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.count = 0
+        self.errors = 0
+        self._confidence_total = 0.0
+        self._confidence_count = 0
+        self._progress = progress
+        self._documents = documents
+        self._registry = registry
+
+    def track(self, pages: Iterable[OCRPage]) -> Iterator[OCRPage]:
+        document_id = None
+        document = 0
+        for page in pages:
+            self.count += 1
+            if page.error:
+                self.errors += 1
+            else:
+                self._confidence_total += page.confidence
+                self._confidence_count += 1
+                if self._registry is not None:
+                    self._registry.observe(OCR_CONFIDENCE, page.confidence)
+            if self._progress is not None:
+                if page.document_id != document_id:
+                    document_id = page.document_id
+                    document += 1
+                self._progress.emit(
+                    "ocr", current=document, total=self._documents, page=page.page_number, pages=self.count
+                )
+            yield page
+
+    @property
+    def confidence_mean(self) -> Optional[float]:
+        if not self._confidence_count:
+            return None
+        return round(self._confidence_total / self._confidence_count, 4)
+
+
+def _count(items: Iterable[str], counter: List[int]) -> Iterator[str]:
+    for item in items:
+        counter[0] += 1
+        yield item
+
+
+def _emit_validated(progress: ProgressPublisher, summary: dict) -> None:
+    progress.emit(
+        "validate",
+        rows_ok=summary["rows_ok"],
+        rows_warn=summary["rows_warn"],
+        rows_err=summary["rows_err"],
+    )
+
+
+def _write_in_runs(
+    job_id: str,
+    base: Path,
+    pending: List[Dict[str, List]],
+    chunks: Iterator[Dict[str, List]],
+    metrics: Instrumentation,
+    progress: ProgressPublisher,
+    segment_count: List[int],
+) -> Tuple[Path, validator.ValidationTally]:
+    """Validate and write a job too large for one batch, chunk by chunk.
+
+    ``pending`` holds chunks already extracted from ``chunks``. Each chunk
+    is normalised, checked and sorted on its own, then spilled as a sorted
+    run (see :mod:`.runs`), so one chunk's columns are held at a time. The
+    runs are merged into the CSV while ``NUM_ORDEM`` is renumbered across
+    chunk boundaries, which gives the same rows, flags and tally as
+    validating the whole job as one batch.
+    """
+
+    rows = 0
+    with SortedRuns(base / "processed" / job_id) as runs:
+        while True:
+            with metrics.stage("extract") as stage:
+                columns = pending.pop(0) if pending else next(chunks, None)
+                if columns is not None:
+                    rows += len(columns[CANDIDATE_FIELDS[0]])
+                stage.items_in, stage.items_out = segment_count[0], rows
+            if columns is None:
+                break
+            batch = CandidateBatch.from_columns(columns)
+            del columns
+            with metrics.stage("normalize", items_in=rows) as stage:
+                normalizer.normalize_batch(batch)
+                stage.items_out = rows
+            with metrics.stage("validate", items_in=rows):
+                validator.sort_batch(batch)
+                runs.add(batch)
+            del batch
+        progress.emit("segment", segments=segment_count[0])
+        progress.emit("extract", rows=rows)
+
+        tally = validator.ValidationTally()
+        records = metrics.wrap(
+            "validate", validator.renumber_records(runs.merge(validator.record_sort_key), tally)
+        )
+        with metrics.stage("write", items_in=rows) as stage:
+            csv_path = writer.write_records_csv(job_id, records, base)
+            stage.items_out = rows
+    return csv_path, tally
+
+
+def _record_metrics(
+    registry: MetricsRegistry, state: JobState, elapsed: float, rows: int, timings: dict
+) -> None:
+    registry.observe(JOB_DURATION, elapsed, state=state.value)
+    for stage, values in timings.items():
+        registry.observe(STAGE_DURATION, (values.get("wall_ms") or 0) / 1000, stage=stage)
+    if state is JobState.ready:
+        registry.inc(ROWS_PROCESSED, rows)
+        if elapsed > 0:
+            registry.observe(ROWS_PER_SECOND, rows / elapsed)
 
 
 def process_job(
@@ -15,45 +161,149 @@ def process_job(
     *,
     base_dir: Optional[Path] = None,
     storage: Optional[JobStorage] = None,
+    ocr_workers: Optional[int] = None,
+    ocr_cache: Optional[OCRCache] = None,
+    instrument: Optional[bool] = None,
+    profile: Optional[bool] = None,
 ) -> PipelineResult:
-    """Run the full pipeline for ``job_id`` and persist artefacts."""
+    """Run the full pipeline for ``job_id`` and persist artefacts.
+
+    Render, OCR, segmentation and extraction are chained generators, so
+    only one page is in flight between them. ZIP inputs are expanded into
+    their members in archive order and read straight from the archive, so
+    the first member's rows flow downstream before the rest is decoded.
+    Extracted values land directly in a columnar :class:`CandidateBatch`,
+    which is normalised, validated (one sort plus group renumbering) and
+    written without ever building a ``CandidateRow`` per line. Jobs of more
+    than ``BATCH_ROWS`` rows are processed in chunks of that size and
+    merged from sorted runs on disk, with the same output.
+
+    ``ocr_workers`` sizes the OCR process pool; ``None`` defers to the
+    ``CNE_OCR_WORKERS`` environment variable and ``0``/``1`` run inline.
+    OCR results are cached under ``<base_dir>/ocr_cache`` unless another
+    ``ocr_cache`` is supplied; per-job hit/miss counts land in the stats.
+    Identical documents within the job are OCR'd once and their pages
+    reused in place, so their rows repeat in input order.
+
+    Progress is published to ``<base_dir>/events/<job_id>.jsonl`` (see
+    :mod:`.progress`): state changes, one ``ocr`` event per page and one
+    event as each later stage completes.
+
+    With ``instrument`` (``None`` defers to ``CNE_STAGE_METRICS``, see
+    :mod:`.instrumentation`), per-stage wall/CPU time, memory and item
+    counts are stored in ``JobMetadata.timings``, also for failed jobs.
+    Job duration, rows, page confidences and those stage timings also feed
+    the shared metrics under ``<base_dir>/metrics`` (see :mod:`.metrics`).
+
+    With ``profile`` (``None`` defers to the job's ``profile`` flag and
+    ``CNE_PROFILE``, see :mod:`.profiling`), the run is profiled into
+    ``profile.pstats`` and ``profile.collapsed`` next to the CSV, also for
+    failed jobs, and their paths are stored in ``JobMetadata.profile_files``.
+    """
 
     base = Path(base_dir or Path("data")).resolve()
-    store = storage or JobStorage(base)
+    if storage is None:
+        with closing(open_job_storage(base)) as owned:
+            return process_job(
+                job_id,
+                files,
+                base_dir=base,
+                storage=owned,
+                ocr_workers=ocr_workers,
+                ocr_cache=ocr_cache,
+                instrument=instrument,
+                profile=profile,
+            )
+    store = storage
     input_paths = [Path(path).resolve() for path in files]
+    cache = ocr_cache or OCRCache(base / "ocr_cache", ocr_stub.OCR_ENGINE_VERSION)
+    hits_before, misses_before = cache.hits, cache.misses
+    metrics = Instrumentation.from_env() if instrument is None else Instrumentation(enabled=instrument)
+    registry = get_registry(base)
+    started = time.perf_counter()
 
-    store.ensure(job_id, input_paths)
+    metadata = store.ensure(job_id, input_paths)
     store.mark_state(job_id, JobState.processing, error=None)
+    profiler = JobProfiler.for_job(base, job_id) if profiling_enabled(profile, metadata.profile) else None
 
-    try:
-        artifacts = renderer.render_documents(job_id, input_paths)
-        pages = ocr_stub.run_ocr(job_id, artifacts)
-        ocr_conf_mean = None
-        if pages:
-            ocr_conf_mean = round(
-                sum(page.confidence for page in pages) / len(pages),
-                4,
+    with ProgressPublisher(base, job_id) as progress:
+        progress.emit(STATE_EVENT, state=JobState.processing.value)
+        try:
+            if profiler is not None:
+                profiler.start()
+            documents = renderer.count_documents(input_paths)
+            tracker = _PageTracker(progress, documents=documents, registry=registry)
+            progress.emit("render", total=documents)
+            artifacts = metrics.wrap("render", renderer.iter_documents(job_id, input_paths))
+            pages = metrics.wrap(
+                "ocr",
+                tracker.track(ocr_stub.iter_ocr(job_id, artifacts, workers=ocr_workers, cache=cache)),
+                upstream="render",
             )
-        segments = segmenter.segment_pages(pages)
-        raw_rows = extractor.extract_candidates(segments)
-        normalized_rows = normalizer.normalize_rows(raw_rows)
-        validated_rows = validator.validate_rows(normalized_rows)
-        summary = validator.summarise_validation(
-            validated_rows, ocr_conf_mean=ocr_conf_mean
-        )
-
-        csv_path, _meta_path = writer.write_outputs(job_id, validated_rows, summary, base)
+            segment_count = [0]
+            segments = _count(
+                metrics.wrap("segment", segmenter.iter_segments(pages), upstream="ocr"), segment_count
+            )
+            chunks = extractor.iter_column_chunks(segments, BATCH_ROWS)
+            with metrics.stage("extract") as stage:
+                pending = list(islice(chunks, 2))
+                stage.items_in = segment_count[0]
+                stage.items_out = sum(len(columns[CANDIDATE_FIELDS[0]]) for columns in pending)
+            if len(pending) > 1:
+                csv_path, tally = _write_in_runs(
+                    job_id, base, pending, chunks, metrics, progress, segment_count
+                )
+                summary = tally.summary(ocr_conf_mean=tracker.confidence_mean)
+                _emit_validated(progress, summary)
+            else:
+                batch = CandidateBatch.from_columns(pending.pop())
+                progress.emit("segment", segments=segment_count[0])
+                progress.emit("extract", rows=len(batch))
+                with metrics.stage("normalize", items_in=len(batch)) as stage:
+                    normalizer.normalize_batch(batch)
+                    stage.items_out = len(batch)
+                with metrics.stage("validate", items_in=len(batch)) as stage:
+                    summary = validator.validate_and_summarise(
+                        batch, ocr_conf_mean=tracker.confidence_mean
+                    )
+                    stage.items_out = summary["rows_total"]
+                _emit_validated(progress, summary)
+                with metrics.stage("write", items_in=len(batch)) as stage:
+                    csv_path = writer.write_batch_csv(job_id, batch, base)
+                    stage.items_out = len(batch)
+            summary["ocr_errors"] = tracker.errors
+            summary["ocr_cache_hits"] = cache.hits - hits_before
+            summary["ocr_cache_misses"] = cache.misses - misses_before
+            writer.write_summary(job_id, summary, base)
+            progress.emit("write", csv=csv_path.name, rows=summary["rows_total"])
+            timings = metrics.as_dict()
+            profile_files = profiler.stop() if profiler is not None else {}
 
-        store.mark_state(
-            job_id,
-            JobState.ready,
-            csv_path=str(csv_path),
-            pages=len(pages),
-            stats=summary,
-        )
-    except Exception as exc:  # pragma: no cover - defensive safeguard
-        store.mark_state(job_id, JobState.failed, error=str(exc))
-        raise
+            store.mark_state(
+                job_id,
+                JobState.ready,
+                csv_path=str(csv_path),
+                pages=tracker.count,
+                stats=summary,
+                timings=timings,
+                profile_files=profile_files,
+            )
+        except Exception as exc:  # pragma: no cover - defensive safeguard
+            timings = metrics.as_dict()
+            profile_files = profiler.stop() if profiler is not None else {}
+            store.mark_state(
+                job_id, JobState.failed, error=str(exc), timings=timings, profile_files=profile_files
+            )
+            _record_metrics(registry, JobState.failed, time.perf_counter() - started, 0, timings)
+            progress.emit(STATE_EVENT, state=JobState.failed.value, error=str(exc))
+            raise
+        finally:
+            metrics.close()
+            if profiler is not None:
+                # Already stopped unless failing to record the outcome raised.
+                profiler.stop()
+        progress.emit(STATE_EVENT, state=JobState.ready.value)
+    _record_metrics(registry, JobState.ready, time.perf_counter() - started, summary["rows_total"], timings)
 
     return PipelineResult(
         job_id=job_id,
@@ -62,6 +312,6 @@ def process_job(
         rows_ok=summary["rows_ok"],
         rows_warn=summary["rows_warn"],
         rows_err=summary["rows_err"],
-        pages_processed=len(pages),
+        pages_processed=tracker.count,
         ocr_conf_mean=summary.get("ocr_conf_mean"),
     )
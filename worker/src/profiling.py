@@ -0,0 +1,127 @@
+"""Opt-in profile of a single pipeline run.
+
+A job is profiled when it was submitted with the ``profile`` flag
+(``JobMetadata.profile``), when ``process_job`` gets ``profile=True`` or
+when ``CNE_PROFILE`` is set in the worker's environment. Otherwise no
+profiler is created at all, so normal jobs run exactly as before.
+
+A profiled run leaves two files next to the job CSV, in
+``<base_dir>/processed/<job_id>/``:
+
+- ``profile.pstats``: deterministic :mod:`cProfile` statistics, for
+  ``python -m pstats`` or snakeviz;
+- ``profile.collapsed``: stacks sampled every few milliseconds in the
+  collapsed one-line-per-stack format (``root;child;leaf count``) that
+  ``flamegraph.pl``, speedscope and inferno read.
+
+Both cover the thread that runs the job. OCR done in a worker pool shows
+up as time spent waiting for the pool.
+"""
+from __future__ import annotations
+
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional
+
+PROFILE_ENV = "CNE_PROFILE"
+PSTATS_FILENAME = "profile.pstats"
+COLLAPSED_FILENAME = "profile.collapsed"
+PROFILE_FILES = {"pstats": PSTATS_FILENAME, "collapsed": COLLAPSED_FILENAME}
+SAMPLE_INTERVAL_S = 0.005
+_DISABLED = {"", "0", "off", "false", "no"}
+
+
+def profiling_enabled(profile: Optional[bool] = None, requested: bool = False) -> bool:
+    """``profile`` wins when given; otherwise the job flag or ``CNE_PROFILE``."""
+
+    if profile is not None:
+        return profile
+    return requested or os.environ.get(PROFILE_ENV, "").strip().lower() not in _DISABLED
+
+
+def profile_dir(base_dir: Path, job_id: str) -> Path:
+    return Path(base_dir) / "processed" / job_id
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class _StackSampler:
+    """Counts the stacks of one thread, sampled from a daemon thread."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self.stacks: Counter = Counter()
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cne-profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.ident is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            labels: List[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+
+class JobProfiler:
+    """cProfile plus a stack sampler around one job; see the module docs."""
+
+    def __init__(self, directory: Path, *, interval: float = SAMPLE_INTERVAL_S) -> None:
+        self.directory = Path(directory)
+        self._profile = cProfile.Profile()
+        self._sampler = _StackSampler(threading.get_ident(), interval)
+        self._files: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def for_job(cls, base_dir: Path, job_id: str, *, interval: float = SAMPLE_INTERVAL_S) -> "JobProfiler":
+        return cls(profile_dir(base_dir, job_id), interval=interval)
+
+    def start(self) -> None:
+        self._sampler.start()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, str]:
+        """Stop profiling and write the files; returns ``{kind: path}``.
+
+        Safe to call again, which returns the same files. A profile that
+        cannot be written is dropped rather than failing the job.
+        """
+
+        if self._files is not None:
+            return self._files
+        self._profile.disable()
+        self._sampler.stop()
+        self._files = {}
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            pstats_path = self.directory / PSTATS_FILENAME
+            self._profile.dump_stats(str(pstats_path))
+            self._files["pstats"] = str(pstats_path)
+            collapsed_path = self.directory / COLLAPSED_FILENAME
+            collapsed_path.write_text(
+                "".join(f"{stack} {count}\n" for stack, count in sorted(self._sampler.stacks.items())),
+                encoding="utf-8",
+            )
+            self._files["collapsed"] = str(collapsed_path)
+        except OSError:
+            pass
+        return self._files
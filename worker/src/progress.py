@@ -0,0 +1,126 @@
+"""Per-job progress events published through an append-only file.
+
+The pipeline and the API usually run in different processes, so the
+"broker" is a JSON-lines file per job under ``<base_dir>/events``: the
+worker appends one line per event with a single ``O_APPEND`` write and any
+number of readers tail it. A reader's position is the byte offset after
+the last line it consumed.
+
+Each run of a job starts by truncating its file and stamps every event
+with a fresh ``run`` id. Readers pass back the run they were reading and
+start over from the beginning when the file's first event carries
+another one, however far the new run has already written.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+EVENTS_DIRNAME = "events"
+
+STATE_EVENT = "state"
+TERMINAL_STATES = frozenset({"ready", "failed"})
+# Job states no run publishes events after; approval happens outside the pipeline.
+FINAL_JOB_STATES = TERMINAL_STATES | {"approved"}
+
+
+def events_path(base_dir: Path, job_id: str) -> Path:
+    return Path(base_dir) / EVENTS_DIRNAME / f"{job_id}.jsonl"
+
+
+def _first_run(handle) -> Optional[str]:
+    line = handle.readline()
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        return json.loads(line).get("run")
+    except (ValueError, AttributeError):
+        return None
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    return event.get("stage") == STATE_EVENT and event.get("state") in TERMINAL_STATES
+
+
+class ProgressPublisher:
+    """Appends progress events for one job run.
+
+    ``emit(stage, **fields)`` writes ``{"run", "seq", "ts", "stage",
+    **fields}``, where ``run`` identifies this run of the job.
+    Stages used by the pipeline are ``state``, ``render``, ``ocr``,
+    ``segment``, ``extract``, ``validate`` and ``write``; counters are
+    reported as ``current``/``total``.
+    """
+
+    def __init__(self, base_dir: Path, job_id: str) -> None:
+        self.job_id = job_id
+        self.path = events_path(base_dir, job_id)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd: Optional[int] = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        self.run = uuid.uuid4().hex[:12]
+        self._seq = 0
+
+    def __enter__(self) -> "ProgressPublisher":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def emit(self, stage: str, **fields: Any) -> None:
+        if self._fd is None:
+            return
+        self._seq += 1
+        event = {"run": self.run, "seq": self._seq, "ts": round(time.time(), 3), "stage": stage, **fields}
+        os.write(self._fd, json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+def read_events(
+    path: Path, offset: int = 0, run: Optional[str] = None
+) -> Tuple[List[Tuple[int, Dict[str, Any]]], int, Optional[str]]:
+    """Return the complete events after ``offset``, the new offset and the run.
+
+    Each event comes with the offset just past its line. A partially
+    written last line is left for the next call. ``offset`` only applies
+    to ``run``: when the file now holds another run (or has been truncated
+    for one), reading resumes from the beginning.
+    """
+
+    try:
+        handle = Path(path).open("rb")
+    except FileNotFoundError:
+        return [], 0, None
+    with handle:
+        current = _first_run(handle)
+        size = handle.seek(0, os.SEEK_END)
+        if current != run or offset > size:
+            offset = 0
+        handle.seek(offset)
+        data = handle.read(size - offset)
+
+    events: List[Tuple[int, Dict[str, Any]]] = []
+    position = offset
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        position += len(line)
+        try:
+            events.append((position, json.loads(line)))
+        except ValueError:
+            continue
+    return events, position, current
+
+
+def finished_run(path: Path) -> Optional[str]:
+    """The run in ``path`` if its last event is a final state, else ``None``."""
+
+    events, _offset, run = read_events(path)
+    return run if events and is_terminal(events[-1][1]) else None
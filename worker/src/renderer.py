@@ -1,8 +1,10 @@
 """Input rendering stage (detect file types and produce artifacts)."""
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Iterable, List
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Iterable, Iterator, List
 
 from .types import DocumentArtifact
 
@@ -16,14 +18,80 @@ _SUPPORTED_MEDIA = {
 }
 
 _DEFAULT_MEDIA = "application/octet-stream"
+_ZIP_SUFFIX = ".zip"
+
+
+def media_type_for(name: str) -> str:
+    return _SUPPORTED_MEDIA.get(PurePosixPath(name).suffix.lower(), _DEFAULT_MEDIA)
+
+
+def _is_document_member(info: zipfile.ZipInfo) -> bool:
+    if info.is_dir():
+        return False
+    parts = PurePosixPath(info.filename).parts
+    return not any(part.startswith(".") or part == "__MACOSX" for part in parts)
+
+
+def zip_members(path: Path) -> List[zipfile.ZipInfo]:
+    """Document entries of a ZIP in archive order, from its central directory.
+
+    Directories and hidden/resource-fork entries (``.DS_Store``,
+    ``__MACOSX/``) are skipped. Nothing is decompressed.
+    """
+
+    with zipfile.ZipFile(path) as archive:
+        return [info for info in archive.infolist() if _is_document_member(info)]
+
+
+def iter_documents(job_id: str, files: Iterable[Path]) -> Iterator[DocumentArtifact]:
+    """Yield lightweight artifacts with detected media types, one per document.
+
+    A ZIP input yields one artifact per member, in archive order, so the
+    documents keep the sequence they were packed in. Members are never
+    extracted: consumers read them with :func:`open_document`.
+    """
+
+    for path in files:
+        path = Path(path)
+        if path.suffix.lower() == _ZIP_SUFFIX and zipfile.is_zipfile(path):
+            for info in zip_members(path):
+                yield DocumentArtifact(
+                    job_id=job_id,
+                    source_path=path,
+                    media_type=media_type_for(info.filename),
+                    member=info.filename,
+                )
+            continue
+        yield DocumentArtifact(job_id=job_id, source_path=path, media_type=media_type_for(path.name))
+
+
+def count_documents(files: Iterable[Path]) -> int:
+    """Number of artifacts :func:`iter_documents` yields, from ZIP directories only."""
+
+    count = 0
+    for path in files:
+        path = Path(path)
+        if path.suffix.lower() == _ZIP_SUFFIX and zipfile.is_zipfile(path):
+            count += len(zip_members(path))
+        else:
+            count += 1
+    return count
+
+
+@contextmanager
+def open_document(artifact: DocumentArtifact) -> Iterator[BinaryIO]:
+    """Open the document's bytes, streaming ZIP members from the archive."""
+
+    if artifact.member is None:
+        with artifact.source_path.open("rb") as handle:
+            yield handle
+        return
+    with zipfile.ZipFile(artifact.source_path) as archive:
+        with archive.open(artifact.member) as handle:
+            yield handle  # type: ignore[misc]
 
 
 def render_documents(job_id: str, files: Iterable[Path]) -> List[DocumentArtifact]:
     """Return lightweight artifacts with detected media types."""
 
-    artifacts: List[DocumentArtifact] = []
-    for path in files:
-        suffix = path.suffix.lower()
-        media_type = _SUPPORTED_MEDIA.get(suffix, _DEFAULT_MEDIA)
-        artifacts.append(DocumentArtifact(job_id=job_id, source_path=Path(path), media_type=media_type))
-    return artifacts
+    return list(iter_documents(job_id, files))
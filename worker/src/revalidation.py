@@ -0,0 +1,187 @@
+"""Incremental re-validation of persisted rows after reviewer edits."""
+from __future__ import annotations
+
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .normalizer import normalize_in_place
+from .rowstore import RowStore, splice_rows, store_lock
+from .storage import JobMetadata, JobStorage
+from .types import CANDIDATE_FIELDS, CandidateRow
+from .validator import (
+    GroupKey,
+    ValidationTally,
+    _check_row,
+    _group_key,
+    _renumber_sorted,
+)
+from .writer import _processed_dir, csv_filename, format_csv_row, write_summary
+
+
+@dataclass
+class CellEdit:
+    """A reviewer's new ``value`` for ``field`` of the ``row``-th CSV row.
+
+    ``None`` clears the cell, exactly like an empty string.
+    """
+
+    row: int
+    field: str
+    value: Optional[str]
+
+
+@dataclass
+class RevalidationResult:
+    """Outcome of :func:`revalidate_rows`.
+
+    ``rows[start:stop]`` is the only slice that changed; ``positions`` maps
+    each edited row's old index to where it ended up, and ``delta`` holds
+    the change in the summary counts.
+    """
+
+    start: int
+    stop: int
+    positions: Dict[int, int]
+    delta: ValidationTally = field(default_factory=ValidationTally)
+
+
+def _edited_rows(
+    rows: Sequence[CandidateRow], edits: Iterable[CellEdit]
+) -> Dict[int, CandidateRow]:
+    edited: Dict[int, CandidateRow] = {}
+    for edit in edits:
+        if edit.field not in CANDIDATE_FIELDS:
+            raise ValueError(f"Unknown field '{edit.field}'")
+        if not 0 <= edit.row < len(rows):
+            raise ValueError(f"Row {edit.row} out of range (0..{len(rows) - 1})")
+        row = edited.get(edit.row)
+        if row is None:
+            original = rows[edit.row]
+            row = edited[edit.row] = replace(original, validation=dict(original.validation))
+        setattr(row, edit.field, "" if edit.value is None else edit.value)
+        row.validation.pop(edit.field, None)
+    return edited
+
+
+def _group_range(rows: Sequence[CandidateRow], key: GroupKey) -> Tuple[int, int]:
+    lo = bisect_left(rows, key, key=_group_key)
+    return lo, bisect_right(rows, key, lo=lo, key=_group_key)
+
+
+def _member_order(item: Tuple[int, CandidateRow]) -> Tuple[int, int]:
+    index, row = item
+    return int(row.NUM_ORDEM), index
+
+
+def _revalidate(
+    rows: Sequence[CandidateRow], edits: Iterable[CellEdit]
+) -> Tuple[RevalidationResult, List[CandidateRow]]:
+    edited = _edited_rows(rows, edits)
+    if not edited:
+        return RevalidationResult(start=0, stop=0, positions={}), []
+
+    members: Dict[GroupKey, List[Tuple[int, CandidateRow]]] = {}
+    for index, row in edited.items():
+        members.setdefault(_group_key(rows[index]), [])
+        _check_row(normalize_in_place(row))
+        members.setdefault(_group_key(row), []).append((index, row))
+
+    delta = ValidationTally()
+    ranges = {key: _group_range(rows, key) for key in members}
+    for key, (lo, hi) in ranges.items():
+        for index in range(lo, hi):
+            delta.remove(rows[index])
+            if index not in edited:
+                members[key].append((index, rows[index]))
+
+    start = min(lo for lo, _ in ranges.values())
+    stop = max(hi for _, hi in ranges.values())
+    span: List[CandidateRow] = []
+    positions: Dict[int, int] = {}
+    cursor = start
+    # Groups between the affected ones hold no edited rows and are already
+    # sorted and numbered; they are copied over as whole slices.
+    for key in sorted(members):
+        lo, hi = ranges[key]
+        span.extend(rows[cursor:lo])
+        group = sorted(members[key], key=_member_order)
+        group_rows = [row for _, row in group]
+        _renumber_sorted(group_rows)
+        for index, row in group:
+            delta.add(row)
+            if index in edited:
+                positions[index] = start + len(span)
+            span.append(row)
+        cursor = max(cursor, hi)
+    span.extend(rows[cursor:stop])
+    return RevalidationResult(start=start, stop=stop, positions=positions, delta=delta), span
+
+
+def revalidate_rows(rows: List[CandidateRow], edits: Iterable[CellEdit]) -> RevalidationResult:
+    """Apply ``edits`` to validated ``rows`` and re-check only what they touch.
+
+    ``rows`` must be the output of ``validate_rows`` (as persisted in the job
+    CSV), so every list group is one contiguous run. Edited rows are
+    normalised and checked again with the flags of the edited fields
+    cleared; the other flags are kept. Only the groups an edited row left or
+    joined are re-sorted and renumbered, and ``rows`` is updated in place so
+    that it equals ``validate_rows`` over the edited list.
+    """
+
+    result, span = _revalidate(rows, edits)
+    rows[result.start : result.stop] = span
+    return result
+
+
+def apply_edits(
+    job_id: str,
+    edits: Sequence[CellEdit],
+    *,
+    base_dir: Optional[Path] = None,
+    storage: Optional[JobStorage] = None,
+) -> RevalidationResult:
+    """Re-validate a processed job after reviewer ``edits`` and patch its files.
+
+    Rows are read straight from the memory-mapped row store, so only the
+    affected groups are decoded. The CSV and the row store are replaced
+    with spliced copies (see :func:`.rowstore.splice_rows`); ``meta.json``
+    and ``preview.json`` get the summary counts patched by the delta. The
+    whole update runs under the job's exclusive row store lock, so
+    concurrent edits of one job apply one after the other. When
+    ``storage`` is given the job stats follow.
+    """
+
+    base = Path(base_dir or Path("data")).resolve()
+    processed_dir = _processed_dir(job_id, base)
+    with store_lock(processed_dir, exclusive=True):
+        with RowStore(processed_dir, lock=False) as store:
+            result, span = _revalidate(store, edits)
+        if result.start == result.stop:
+            return result
+
+        splice_rows(
+            processed_dir,
+            processed_dir / csv_filename(job_id),
+            result.start,
+            span,
+            [format_csv_row(row) for row in span],
+        )
+
+        meta_path = processed_dir / "meta.json"
+        summary = json.loads(meta_path.read_text(encoding="utf-8"))
+        patched = result.delta.apply_to(summary)
+        write_summary(job_id, patched, base)
+
+        if storage is not None:
+
+            def patch_stats(meta: JobMetadata) -> None:
+                stats = dict(meta.stats)
+                for key in ("rows_total", "rows_ok", "rows_warn", "rows_err"):
+                    stats[key] = patched[key]
+                meta.stats = stats
+
+            storage.modify(job_id, patch_stats)
+    return result
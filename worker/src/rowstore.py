@@ -0,0 +1,332 @@
+"""Binary row store backing paginated previews of processed jobs.
+
+A job's rows live in two files next to its CSV:
+
+``rows.bin``
+    One record per row: ``FLAGS_WIDTH`` validation codes (see
+    :mod:`.batch`), ten little-endian ``uint32`` field lengths
+    (``NULL_LENGTH`` for ``None``) and the UTF-8 field values.
+``rows.idx``
+    ``INDEX_MAGIC`` followed by ``len(rows) + 1`` pairs of ``uint64``:
+    where each record starts in ``rows.bin`` and where the same row starts
+    in the CSV. The last pair holds the end of both files.
+
+Both files are memory-mapped on read, so fetching a page costs two index
+lookups and one contiguous slice whatever the size of the job.
+
+The files are never modified in place once written. A full run
+(:class:`RowStoreWriter`) and :func:`splice_rows` both write new copies
+beside them and rename them over the old ones, index last, while holding
+``rows.lock`` exclusively; :class:`RowStore` maps both files under
+a shared lock. A reader thus always maps a matching pair, and a mapping
+or an open CSV download keeps the old contents alive after a splice.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+
+from .batch import VALIDATED_FIELDS, row_flag_codes, validation_from_codes
+from .types import CANDIDATE_FIELDS, CandidateRow
+
+try:  # pragma: no cover - POSIX advisory locks; absent on Windows
+    import fcntl
+except ImportError:  # pragma: no cover - single-writer fallback
+    fcntl = None  # type: ignore[assignment]
+
+ROWS_FILENAME = "rows.bin"
+INDEX_FILENAME = "rows.idx"
+LOCK_FILENAME = "rows.lock"
+INDEX_MAGIC = b"CNEROWS1"
+
+FLAGS_WIDTH = len(VALIDATED_FIELDS)
+NULL_LENGTH = 0xFFFFFFFF
+
+_LENGTHS = struct.Struct(f"<{len(CANDIDATE_FIELDS)}I")
+_HEADER_SIZE = FLAGS_WIDTH + _LENGTHS.size
+_NUM_ORDEM = CANDIDATE_FIELDS.index("NUM_ORDEM")
+_COPY_CHUNK = 1 << 20
+
+
+@contextmanager
+def store_lock(directory: Path, *, exclusive: bool = False) -> Iterator[None]:
+    """Hold ``rows.lock`` in ``directory``: shared to map, exclusive to splice."""
+
+    with (Path(directory) / LOCK_FILENAME).open("a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def encode_record(values: Sequence[object], codes: bytes) -> bytes:
+    """Encode one row given its ``CANDIDATE_FIELDS`` values and flag codes."""
+
+    encoded = [None if value is None else str(value).encode("utf-8") for value in values]
+    lengths = _LENGTHS.pack(*(NULL_LENGTH if data is None else len(data) for data in encoded))
+    return b"".join([codes, lengths, *(data for data in encoded if data)])
+
+
+def _decode_at(buffer: bytes, offset: int) -> Tuple[CandidateRow, int]:
+    codes = bytes(buffer[offset : offset + FLAGS_WIDTH])
+    position = offset + _HEADER_SIZE
+    values: List[object] = []
+    for length in _LENGTHS.unpack_from(buffer, offset + FLAGS_WIDTH):
+        if length == NULL_LENGTH:
+            values.append(None)
+            continue
+        values.append(str(buffer[position : position + length], "utf-8"))
+        position += length
+    values[_NUM_ORDEM] = int(values[_NUM_ORDEM])  # type: ignore[arg-type]
+    return CandidateRow(*values, validation=validation_from_codes(codes)), position  # type: ignore[arg-type]
+
+
+def decode_record(buffer: bytes, offset: int = 0) -> CandidateRow:
+    """Decode the record starting at ``offset`` of ``buffer``."""
+
+    return _decode_at(buffer, offset)[0]
+
+
+def encode_row(row: CandidateRow) -> bytes:
+    return encode_record([getattr(row, name) for name in CANDIDATE_FIELDS], row_flag_codes(row))
+
+
+class RowStoreWriter:
+    """Writes a job's CSV and row store beside the current ones.
+
+    Callers write the CSV lines to :attr:`csv`, a temporary file beside
+    ``csv_path``, and :meth:`add` each row with its CSV offset. :meth:`close`
+    renames ``rows.bin``, then the CSV, then a new ``rows.idx`` over the old
+    files while holding :func:`store_lock` exclusively, as
+    :func:`splice_rows` does; :meth:`abort` discards them.
+    """
+
+    def __init__(self, directory: Path, csv_path: Path) -> None:
+        self.directory = Path(directory)
+        self.csv_path = Path(csv_path)
+        self._handle, self._rows_tmp = _temporary(self.directory / ROWS_FILENAME)
+        try:
+            self.csv, self._csv_tmp = _temporary(self.csv_path)
+        except BaseException:
+            self._handle.close()
+            Path(self._rows_tmp).unlink(missing_ok=True)
+            raise
+        self._offsets = array("Q")
+        self._position = 0
+
+    def add(self, values: Sequence[object], codes: bytes, csv_offset: int) -> None:
+        record = encode_record(values, codes)
+        self._offsets.extend((self._position, csv_offset))
+        self._handle.write(record)
+        self._position += len(record)
+
+    def close(self, csv_end: int) -> None:
+        self._offsets.extend((self._position, csv_end))
+        try:
+            for handle in (self._handle, self.csv):
+                handle.flush()
+                os.fsync(handle.fileno())
+                handle.close()
+            with store_lock(self.directory, exclusive=True):
+                os.replace(self._rows_tmp, self.directory / ROWS_FILENAME)
+                os.replace(self._csv_tmp, self.csv_path)
+                with _replacement(self.directory / INDEX_FILENAME) as target:
+                    target.write(INDEX_MAGIC)
+                    _to_little_endian(self._offsets).tofile(target)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        for handle, tmp_name in ((self._handle, self._rows_tmp), (self.csv, self._csv_tmp)):
+            handle.close()
+            Path(tmp_name).unlink(missing_ok=True)
+
+
+def _to_little_endian(offsets: array) -> array:
+    if struct.pack("=H", 1) == struct.pack("<H", 1):
+        return offsets
+    swapped = array("Q", offsets)
+    swapped.byteswap()
+    return swapped
+
+
+def _map(path: Path) -> Optional[mmap.mmap]:
+    with path.open("rb") as handle:
+        size = handle.seek(0, 2)
+        if not size:
+            return None
+        return mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class RowStore(Sequence[CandidateRow]):
+    """Read-only, memory-mapped view of a job's row store.
+
+    Indexing decodes a single record, so the store can be bisected or
+    paged through without loading the other rows. Both files are mapped
+    under a shared :func:`store_lock`; pass ``lock=False`` when the caller
+    already holds it exclusively.
+    """
+
+    def __init__(self, directory: Path, *, lock: bool = True) -> None:
+        self.directory = Path(directory)
+        if lock:
+            with store_lock(self.directory):
+                self._open()
+        else:
+            self._open()
+
+    def _open(self) -> None:
+        index_path = self.directory / INDEX_FILENAME
+        self._index = _map(index_path)
+        if self._index is None or self._index[: len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not a row store index")
+        self._data = _map(self.directory / ROWS_FILENAME)
+        self._count = (len(self._index) - len(INDEX_MAGIC)) // 16 - 1
+
+    def __enter__(self) -> "RowStore":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for view in (self._index, self._data):
+            if view is not None:
+                view.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def offsets(self, index: int) -> Tuple[int, int]:
+        """Return ``(rows.bin offset, CSV offset)`` of row ``index`` (or of the end)."""
+
+        return struct.unpack_from("<QQ", self._index, len(INDEX_MAGIC) + 16 * index)  # type: ignore[arg-type]
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                raise ValueError("RowStore slices must be contiguous")
+            return list(self.iter_rows(start, stop))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("row index out of range")
+        return decode_record(self._data, self.offsets(index)[0])  # type: ignore[arg-type]
+
+    def iter_rows(self, start: int, stop: int) -> Iterator[CandidateRow]:
+        """Decode rows ``start`` to ``stop`` from one contiguous slice."""
+
+        start, stop = max(0, start), min(stop, self._count)
+        if start >= stop:
+            return
+        chunk = self._data[self.offsets(start)[0] : self.offsets(stop)[0]]  # type: ignore[index]
+        position = 0
+        for _ in range(stop - start):
+            row, position = _decode_at(chunk, position)
+            yield row
+
+
+def _copy_range(source: IO[bytes], target: IO[bytes], size: int) -> None:
+    while size > 0:
+        chunk = source.read(min(size, _COPY_CHUNK))
+        if not chunk:
+            break
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def _temporary(path: Path) -> Tuple[IO[bytes], str]:
+    """Open a new temporary file beside ``path``; returns the handle and its name."""
+
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    return os.fdopen(fd, "wb"), tmp_name
+
+
+@contextmanager
+def _replacement(path: Path) -> Iterator[IO[bytes]]:
+    """Yield a temporary file beside ``path``, renamed over it on success."""
+
+    handle, tmp_name = _temporary(path)
+    try:
+        with handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def _write_spliced(target: IO[bytes], path: Path, offset: int, old_size: int, new: bytes) -> None:
+    """Write ``path`` to ``target`` with ``old_size`` bytes at ``offset`` replaced by ``new``."""
+
+    with path.open("rb") as source:
+        _copy_range(source, target, offset)
+        target.write(new)
+        source.seek(offset + old_size)
+        _copy_range(source, target, os.fstat(source.fileno()).st_size)
+
+
+def splice_rows(
+    directory: Path,
+    csv_path: Path,
+    start: int,
+    rows: Sequence[CandidateRow],
+    csv_records: Sequence[bytes],
+) -> None:
+    """Replace rows ``start:start + len(rows)`` in the store and in the CSV.
+
+    ``csv_records`` holds the encoded CSV line of each new row. New copies
+    of ``rows.bin``, the CSV and ``rows.idx`` are written beside the old
+    ones and renamed over them, index last. Callers must hold
+    :func:`store_lock` exclusively around the read-modify-write.
+    """
+
+    directory = Path(directory)
+    stop = start + len(rows)
+    with RowStore(directory, lock=False) as store:
+        row_start, csv_start = store.offsets(start)
+        row_stop, csv_stop = store.offsets(stop)
+        count = len(store)
+
+    records = [encode_row(row) for row in rows]
+    entries = array("Q")
+    row_offset, csv_offset = row_start, csv_start
+    for record, line in zip(records, csv_records):
+        entries.extend((row_offset, csv_offset))
+        row_offset += len(record)
+        csv_offset += len(line)
+    row_shift = row_offset - row_stop
+    csv_shift = csv_offset - csv_stop
+
+    index_path = directory / INDEX_FILENAME
+    with index_path.open("rb") as handle:
+        head = handle.read(len(INDEX_MAGIC) + 16 * start)
+        handle.seek(len(INDEX_MAGIC) + 16 * stop)
+        tail = array("Q")
+        tail.frombytes(handle.read(16 * (count + 1 - stop)))
+    tail = _to_little_endian(tail)
+    for position in range(0, len(tail), 2):
+        tail[position] += row_shift
+        tail[position + 1] += csv_shift
+    entries.extend(tail)
+
+    with _replacement(directory / ROWS_FILENAME) as target:
+        _write_spliced(target, directory / ROWS_FILENAME, row_start, row_stop - row_start, b"".join(records))
+    with _replacement(Path(csv_path)) as target:
+        _write_spliced(target, Path(csv_path), csv_start, csv_stop - csv_start, b"".join(csv_records))
+    with _replacement(index_path) as target:
+        target.write(head)
+        _to_little_endian(entries).tofile(target)
@@ -0,0 +1,90 @@
+"""Sorted batches spilled to disk and merged back in key order.
+
+Jobs too large to validate as one :class:`CandidateBatch` are handled one
+chunk at a time: each chunk is sorted on its own and written out as a
+*run*, and :meth:`SortedRuns.merge` streams the runs back as one sorted
+sequence. Only one block per run is in memory while merging.
+"""
+from __future__ import annotations
+
+import heapq
+import pickle
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional, Tuple
+
+from .batch import VALIDATED_FIELDS, CandidateBatch
+from .types import CANDIDATE_FIELDS
+
+Record = Tuple[Tuple, bytes]
+BLOCK_ROWS = 4096
+
+
+def _read_run(handle: IO[bytes]) -> Iterator[Record]:
+    handle.seek(0)
+    while True:
+        try:
+            block = pickle.load(handle)
+        except EOFError:
+            return
+        yield from block
+
+
+class SortedRuns:
+    """Sorted batches kept in temporary files until they are merged.
+
+    Runs are written under ``directory`` (the job's processed directory in
+    the pipeline) rather than the system temp dir, which may be in memory.
+    The files are removed by :meth:`close`, or on exit when used as a
+    context manager.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = Path(directory) if directory is not None else None
+        self._files: List[IO[bytes]] = []
+
+    def __enter__(self) -> "SortedRuns":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def add(self, batch: CandidateBatch) -> None:
+        """Spill ``batch``, which must already be sorted, as one run.
+
+        Records are ``(values, flag codes)`` pairs, with values in
+        ``CANDIDATE_FIELDS`` order and codes in ``VALIDATED_FIELDS`` order.
+        """
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        handle = tempfile.TemporaryFile(dir=self.directory, prefix="run-", suffix=".tmp")
+        self._files.append(handle)
+        records = zip(
+            zip(*(batch.columns[name] for name in CANDIDATE_FIELDS)),
+            map(bytes, zip(*(batch.flags[name] for name in VALIDATED_FIELDS))),
+        )
+        while True:
+            block = list(islice(records, BLOCK_ROWS))
+            if not block:
+                break
+            pickle.dump(block, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def merge(self, key: Callable[[Record], object]) -> Iterator[Record]:
+        """Yield the records of every run in ``key`` order.
+
+        Each run must already be in ``key`` order. Equal keys come out in the
+        order their runs were added, so merging the sorted chunks of a list
+        gives the same sequence as a stable sort of the whole list.
+        """
+
+        return heapq.merge(*(_read_run(handle) for handle in self._files), key=key)
+
+    def close(self) -> None:
+        for handle in self._files:
+            handle.close()
+        self._files = []
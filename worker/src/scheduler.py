@@ -0,0 +1,88 @@
+"""Scheduling classes and cost estimates for queued jobs.
+
+Submissions are classified when they are enqueued, from what the renderer
+knows (media type) and the file sizes, without opening the documents: a
+few pages of PDF/Office input is a ``small`` job, everything else
+``bulk``. ZIP archives are judged by the entries in their central
+directory.
+
+The estimated page count is the job's cost in the queue's weighted fair
+queuing (see :class:`~.job_queue.JobQueue`): each lease advances the
+submitter's virtual time by ``cost / weight``, and the pending entry of the
+submitter with the lowest virtual time runs next.
+"""
+from __future__ import annotations
+
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .renderer import media_type_for, zip_members
+
+SMALL = "small"
+BULK = "bulk"
+JOB_CLASSES = (SMALL, BULK)
+
+SMALL_JOB_MAX_PAGES = 5
+SMALL_JOB_MAX_BYTES = 5 * 1024 * 1024
+
+DEFAULT_TENANT = "anonymous"
+
+# Rough bytes per page used to turn file sizes into page estimates.
+_BYTES_PER_PAGE = {
+    "application/pdf": 100 * 1024,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": 30 * 1024,
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": 50 * 1024,
+}
+
+
+@dataclass(frozen=True)
+class JobEstimate:
+    pages: int
+    size: int
+    job_class: str
+
+
+def _estimate_pages(media_type: str, size: int) -> int:
+    per_page = _BYTES_PER_PAGE.get(media_type)
+    if per_page is None:
+        return 1
+    return max(1, -(-size // per_page))
+
+
+def _zip_pages(path: Path) -> int:
+    try:
+        members = zip_members(path)
+    except (OSError, zipfile.BadZipFile):
+        return 1
+    return max(1, sum(_estimate_pages(media_type_for(info.filename), info.file_size) for info in members))
+
+
+def estimate_job(files: Iterable[Path]) -> JobEstimate:
+    """Estimate the pages and size of a submission and classify it."""
+
+    pages = 0
+    size = 0
+    for path in (Path(path) for path in files):
+        try:
+            file_size = path.stat().st_size
+        except OSError:
+            file_size = 0
+        size += file_size
+        if path.suffix.lower() == ".zip":
+            pages += _zip_pages(path)
+        else:
+            pages += _estimate_pages(media_type_for(path.name), file_size)
+    pages = max(1, pages)
+    small = pages <= SMALL_JOB_MAX_PAGES and size <= SMALL_JOB_MAX_BYTES
+    return JobEstimate(pages=pages, size=size, job_class=SMALL if small else BULK)
+
+
+def tenant_key(dtmnfr: Optional[str] = None, uploader: Optional[str] = None) -> str:
+    """Fair-share key of a submission: its DTMNFR, else its uploader."""
+
+    for value in (dtmnfr, uploader):
+        if value and value.strip():
+            return value.strip()
+    return DEFAULT_TENANT
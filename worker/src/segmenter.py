@@ -1,16 +1,18 @@
 """Segmentation step: split OCR text into candidate line segments."""
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from .types import OCRPage
 
 
-def segment_pages(pages: Iterable[OCRPage]) -> List[str]:
-    segments: List[str] = []
+def iter_segments(pages: Iterable[OCRPage]) -> Iterator[str]:
     for page in pages:
         for raw_line in page.text.splitlines():
             line = raw_line.strip()
             if line:
-                segments.append(line)
-    return segments
+                yield line
+
+
+def segment_pages(pages: Iterable[OCRPage]) -> List[str]:
+    return list(iter_segments(pages))
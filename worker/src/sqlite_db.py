@@ -0,0 +1,101 @@
+"""Shared plumbing for the worker's WAL-mode SQLite files."""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+BUSY_TIMEOUT_MS = 10_000
+
+
+class SQLiteDatabase:
+    """A WAL-mode SQLite file with one persistent connection per thread.
+
+    Subclasses create their tables in :meth:`_create_schema`, which runs
+    once when the object is built. Every connection is also registered
+    here: the connection of a thread that has exited is closed as soon as
+    another thread opens one, and :meth:`close` closes them all.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._registry_lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._pid = os.getpid()
+        self._generation = 0
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._create_schema(connection)
+
+    def _create_schema(self, connection: sqlite3.Connection) -> None:
+        """Create tables and indexes; called with an autocommit connection."""
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection, opening it on first use.
+
+        Connections are kept open: closing the last one checkpoints the WAL
+        and deletes it, which would turn every small write into file churn.
+        """
+
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid() or local.generation != self._generation:
+            local.connection = self._open()
+            local.pid = os.getpid()
+            local.generation = self._generation
+        yield local.connection
+
+    def _open(self) -> sqlite3.Connection:
+        # check_same_thread=False only so that close() may close it from
+        # another thread; each connection is still used by one thread.
+        connection = sqlite3.connect(
+            self.path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        alive = {thread.ident for thread in threading.enumerate()}
+        with self._registry_lock:
+            if self._pid != os.getpid():
+                # Connections inherited across fork belong to the parent.
+                self._connections = {}
+                self._pid = os.getpid()
+            for ident in [ident for ident in self._connections if ident not in alive]:
+                self._connections.pop(ident).close()
+            stale = self._connections.pop(threading.get_ident(), None)
+            if stale is not None:
+                stale.close()
+            self._connections[threading.get_ident()] = connection
+        return connection
+
+    def close(self) -> None:
+        """Close every connection this process opened; later use reopens them."""
+
+        with self._registry_lock:
+            self._generation += 1
+            if self._pid == os.getpid():
+                for connection in self._connections.values():
+                    connection.close()
+            self._connections = {}
+            self._pid = os.getpid()
+        self._local.__dict__.clear()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in a ``BEGIN IMMEDIATE`` write transaction."""
+
+        with self.connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
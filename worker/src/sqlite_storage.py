@@ -0,0 +1,122 @@
+"""SQLite-backed job metadata store."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .job_index import JobIndex
+from .storage import JobMetadata, JobState, JobStorage, VersionConflict
+
+DATABASE_FILENAME = "jobs.sqlite3"
+
+
+def _payload(meta: JobMetadata) -> str:
+    return json.dumps(meta.to_dict(), ensure_ascii=False)
+
+
+class SQLiteJobStorage(JobStorage):
+    """Keeps job metadata in ``<base_dir>/jobs.sqlite3`` instead of JSON files.
+
+    The database runs in WAL mode, so API readers never wait for a worker
+    that is writing, and writes from several processes are serialised by
+    SQLite (``BEGIN IMMEDIATE``). The rows live in the same indexed
+    ``jobs`` table the JSON tree uses as its index (see :mod:`.job_index`),
+    with the full ``JobMetadata.to_dict`` payload stored alongside so it
+    round-trips exactly. Versions and ``expected_version`` behave as in
+    :class:`JobStorage`.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, *, database: Optional[Path] = None) -> None:
+        root = Path(base_dir or Path("data"))
+        self.base_dir = root.resolve()
+        self.jobs_dir = self.base_dir / "jobs"
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.database = Path(database or self.base_dir / DATABASE_FILENAME).resolve()
+        self._index: Optional[JobIndex] = None
+        self._index_lock = threading.Lock()
+
+    def _open_index(self) -> JobIndex:
+        return JobIndex(self.database)
+
+    @staticmethod
+    def _fetch(connection: sqlite3.Connection, job_id: str) -> Optional[JobMetadata]:
+        row = connection.execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else JobMetadata.from_dict(json.loads(row[0]))
+
+    def ensure(self, job_id: str, input_files: List[Path]) -> JobMetadata:
+        with self.index.transaction() as connection:
+            existing = self._fetch(connection, job_id)
+            if existing is not None:
+                return existing
+            now = datetime.now(timezone.utc)
+            meta = JobMetadata(
+                job_id=job_id,
+                state=JobState.queued,
+                created_at=now,
+                updated_at=now,
+                input_files=[str(path) for path in input_files],
+                version=1,
+            )
+            JobIndex.upsert(connection, meta, _payload(meta))
+            return meta
+
+    def load(self, job_id: str) -> JobMetadata:
+        with self.index.connect() as connection:
+            meta = self._fetch(connection, job_id)
+        if meta is None:
+            raise FileNotFoundError(f"Job '{job_id}' metadata not found")
+        return meta
+
+    def fingerprint(self, job_id: str) -> Tuple[int, ...]:
+        with self.index.connect() as connection:
+            row = connection.execute("SELECT version FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"Job '{job_id}' metadata not found")
+        return (row[0],)
+
+    def modify(
+        self,
+        job_id: str,
+        mutate: Callable[[JobMetadata], None],
+        *,
+        expected_version: Optional[int] = None,
+    ) -> JobMetadata:
+        with self.index.transaction() as connection:
+            meta = self._fetch(connection, job_id)
+            if meta is None:
+                raise FileNotFoundError(f"Job '{job_id}' metadata not found")
+            if expected_version is not None and meta.version != expected_version:
+                raise VersionConflict(job_id, expected_version, meta.version)
+            mutate(meta)
+            meta.updated_at = datetime.now(timezone.utc)
+            meta.version += 1
+            JobIndex.upsert(connection, meta, _payload(meta))
+            return meta
+
+    def iter_jobs(self) -> Iterator[JobMetadata]:
+        with self.index.connect() as connection:
+            for (payload,) in connection.execute("SELECT payload FROM jobs ORDER BY job_id"):
+                yield JobMetadata.from_dict(json.loads(payload))
+
+    def rebuild_index(self) -> int:
+        """Re-derive the indexed columns of every row from its payload.
+
+        The payload is the source of truth here; this repairs rows whose
+        columns were left behind by a manual edit or an older schema.
+        """
+
+        with self.index.transaction() as connection:
+            payloads = connection.execute("SELECT payload FROM jobs").fetchall()
+            for (payload,) in payloads:
+                JobIndex.upsert(connection, JobMetadata.from_dict(json.loads(payload)), payload)
+            connection.execute("REINDEX jobs")
+        return len(payloads)
+
+    def import_jobs(self, jobs: Iterable[JobMetadata]) -> int:
+        """Upsert ``jobs`` as they are (versions and timestamps untouched)."""
+
+        return self.index.upsert_many((meta, _payload(meta)) for meta in jobs)
@@ -2,11 +2,22 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .job_index import MAX_PAGE_SIZE, JobIndex, JobPage, JobQuery
+
+try:  # pragma: no cover - POSIX advisory locks; absent on Windows
+    import fcntl
+except ModuleNotFoundError:  # pragma: no cover - single-writer fallback
+    fcntl = None  # type: ignore[assignment]
 
 
 class JobState(str, Enum):
@@ -28,6 +39,10 @@ class JobMetadata:
     pages: Optional[int] = None
     stats: Dict[str, Union[int, float, None]] = field(default_factory=dict)
     error: Optional[str] = None
+    version: int = 0
+    timings: Dict[str, Dict[str, Union[int, float, None]]] = field(default_factory=dict)
+    profile: bool = False
+    profile_files: Dict[str, str] = field(default_factory=dict)
 
     def to_dict(self) -> Dict[str, object]:
         payload = asdict(self)
@@ -48,9 +63,32 @@ class JobMetadata:
             pages=data.get("pages"),
             stats=_coerce_stats(dict(data.get("stats", {}))),
             error=data.get("error"),
+            version=int(data.get("version", 0)),
+            timings={
+                str(stage): _coerce_stats(dict(values))
+                for stage, values in dict(data.get("timings") or {}).items()
+                if isinstance(values, dict)
+            },
+            profile=bool(data.get("profile", False)),
+            profile_files={str(kind): str(path) for kind, path in dict(data.get("profile_files") or {}).items()},
         )
 
 
+INDEX_FILENAME = "jobs_index.sqlite3"
+STORAGE_BACKEND_ENV = "CNE_STORAGE_BACKEND"
+STORAGE_BACKENDS = ("json", "sqlite")
+
+
+class VersionConflict(RuntimeError):
+    """Raised when a compare-and-swap update finds a newer ``job.json``."""
+
+    def __init__(self, job_id: str, expected: int, actual: int) -> None:
+        self.job_id = job_id
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"Job '{job_id}' is at version {actual}, expected {expected}")
+
+
 def _coerce_stats(raw: Dict[str, object]) -> Dict[str, Union[int, float, None]]:
     stats: Dict[str, Union[int, float, None]] = {}
     for key, value in raw.items():
@@ -76,7 +114,23 @@ def _coerce_stats(raw: Dict[str, object]) -> Dict[str, Union[int, float, None]]:
 
 
 class JobStorage:
-    """Stores job metadata under ``data/jobs/<job_id>``."""
+    """Stores job metadata under ``data/jobs/<job_id>``.
+
+    ``job.json`` is only ever replaced whole: each write goes to a temporary
+    file in the job directory that is then renamed over it, so readers
+    never lock and never see partial JSON. Writers take an exclusive
+    ``flock`` on ``job.lock`` around load, mutate and replace, which keeps
+    several worker processes sharing one ``data/jobs`` tree from losing
+    each other's updates. Every write bumps ``JobMetadata.version``; pass
+    ``expected_version`` to :meth:`update` or :meth:`mark_state` to make
+    the write a compare-and-swap.
+
+    Each write also refreshes the job's row in ``jobs_index.sqlite3`` (see
+    :mod:`.job_index`) while the job lock is held, which is what
+    :meth:`query_jobs` pages through. The index is opened on first use,
+    and rebuilt from the tree then if it does not exist yet. :meth:`close`
+    releases its connections.
+    """
 
     def __init__(self, base_dir: Optional[Path] = None) -> None:
         root = Path(base_dir or Path("data"))
@@ -84,6 +138,30 @@ class JobStorage:
         self.jobs_dir = self.base_dir / "jobs"
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._index: Optional[JobIndex] = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def index(self) -> JobIndex:
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._open_index()
+        return self._index
+
+    def _open_index(self) -> JobIndex:
+        index_path = self.base_dir / INDEX_FILENAME
+        fresh = not index_path.exists()
+        index = JobIndex(index_path)
+        if fresh and any(self.jobs_dir.glob("*/job.json")):
+            index.replace_all((meta, None) for meta in self.iter_jobs())
+        return index
+
+    def close(self) -> None:
+        """Close the index connections; the index reopens on next use."""
+
+        if self._index is not None:
+            self._index.close()
 
     def _job_dir(self, job_id: str) -> Path:
         return self.jobs_dir / job_id
@@ -91,50 +169,191 @@ class JobStorage:
     def _job_meta_path(self, job_id: str) -> Path:
         return self._job_dir(job_id) / "job.json"
 
+    @contextmanager
+    def _locked(self, job_id: str) -> Iterator[None]:
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        with (job_dir / "job.lock").open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
     def ensure(self, job_id: str, input_files: List[Path]) -> JobMetadata:
         try:
             return self.load(job_id)
         except FileNotFoundError:
             pass
-        now = datetime.now(timezone.utc)
-        meta = JobMetadata(
-            job_id=job_id,
-            state=JobState.queued,
-            created_at=now,
-            updated_at=now,
-            input_files=[str(path) for path in input_files],
-        )
-        self._persist(meta)
-        return meta
+        with self._locked(job_id):
+            try:
+                return self.load(job_id)
+            except FileNotFoundError:
+                pass
+            now = datetime.now(timezone.utc)
+            meta = JobMetadata(
+                job_id=job_id,
+                state=JobState.queued,
+                created_at=now,
+                updated_at=now,
+                input_files=[str(path) for path in input_files],
+            )
+            self._persist(meta)
+            return meta
 
     def load(self, job_id: str) -> JobMetadata:
         meta_path = self._job_meta_path(job_id)
-        if not meta_path.exists():
-            raise FileNotFoundError(f"Job '{job_id}' metadata not found")
-        payload = json.loads(meta_path.read_text(encoding="utf-8"))
+        try:
+            payload = json.loads(meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Job '{job_id}' metadata not found") from None
         return JobMetadata.from_dict(payload)
 
-    def update(self, job_id: str, **changes: object) -> JobMetadata:
-        meta = self.load(job_id)
-        for key, value in changes.items():
-            if hasattr(meta, key):
-                setattr(meta, key, value)
-        meta.updated_at = datetime.now(timezone.utc)
-        self._persist(meta)
-        return meta
-
-    def mark_state(self, job_id: str, state: JobState, **changes: object) -> JobMetadata:
-        meta = self.load(job_id)
-        meta.state = state
-        for key, value in changes.items():
-            if hasattr(meta, key):
-                setattr(meta, key, value)
-        meta.updated_at = datetime.now(timezone.utc)
-        self._persist(meta)
-        return meta
+    def fingerprint(self, job_id: str) -> Tuple[int, ...]:
+        """Cheap token that changes whenever the job's metadata is rewritten.
+
+        ``job.json`` is replaced by rename on every write, so its inode,
+        size and mtime identify one version without parsing it.
+        """
+
+        try:
+            stat_result = os.stat(self._job_meta_path(job_id))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Job '{job_id}' metadata not found") from None
+        return (stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+
+    def iter_jobs(self) -> Iterator[JobMetadata]:
+        """Yield every readable job in the tree (a full directory walk)."""
+
+        for meta_path in sorted(self.jobs_dir.glob("*/job.json")):
+            try:
+                yield self.load(meta_path.parent.name)
+            except (FileNotFoundError, ValueError, KeyError):
+                continue
+
+    def rebuild_index(self) -> int:
+        """Re-index the whole tree, e.g. after ``job.json`` files were copied in."""
+
+        return self.index.replace_all((meta, None) for meta in self.iter_jobs())
+
+    def query_jobs(self, query: JobQuery) -> JobPage:
+        """Return one keyset-paginated page of jobs matching ``query``."""
+
+        rows, next_cursor = self.index.page(query)
+        items: List[JobMetadata] = []
+        for job_id, payload in rows:
+            if payload is not None:
+                items.append(JobMetadata.from_dict(json.loads(payload)))
+                continue
+            try:
+                items.append(self.load(job_id))
+            except FileNotFoundError:
+                continue
+        return JobPage(items=items, next_cursor=next_cursor)
+
+    def list_jobs(
+        self, *, state: Optional[JobState] = None, limit: Optional[int] = None
+    ) -> List[JobMetadata]:
+        """Return jobs, most recently updated first, optionally by ``state``."""
+
+        jobs: List[JobMetadata] = []
+        cursor: Optional[str] = None
+        while limit is None or len(jobs) < limit:
+            size = MAX_PAGE_SIZE if limit is None else min(MAX_PAGE_SIZE, limit - len(jobs))
+            page = self.query_jobs(JobQuery(state=state, limit=size, cursor=cursor))
+            jobs.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        return jobs
+
+    def modify(
+        self,
+        job_id: str,
+        mutate: Callable[[JobMetadata], None],
+        *,
+        expected_version: Optional[int] = None,
+    ) -> JobMetadata:
+        """Atomically load, ``mutate`` and persist the metadata of ``job_id``.
+
+        Raises :class:`VersionConflict` when ``expected_version`` is given and
+        no longer matches the stored version.
+        """
+
+        with self._locked(job_id):
+            meta = self.load(job_id)
+            if expected_version is not None and meta.version != expected_version:
+                raise VersionConflict(job_id, expected_version, meta.version)
+            mutate(meta)
+            meta.updated_at = datetime.now(timezone.utc)
+            self._persist(meta)
+            return meta
+
+    def update(
+        self, job_id: str, *, expected_version: Optional[int] = None, **changes: object
+    ) -> JobMetadata:
+        return self.modify(
+            job_id, lambda meta: _apply_changes(meta, changes), expected_version=expected_version
+        )
+
+    def mark_state(
+        self,
+        job_id: str,
+        state: JobState,
+        *,
+        expected_version: Optional[int] = None,
+        **changes: object,
+    ) -> JobMetadata:
+        def mutate(meta: JobMetadata) -> None:
+            meta.state = state
+            _apply_changes(meta, changes)
+
+        return self.modify(job_id, mutate, expected_version=expected_version)
 
     def _persist(self, meta: JobMetadata) -> None:
+        """Write ``meta`` with the next version via temp file + ``os.replace``.
+
+        Callers must hold the job lock.
+        """
+
         job_dir = self._job_dir(meta.job_id)
         job_dir.mkdir(parents=True, exist_ok=True)
-        meta_path = self._job_meta_path(meta.job_id)
-        meta_path.write_text(json.dumps(meta.to_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+        meta.version += 1
+        data = json.dumps(meta.to_dict(), indent=2, ensure_ascii=False).encode("utf-8")
+        fd, tmp_name = tempfile.mkstemp(dir=job_dir, prefix=".job.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_name, self._job_meta_path(meta.job_id))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self.index.transaction() as connection:
+            JobIndex.upsert(connection, meta)
+
+
+def _apply_changes(meta: JobMetadata, changes: Dict[str, object]) -> None:
+    for key, value in changes.items():
+        if key != "version" and hasattr(meta, key):
+            setattr(meta, key, value)
+
+
+def open_job_storage(base_dir: Optional[Path] = None, backend: Optional[str] = None) -> JobStorage:
+    """Build the job store selected by ``backend`` or ``CNE_STORAGE_BACKEND``.
+
+    ``json`` (the default) keeps one ``job.json`` per job; ``sqlite`` keeps
+    all metadata in ``<base_dir>/jobs.sqlite3``.
+    """
+
+    name = (backend or os.environ.get(STORAGE_BACKEND_ENV, "") or "json").strip().lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}'; expected one of {STORAGE_BACKENDS}")
+    if name == "sqlite":
+        from .sqlite_storage import SQLiteJobStorage
+
+        return SQLiteJobStorage(base_dir)
+    return JobStorage(base_dir)
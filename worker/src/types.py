@@ -2,17 +2,49 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Dict, Optional
 
+CANDIDATE_FIELDS = (
+    "DTMNFR",
+    "ORGAO",
+    "TIPO",
+    "SIGLA",
+    "SIMBOLO",
+    "NOME_LISTA",
+    "NUM_ORDEM",
+    "NOME_CANDIDATO",
+    "PARTIDO_PROPONENTE",
+    "INDEPENDENTE",
+)
+
 
 @dataclass
 class DocumentArtifact:
-    """Represents an input document to be processed."""
+    """Represents an input document to be processed.
+
+    Documents inside a ZIP keep the archive as ``source_path`` and their
+    entry name as ``member``; they are read straight from the archive.
+    """
 
     job_id: str
     source_path: Path
     media_type: str
+    member: Optional[str] = None
+
+    @property
+    def document_id(self) -> str:
+        """The document's path, or ``archive!member`` for ZIP entries."""
+
+        if self.member is None:
+            return str(self.source_path)
+        return f"{self.source_path}!{self.member}"
+
+    @property
+    def name(self) -> PurePosixPath:
+        """File name of the document itself (the member for ZIP entries)."""
+
+        return PurePosixPath(self.member if self.member is not None else self.source_path.name)
 
 
 @dataclass
@@ -23,6 +55,7 @@ class OCRPage:
     page_number: int
     text: str
     confidence: float = 1.0
+    error: Optional[str] = None
 
 
 @dataclass
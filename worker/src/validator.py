@@ -1,10 +1,17 @@
 """Validation logic for candidate rows."""
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Dict, Iterable, List, Optional, Tuple, Union
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
-from .types import CandidateRow
+from .batch import FLAG_ERR, FLAG_WARN, VALIDATED_FIELDS, CandidateBatch
+from .normalizer import normalize_in_place
+from .types import CANDIDATE_FIELDS, CandidateRow
+
+try:  # pragma: no cover - optional dependency for vectorised batch validation
+    import numpy as np
+except ModuleNotFoundError:  # pragma: no cover - pure Python fallback
+    np = None  # type: ignore[assignment]
 
 _ALLOWED_ORGAOS = {"AM", "CM", "AF"}
 _ALLOWED_TIPOS = {"2", "3"}
@@ -27,102 +34,508 @@ _VALIDATION_OK = "OK"
 _VALIDATION_WARN = "AVISO"
 _VALIDATION_ERR = "ERRO"
 
-_SORT_KEY_ORDER = ("DTMNFR", "ORGAO", "SIGLA", "NOME_LISTA", "TIPO", "NUM_ORDEM")
+_SEVERITY = {_VALIDATION_OK: 0, _VALIDATION_WARN: 1, _VALIDATION_ERR: 2}
+_CONFIDENCE_SCALE = {0: 1.0, 1: 0.7, 2: 0.3}
+
+GroupKey = Tuple[str, str, str, str, str]
+Record = Tuple[Sequence, bytes]
+
+_RECORD_GROUP_KEY = itemgetter(
+    *(CANDIDATE_FIELDS.index(name) for name in ("DTMNFR", "ORGAO", "SIGLA", "NOME_LISTA", "TIPO"))
+)
+_NUM_ORDEM_VALUE = CANDIDATE_FIELDS.index("NUM_ORDEM")
+_NUM_ORDEM_FLAG = VALIDATED_FIELDS.index("NUM_ORDEM")
+
+VALIDATION_ENGINES = ("auto", "python", "numpy")
+_NUMPY_MIN_ROWS = 2048
 
 
 def _row_sort_key(row: CandidateRow) -> Tuple:
-    return tuple(
-        getattr(row, field)
-        if field != "NUM_ORDEM"
-        else int(getattr(row, field))
-        for field in _SORT_KEY_ORDER
-    )
+    """Ordering from TestPlan: (DTMNFR, ORGAO, SIGLA, NOME_LISTA, TIPO, NUM_ORDEM)."""
+
+    return (row.DTMNFR, row.ORGAO, row.SIGLA, row.NOME_LISTA, row.TIPO, int(row.NUM_ORDEM))
+
+
+def record_sort_key(record: Record) -> Tuple:
+    """:func:`_row_sort_key` for a ``(values, flag codes)`` record."""
+
+    values = record[0]
+    return (*_RECORD_GROUP_KEY(values), int(values[_NUM_ORDEM_VALUE]))
+
+
+def _row_severity(row: CandidateRow) -> int:
+    worst = 0
+    for flag in row.validation.values():
+        worst = max(worst, _SEVERITY.get(flag, 0))
+    return worst
+
+
+def _check_row(row: CandidateRow) -> None:
+    row.validation.setdefault("DTMNFR", _VALIDATION_OK)
+    row.validation.setdefault("ORGAO", _VALIDATION_OK)
+    row.validation.setdefault("TIPO", _VALIDATION_OK)
+    row.validation.setdefault("SIGLA", _VALIDATION_OK)
+    row.validation.setdefault("NOME_LISTA", _VALIDATION_OK)
+    row.validation.setdefault("NUM_ORDEM", _VALIDATION_OK)
+    row.validation.setdefault("NOME_CANDIDATO", _VALIDATION_OK)
+    row.validation.setdefault("PARTIDO_PROPONENTE", _VALIDATION_OK)
+    row.validation.setdefault("INDEPENDENTE", _VALIDATION_OK)
+
+    if row.DTMNFR and (len(row.DTMNFR) != 6 or not row.DTMNFR.isdigit()):
+        row.validation["DTMNFR"] = _VALIDATION_WARN
+        row.DTMNFR = row.DTMNFR.zfill(6)[:6]
+
+    if row.ORGAO not in _ALLOWED_ORGAOS:
+        row.validation["ORGAO"] = _VALIDATION_WARN
+        row.ORGAO = "AM"
+
+    if row.TIPO not in _ALLOWED_TIPOS:
+        row.validation["TIPO"] = _VALIDATION_WARN
+        row.TIPO = "2"
+
+    if row.SIGLA not in _ALLOWED_SIGLAS:
+        row.validation["SIGLA"] = _VALIDATION_ERR
+
+    if not row.NOME_LISTA:
+        row.validation["NOME_LISTA"] = _VALIDATION_WARN
+        row.NOME_LISTA = f"LISTA {row.SIGLA or 'IND'}"
+
+    if row.INDEPENDENTE.upper() not in _ALLOWED_INDEPENDENTE:
+        row.validation["INDEPENDENTE"] = _VALIDATION_WARN
+        row.INDEPENDENTE = "0"
+
+
+def _group_key(row: CandidateRow) -> GroupKey:
+    return (row.DTMNFR, row.ORGAO, row.SIGLA, row.NOME_LISTA or "", row.TIPO)
+
+
+def _renumber_sorted(rows: List[CandidateRow]) -> None:
+    """Renumber ``NUM_ORDEM`` from 1 within each run of equal group keys.
+
+    ``rows`` must already be in ``_row_sort_key`` order, so each list group
+    is contiguous; renumbering keeps that order, so no re-sort is needed.
+    """
+
+    previous: Optional[GroupKey] = None
+    position = 0
+    for row in rows:
+        key = _group_key(row)
+        if key != previous:
+            previous = key
+            position = 1
+        else:
+            position += 1
+        if row.NUM_ORDEM != position:
+            row.validation["NUM_ORDEM"] = _VALIDATION_WARN
+            row.NUM_ORDEM = position
+        else:
+            row.validation.setdefault("NUM_ORDEM", _VALIDATION_OK)
 
 
 def validate_rows(rows: Iterable[CandidateRow]) -> List[CandidateRow]:
     validated: List[CandidateRow] = []
     for row in rows:
-        row.validation.setdefault("DTMNFR", _VALIDATION_OK)
-        row.validation.setdefault("ORGAO", _VALIDATION_OK)
-        row.validation.setdefault("TIPO", _VALIDATION_OK)
-        row.validation.setdefault("SIGLA", _VALIDATION_OK)
-        row.validation.setdefault("NOME_LISTA", _VALIDATION_OK)
-        row.validation.setdefault("NUM_ORDEM", _VALIDATION_OK)
-        row.validation.setdefault("NOME_CANDIDATO", _VALIDATION_OK)
-        row.validation.setdefault("PARTIDO_PROPONENTE", _VALIDATION_OK)
-        row.validation.setdefault("INDEPENDENTE", _VALIDATION_OK)
-
-        if row.DTMNFR and (len(row.DTMNFR) != 6 or not row.DTMNFR.isdigit()):
-            row.validation["DTMNFR"] = _VALIDATION_WARN
-            row.DTMNFR = row.DTMNFR.zfill(6)[:6]
-
-        if row.ORGAO not in _ALLOWED_ORGAOS:
-            row.validation["ORGAO"] = _VALIDATION_WARN
-            row.ORGAO = "AM"
-
-        if row.TIPO not in _ALLOWED_TIPOS:
-            row.validation["TIPO"] = _VALIDATION_WARN
-            row.TIPO = "2"
-
-        if row.SIGLA not in _ALLOWED_SIGLAS:
-            row.validation["SIGLA"] = _VALIDATION_ERR
-
-        if not row.NOME_LISTA:
-            row.validation["NOME_LISTA"] = _VALIDATION_WARN
-            row.NOME_LISTA = f"LISTA {row.SIGLA or 'IND'}"
-
-        if row.INDEPENDENTE.upper() not in _ALLOWED_INDEPENDENTE:
-            row.validation["INDEPENDENTE"] = _VALIDATION_WARN
-            row.INDEPENDENTE = "0"
-
+        _check_row(row)
         validated.append(row)
 
     validated.sort(key=_row_sort_key)
+    _renumber_sorted(validated)
+    return validated
 
-    grouped: Dict[Tuple[str, str, str, str, str], List[CandidateRow]] = defaultdict(list)
-    for row in validated:
-        key = (row.DTMNFR, row.ORGAO, row.SIGLA, row.NOME_LISTA or "", row.TIPO)
-        grouped[key].append(row)
 
-    for rows_group in grouped.values():
-        for index, row in enumerate(rows_group, start=1):
-            if row.NUM_ORDEM != index:
-                row.validation["NUM_ORDEM"] = _VALIDATION_WARN
-                row.NUM_ORDEM = index
-            else:
-                row.validation.setdefault("NUM_ORDEM", _VALIDATION_OK)
+def normalize_and_validate(rows: List[CandidateRow]) -> List[CandidateRow]:
+    """Fused, in-place normalisation and validation of ``rows``.
 
-    validated.sort(key=_row_sort_key)
-    return validated
+    Mutation contract: every ``CandidateRow`` in ``rows`` is normalised and
+    validated in place (its ``validation`` dict is updated, not replaced),
+    and ``rows`` itself is sorted in place and returned. The result equals
+    ``validate_rows(normalize_rows(rows))`` without the per-row copies,
+    with one sort and one linear renumbering pass.
+    """
+
+    for row in rows:
+        _check_row(normalize_in_place(row))
+    rows.sort(key=_row_sort_key)
+    _renumber_sorted(rows)
+    return rows
+
+
+class ValidationTally:
+    """Running validation summary that can be fed one row at a time."""
+
+    def __init__(self) -> None:
+        self.rows_total = 0
+        self.rows_ok = 0
+        self.rows_warn = 0
+        self.rows_err = 0
+        self._confidence_total = 0.0
+
+    def add(self, row: CandidateRow) -> None:
+        self.add_worst(_row_severity(row))
+
+    def remove(self, row: CandidateRow) -> None:
+        """Undo :meth:`add` for ``row``; counts may go negative in a delta tally."""
+
+        self.add_worst(_row_severity(row), weight=-1)
+
+    def add_worst(self, worst: int, *, weight: int = 1) -> None:
+        """Count one row given its highest severity (0 OK, 1 AVISO, 2 ERRO)."""
+
+        self.rows_total += weight
+        if worst == 0:
+            self.rows_ok += weight
+        elif worst == 1:
+            self.rows_warn += weight
+        else:
+            self.rows_err += weight
+        self._confidence_total += weight * _CONFIDENCE_SCALE.get(worst, 0.0)
+
+    def apply_to(
+        self, summary: Dict[str, Union[int, float, None]]
+    ) -> Dict[str, Union[int, float, None]]:
+        """Return ``summary`` with this tally's row counts added to it.
+
+        ``ocr_conf_mean`` is carried over as is: it comes from the OCR pages,
+        which a delta over validated rows knows nothing about.
+        """
+
+        patched = dict(summary)
+        for key in ("rows_total", "rows_ok", "rows_warn", "rows_err"):
+            patched[key] = int(patched.get(key) or 0) + getattr(self, key)
+        return patched
+
+    def observe(self, rows: Iterable[CandidateRow]) -> Iterator[CandidateRow]:
+        """Pass ``rows`` through unchanged while counting them."""
+
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def summary(
+        self, *, ocr_conf_mean: Optional[float] = None
+    ) -> Dict[str, Union[int, float, None]]:
+        summary: Dict[str, Union[int, float, None]] = {
+            "rows_total": self.rows_total,
+            "rows_ok": self.rows_ok,
+            "rows_warn": self.rows_warn,
+            "rows_err": self.rows_err,
+            "ocr_conf_mean": ocr_conf_mean,
+        }
+        if summary["ocr_conf_mean"] is None and self.rows_total:
+            summary["ocr_conf_mean"] = round(self._confidence_total / self.rows_total, 4)
+        return summary
 
 
 def summarise_validation(
     rows: Iterable[CandidateRow], *, ocr_conf_mean: Optional[float] = None
 ) -> Dict[str, Union[int, float, None]]:
-    summary: Dict[str, Union[int, float, None]] = {
-        "rows_total": 0,
-        "rows_ok": 0,
-        "rows_warn": 0,
-        "rows_err": 0,
-        "ocr_conf_mean": ocr_conf_mean,
-    }
-    severity = {_VALIDATION_OK: 0, _VALIDATION_WARN: 1, _VALIDATION_ERR: 2}
-    confidence_scale = {0: 1.0, 1: 0.7, 2: 0.3}
-    confidence_total = 0.0
-    confidence_count = 0
+    tally = ValidationTally()
     for row in rows:
-        summary["rows_total"] += 1
-        worst = 0
-        for flag in row.validation.values():
-            worst = max(worst, severity.get(flag, 0))
-        if worst == 0:
-            summary["rows_ok"] += 1
-        elif worst == 1:
-            summary["rows_warn"] += 1
+        tally.add(row)
+    return tally.summary(ocr_conf_mean=ocr_conf_mean)
+
+
+def _validate_batch_python(batch: CandidateBatch, *, renumber: bool = True) -> None:
+    columns = batch.columns
+    flags = batch.flags
+
+    dtmnfr = columns["DTMNFR"]
+    dtmnfr_flags = flags["DTMNFR"]
+    for index, value in enumerate(dtmnfr):
+        if value and (len(value) != 6 or not value.isdigit()):
+            dtmnfr_flags[index] = FLAG_WARN
+            dtmnfr[index] = value.zfill(6)[:6]
+
+    for name, allowed, fallback in (("ORGAO", _ALLOWED_ORGAOS, "AM"), ("TIPO", _ALLOWED_TIPOS, "2")):
+        values = columns[name]
+        field_flags = flags[name]
+        for index, value in enumerate(values):
+            if value not in allowed:
+                field_flags[index] = FLAG_WARN
+                values[index] = fallback
+
+    siglas = columns["SIGLA"]
+    sigla_flags = flags["SIGLA"]
+    for index, value in enumerate(siglas):
+        if value not in _ALLOWED_SIGLAS:
+            sigla_flags[index] = FLAG_ERR
+
+    nome_lista = columns["NOME_LISTA"]
+    nome_lista_flags = flags["NOME_LISTA"]
+    for index, value in enumerate(nome_lista):
+        if not value:
+            nome_lista_flags[index] = FLAG_WARN
+            nome_lista[index] = f"LISTA {siglas[index] or 'IND'}"
+
+    independente = columns["INDEPENDENTE"]
+    independente_flags = flags["INDEPENDENTE"]
+    for index, value in enumerate(independente):
+        if value.upper() not in _ALLOWED_INDEPENDENTE:
+            independente_flags[index] = FLAG_WARN
+            independente[index] = "0"
+
+    num_ordem = columns["NUM_ORDEM"]
+    group_keys = list(zip(dtmnfr, columns["ORGAO"], siglas, nome_lista, columns["TIPO"]))
+    sort_keys = list(zip(group_keys, map(int, num_ordem)))
+    order = sorted(range(len(sort_keys)), key=sort_keys.__getitem__)
+
+    if renumber:
+        num_ordem_flags = flags["NUM_ORDEM"]
+        previous = None
+        position = 0
+        for index in order:
+            key = group_keys[index]
+            if key != previous:
+                previous = key
+                position = 1
+            else:
+                position += 1
+            if num_ordem[index] != position:
+                num_ordem_flags[index] = FLAG_WARN
+                num_ordem[index] = position
+
+    batch.take(order)
+
+
+def _factorize(values: List) -> Tuple[List, "np.ndarray"]:
+    """Return the distinct ``values`` in first-seen order and a code per row."""
+
+    index: Dict[object, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in values),
+        dtype=np.intp,
+        count=len(values),
+    )
+    return list(index), codes
+
+
+def _object_array(values: List) -> "np.ndarray":
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class _CheckedColumn:
+    """A factorized column whose domain check ran once per distinct value."""
+
+    def __init__(
+        self,
+        values: List,
+        is_invalid: Callable[[object], bool],
+        fix: Optional[Callable[[object], object]] = None,
+    ) -> None:
+        uniques, self.codes = _factorize(values)
+        invalid = np.fromiter((is_invalid(value) for value in uniques), dtype=bool, count=len(uniques))
+        self.invalid = invalid[self.codes]
+        if fix is not None:
+            uniques = [fix(value) if bad else value for value, bad in zip(uniques, invalid)]
+        self.uniques = _object_array(uniques)
+
+    def ranks(self) -> "np.ndarray":
+        """Per-row rank of the (fixed) value in sort order; equal values tie."""
+
+        ordered = {value: rank for rank, value in enumerate(sorted(set(self.uniques.tolist())))}
+        lookup = np.fromiter((ordered[value] for value in self.uniques), dtype=np.intp, count=len(self.uniques))
+        return lookup[self.codes]
+
+    def values(self, order: "np.ndarray") -> List:
+        return self.uniques[self.codes[order]].tolist()
+
+
+def _validate_batch_numpy(
+    batch: CandidateBatch, *, renumber: bool = True
+) -> Optional[ValidationTally]:
+    """Vectorised twin of :func:`_validate_batch_python`.
+
+    Each key column is factorized so the domain checks and fixes run once per
+    distinct value; the sort is a single stable ``lexsort`` over integer
+    ranks and ``NUM_ORDEM`` is renumbered with a cumulative count per group.
+    Returns ``None`` without touching ``batch`` when the columns hold values
+    the integer fast path cannot represent exactly. Without ``renumber`` the
+    batch is only checked and sorted, and the returned tally is empty.
+    """
+
+    columns = batch.columns
+    size = len(batch)
+    num_ordem = columns["NUM_ORDEM"]
+    if not set(map(type, num_ordem)) <= {int}:
+        return None
+    try:
+        nums = np.fromiter(num_ordem, dtype=np.int64, count=size)
+    except OverflowError:
+        return None
+
+    flags = {
+        name: np.frombuffer(bytes(batch.flags[name]), dtype=np.uint8).copy()
+        for name in VALIDATED_FIELDS
+    }
+
+    dtmnfr = _CheckedColumn(
+        columns["DTMNFR"],
+        lambda value: bool(value) and (len(value) != 6 or not value.isdigit()),
+        lambda value: value.zfill(6)[:6],
+    )
+    flags["DTMNFR"][dtmnfr.invalid] = FLAG_WARN
+    orgao = _CheckedColumn(columns["ORGAO"], lambda value: value not in _ALLOWED_ORGAOS, lambda _: "AM")
+    flags["ORGAO"][orgao.invalid] = FLAG_WARN
+    tipo = _CheckedColumn(columns["TIPO"], lambda value: value not in _ALLOWED_TIPOS, lambda _: "2")
+    flags["TIPO"][tipo.invalid] = FLAG_WARN
+    sigla = _CheckedColumn(columns["SIGLA"], lambda value: value not in _ALLOWED_SIGLAS)
+    flags["SIGLA"][sigla.invalid] = FLAG_ERR
+    independente = _CheckedColumn(
+        columns["INDEPENDENTE"],
+        lambda value: value.upper() not in _ALLOWED_INDEPENDENTE,
+        lambda _: "0",
+    )
+    flags["INDEPENDENTE"][independente.invalid] = FLAG_WARN
+
+    nome_lista_values = columns["NOME_LISTA"]
+    nome_lista = _CheckedColumn(nome_lista_values, lambda value: not value)
+    if nome_lista.invalid.any():
+        flags["NOME_LISTA"][nome_lista.invalid] = FLAG_WARN
+        siglas = columns["SIGLA"]
+        nome_lista_values = list(nome_lista_values)
+        for index in np.flatnonzero(nome_lista.invalid).tolist():
+            nome_lista_values[index] = f"LISTA {siglas[index] or 'IND'}"
+        nome_lista = _CheckedColumn(nome_lista_values, lambda _: False)
+
+    key_ranks = [column.ranks() for column in (dtmnfr, orgao, sigla, nome_lista, tipo)]
+    order = np.lexsort([nums] + key_ranks[::-1])
+
+    if renumber:
+        sorted_ranks = np.stack(key_ranks)[:, order]
+        boundary = np.ones(size, dtype=bool)
+        boundary[1:] = (sorted_ranks[:, 1:] != sorted_ranks[:, :-1]).any(axis=0)
+        positions = np.arange(size)
+        group_start = np.maximum.accumulate(np.where(boundary, positions, 0))
+        positions = positions - group_start + 1
+        renumbered = nums[order] != positions
+        flags["NUM_ORDEM"][order[renumbered]] = FLAG_WARN
+    else:
+        positions = nums[order]
+
+    columns["DTMNFR"] = dtmnfr.values(order)
+    columns["ORGAO"] = orgao.values(order)
+    columns["TIPO"] = tipo.values(order)
+    columns["SIGLA"] = sigla.values(order)
+    columns["NOME_LISTA"] = nome_lista.values(order)
+    columns["INDEPENDENTE"] = independente.values(order)
+    columns["NUM_ORDEM"] = positions.tolist()
+    for name in ("SIMBOLO", "NOME_CANDIDATO", "PARTIDO_PROPONENTE"):
+        columns[name] = _object_array(columns[name])[order].tolist()
+
+    sorted_flags = [flags[name][order] for name in VALIDATED_FIELDS]
+    for name, values in zip(VALIDATED_FIELDS, sorted_flags):
+        batch.flags[name] = bytearray(values.tobytes())
+    if not renumber:
+        return ValidationTally()
+
+    worst = np.maximum.reduce(sorted_flags) if sorted_flags else np.zeros(size, dtype=np.uint8)
+    counts = np.bincount(worst, minlength=3)
+    scale = np.array([_CONFIDENCE_SCALE[level] for level in range(3)])
+    tally = ValidationTally()
+    tally.rows_total = size
+    tally.rows_ok, tally.rows_warn, tally.rows_err = (int(count) for count in counts[:3])
+    # cumsum adds left to right, matching ValidationTally's running total bit for bit.
+    tally._confidence_total = float(np.cumsum(scale[worst])[-1]) if size else 0.0
+    return tally
+
+
+def _use_numpy(batch: CandidateBatch, engine: str) -> bool:
+    if engine not in VALIDATION_ENGINES:
+        raise ValueError(f"Unknown validation engine '{engine}'")
+    if engine == "numpy" and np is None:
+        raise ValueError("The 'numpy' validation engine requires NumPy to be installed")
+    return np is not None and (
+        engine == "numpy" or (engine == "auto" and len(batch) >= _NUMPY_MIN_ROWS)
+    )
+
+
+def _run_batch_validation(batch: CandidateBatch, engine: str) -> ValidationTally:
+    if _use_numpy(batch, engine):
+        tally = _validate_batch_numpy(batch)
+        if tally is not None:
+            return tally
+    _validate_batch_python(batch)
+    tally = ValidationTally()
+    for worst in batch.worst_flags():
+        tally.add_worst(worst)
+    return tally
+
+
+def validate_batch(batch: CandidateBatch, *, engine: str = "auto") -> CandidateBatch:
+    """Validate, sort and renumber ``batch`` in place.
+
+    Applies the same checks and fixes as :func:`validate_rows` column by
+    column, recording small-int flag codes, then sorts the batch once and
+    renumbers ``NUM_ORDEM`` within each list group. ``engine`` selects the
+    pure Python loops, the NumPy path, or (``"auto"``) NumPy for batches of
+    at least a few thousand rows when it is installed.
+    """
+
+    _run_batch_validation(batch, engine)
+    return batch
+
+
+def sort_batch(batch: CandidateBatch, *, engine: str = "auto") -> CandidateBatch:
+    """Check and sort ``batch`` in place like :func:`validate_batch`, but
+    leave ``NUM_ORDEM`` as it is.
+
+    For one chunk of a job validated chunk by chunk: list groups span
+    chunks, so they are renumbered by :func:`renumber_records` once the
+    sorted chunks are merged.
+    """
+
+    if _use_numpy(batch, engine) and _validate_batch_numpy(batch, renumber=False) is not None:
+        return batch
+    _validate_batch_python(batch, renumber=False)
+    return batch
+
+
+def renumber_records(records: Iterable[Record], tally: ValidationTally) -> Iterator[Record]:
+    """Renumber ``NUM_ORDEM`` over ``(values, flag codes)`` records.
+
+    ``records`` must be in :func:`record_sort_key` order, such as the merged
+    rows of batches passed through :func:`sort_batch`; values are in
+    ``CANDIDATE_FIELDS`` order and codes in ``VALIDATED_FIELDS`` order.
+    Each record is counted in ``tally`` as it is yielded, so the records
+    and the tally match :func:`validate_and_summarise` over one batch.
+    """
+
+    previous: Optional[GroupKey] = None
+    position = 0
+    for values, codes in records:
+        key = _RECORD_GROUP_KEY(values)
+        if key != previous:
+            previous = key
+            position = 1
         else:
-            summary["rows_err"] += 1
-        confidence_total += confidence_scale.get(worst, 0.0)
-        confidence_count += 1
-    if summary["ocr_conf_mean"] is None and confidence_count:
-        summary["ocr_conf_mean"] = round(confidence_total / confidence_count, 4)
-    return summary
+            position += 1
+        if values[_NUM_ORDEM_VALUE] != position:
+            values = list(values)
+            values[_NUM_ORDEM_VALUE] = position
+            codes = bytearray(codes)
+            codes[_NUM_ORDEM_FLAG] = FLAG_WARN
+            codes = bytes(codes)
+        tally.add_worst(max(codes))
+        yield values, codes
+
+
+def validate_and_summarise(
+    batch: CandidateBatch,
+    *,
+    ocr_conf_mean: Optional[float] = None,
+    engine: str = "auto",
+) -> Dict[str, Union[int, float, None]]:
+    """Validate ``batch`` in place and return its summary from the same pass."""
+
+    return _run_batch_validation(batch, engine).summary(ocr_conf_mean=ocr_conf_mean)
+
+
+def summarise_batch(
+    batch: CandidateBatch, *, ocr_conf_mean: Optional[float] = None
+) -> Dict[str, Union[int, float, None]]:
+    tally = ValidationTally()
+    for worst in batch.worst_flags():
+        tally.add_worst(worst)
+    return tally.summary(ocr_conf_mean=ocr_conf_mean)
@@ -2,11 +2,14 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
 from pathlib import Path
-from typing import Dict, Iterable, Tuple, Union
+from typing import BinaryIO, Dict, Iterable, List, Sequence, Tuple, Union
 
-from .types import CandidateRow
+from .batch import VALIDATED_FIELDS, CandidateBatch, row_flag_codes
+from .rowstore import RowStoreWriter
+from .types import CANDIDATE_FIELDS, CandidateRow
 
 CSV_COLUMNS = [
     "DTMNFR",
@@ -20,33 +23,159 @@ CSV_COLUMNS = [
     "PARTIDO_PROPONENTE",
     "INDEPENDENTE",
 ]
+_BLANK_WHEN_NONE = tuple(
+    CANDIDATE_FIELDS.index(name) for name in ("SIMBOLO", "NOME_LISTA", "PARTIDO_PROPONENTE", "INDEPENDENTE")
+)
 
 
-def write_outputs(
-    job_id: str,
-    rows: Iterable[CandidateRow],
-    summary: Dict[str, Union[int, float, None]],
-    base_dir: Path,
-) -> Tuple[Path, Path]:
+def csv_filename(job_id: str) -> str:
+    return f"listas_{job_id}.csv"
+
+
+def _processed_dir(job_id: str, base_dir: Path) -> Path:
     processed_dir = (base_dir / "processed" / job_id).resolve()
     processed_dir.mkdir(parents=True, exist_ok=True)
-    csv_path = processed_dir / f"listas_{job_id}.csv"
-    with csv_path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.writer(handle, delimiter=";")
+    return processed_dir
+
+
+class _CountingSink:
+    """Binary target for :func:`csv.writer` that tracks the bytes written."""
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self.position = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._handle.write(data)
+        self.position += len(data)
+        return len(data)
+
+
+def _write_records(
+    job_id: str,
+    records: Iterable[Tuple[Sequence, Sequence, bytes]],
+    base_dir: Path,
+) -> Path:
+    """Write the CSV and the row store from ``(csv record, values, codes)`` triples.
+
+    ``csv.writer`` hands each line to the sink in one ``write`` call, so the
+    sink position before a row is that row's CSV offset in the index. The
+    files of a previous run are only replaced once the new ones are complete
+    (see :class:`RowStoreWriter`).
+    """
+
+    processed_dir = _processed_dir(job_id, base_dir)
+    csv_path = processed_dir / csv_filename(job_id)
+    store = RowStoreWriter(processed_dir, csv_path)
+    try:
+        sink = _CountingSink(store.csv)
+        writer = csv.writer(sink, delimiter=";")
         writer.writerow(CSV_COLUMNS)
-        for row in rows:
-            writer.writerow([
-                row.DTMNFR,
-                row.ORGAO,
-                row.TIPO,
-                row.SIGLA,
-                row.SIMBOLO or "",
-                row.NOME_LISTA or "",
-                row.NUM_ORDEM,
-                row.NOME_CANDIDATO,
-                row.PARTIDO_PROPONENTE or "",
-                row.INDEPENDENTE or "",
-            ])
+        for record, values, codes in records:
+            store.add(values, codes, sink.position)
+            writer.writerow(record)
+    except BaseException:
+        store.abort()
+        raise
+    store.close(sink.position)
+    return csv_path
+
+
+def _blank_none(values: Iterable) -> Iterable:
+    return (value or "" for value in values)
+
+
+def _row_record(row: CandidateRow) -> List:
+    return [
+        row.DTMNFR,
+        row.ORGAO,
+        row.TIPO,
+        row.SIGLA,
+        row.SIMBOLO or "",
+        row.NOME_LISTA or "",
+        row.NUM_ORDEM,
+        row.NOME_CANDIDATO,
+        row.PARTIDO_PROPONENTE or "",
+        row.INDEPENDENTE or "",
+    ]
+
+
+def format_csv_row(row: CandidateRow) -> bytes:
+    """Encode ``row`` exactly as its line in the job CSV."""
+
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer, delimiter=";").writerow(_row_record(row))
+    return buffer.getvalue().encode("utf-8")
+
+
+def write_csv(job_id: str, rows: Iterable[CandidateRow], base_dir: Path) -> Path:
+    """Write ``rows`` to the job CSV as they arrive, without buffering them.
+
+    The row store (``rows.bin``/``rows.idx``, see :mod:`.rowstore`) is
+    written alongside, with the validation flags of every row.
+    """
+
+    records = (
+        (_row_record(row), [getattr(row, name) for name in CANDIDATE_FIELDS], row_flag_codes(row))
+        for row in rows
+    )
+    return _write_records(job_id, records, base_dir)
+
+
+def write_batch_csv(job_id: str, batch: CandidateBatch, base_dir: Path) -> Path:
+    """Write a :class:`CandidateBatch` straight from its columns, plus its row store."""
+
+    columns = batch.columns
+    records = zip(
+        zip(
+            columns["DTMNFR"],
+            columns["ORGAO"],
+            columns["TIPO"],
+            columns["SIGLA"],
+            _blank_none(columns["SIMBOLO"]),
+            _blank_none(columns["NOME_LISTA"]),
+            columns["NUM_ORDEM"],
+            columns["NOME_CANDIDATO"],
+            _blank_none(columns["PARTIDO_PROPONENTE"]),
+            _blank_none(columns["INDEPENDENTE"]),
+        ),
+        zip(*(columns[name] for name in CANDIDATE_FIELDS)),
+        map(bytes, zip(*(batch.flags[name] for name in VALIDATED_FIELDS))),
+    )
+    return _write_records(job_id, records, base_dir)
+
+
+def _values_record(values: Sequence) -> List:
+    record = list(values)
+    for index in _BLANK_WHEN_NONE:
+        record[index] = record[index] or ""
+    return record
+
+
+def write_records_csv(
+    job_id: str, records: Iterable[Tuple[Sequence, bytes]], base_dir: Path
+) -> Path:
+    """Write ``(values, flag codes)`` records as they arrive, plus their row store.
+
+    Values are in ``CANDIDATE_FIELDS`` order and codes in
+    ``VALIDATED_FIELDS`` order, as merged from sorted runs (see
+    :mod:`.runs`); the output matches :func:`write_batch_csv`.
+    """
+
+    return _write_records(
+        job_id, ((_values_record(values), values, codes) for values, codes in records), base_dir
+    )
+
+
+def write_summary(
+    job_id: str,
+    summary: Dict[str, Union[int, float, None]],
+    base_dir: Path,
+) -> Path:
+    """Persist ``meta.json`` and the stats section of ``preview.json``."""
+
+    processed_dir = _processed_dir(job_id, base_dir)
     meta_path = processed_dir / "meta.json"
     payload: Dict[str, Union[int, float, None]] = {
         "job_id": job_id,
@@ -77,4 +206,26 @@ def write_outputs(
         json.dumps(preview_payload, indent=2, ensure_ascii=False),
         encoding="utf-8",
     )
+    return meta_path
+
+
+def write_outputs(
+    job_id: str,
+    rows: Iterable[CandidateRow],
+    summary: Dict[str, Union[int, float, None]],
+    base_dir: Path,
+) -> Tuple[Path, Path]:
+    csv_path = write_csv(job_id, rows, base_dir)
+    meta_path = write_summary(job_id, summary, base_dir)
+    return csv_path, meta_path
+
+
+def write_batch_outputs(
+    job_id: str,
+    batch: CandidateBatch,
+    summary: Dict[str, Union[int, float, None]],
+    base_dir: Path,
+) -> Tuple[Path, Path]:
+    csv_path = write_batch_csv(job_id, batch, base_dir)
+    meta_path = write_summary(job_id, summary, base_dir)
     return csv_path, meta_path